@@ -0,0 +1,70 @@
+"""Session aggregates
+
+Revision ID: 002_session_aggregates
+Revises: 001_initial_tables
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '002_session_aggregates'
+down_revision: Union[str, None] = '001_initial_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('training_sessions', sa.Column('result_count', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('training_sessions', sa.Column('best_scores', sa.JSON(), nullable=True))
+
+    # Backfill the aggregates that were previously computed on every read
+    conn = op.get_bind()
+    sessions = sa.table(
+        'training_sessions',
+        sa.column('id', sa.Integer()),
+        sa.column('total_score', sa.Integer()),
+        sa.column('result_count', sa.Integer()),
+        sa.column('best_scores', sa.JSON()),
+        sa.column('completed_at', sa.TIMESTAMP()),
+    )
+    results = sa.table(
+        'exercise_results',
+        sa.column('session_id', sa.Integer()),
+        sa.column('exercise_type', sa.String()),
+        sa.column('score', sa.Integer()),
+        sa.column('started_at', sa.TIMESTAMP()),
+    )
+    rows = conn.execute(
+        sa.select(
+            results.c.session_id,
+            results.c.exercise_type,
+            sa.func.coalesce(sa.func.sum(results.c.score), 0),
+            sa.func.count(),
+            sa.func.max(results.c.score),
+            sa.func.max(results.c.started_at),
+        )
+        .where(results.c.session_id.is_not(None))
+        .group_by(results.c.session_id, results.c.exercise_type)
+    ).all()
+
+    aggregates = {}
+    for session_id, exercise_type, total, count, best, last_at in rows:
+        agg = aggregates.setdefault(session_id, {"total_score": 0, "result_count": 0, "best_scores": {}, "completed_at": None})
+        agg["total_score"] += total
+        agg["result_count"] += count
+        if best is not None:
+            agg["best_scores"][exercise_type] = best
+        if last_at is not None and (agg["completed_at"] is None or last_at > agg["completed_at"]):
+            agg["completed_at"] = last_at
+
+    for session_id, agg in aggregates.items():
+        conn.execute(sessions.update().where(sessions.c.id == session_id).values(**agg))
+
+
+def downgrade() -> None:
+    op.drop_column('training_sessions', 'best_scores')
+    op.drop_column('training_sessions', 'result_count')
@@ -0,0 +1,31 @@
+"""exercise_results indexes
+
+Revision ID: 003_exercise_results_indexes
+Revises: 002_session_aggregates
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '003_exercise_results_indexes'
+down_revision: Union[str, None] = '002_session_aggregates'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Loading a session's results (selectinload / WHERE session_id IN ...)
+    op.create_index('ix_exercise_results_session_id_started_at', 'exercise_results', ['session_id', 'started_at'])
+    # History of one exercise type, newest first
+    op.create_index('ix_exercise_results_exercise_type_started_at', 'exercise_results', ['exercise_type', 'started_at', 'id'])
+    # History across all types and date-range filters
+    op.create_index('ix_exercise_results_started_at', 'exercise_results', ['started_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_exercise_results_started_at', table_name='exercise_results')
+    op.drop_index('ix_exercise_results_exercise_type_started_at', table_name='exercise_results')
+    op.drop_index('ix_exercise_results_session_id_started_at', table_name='exercise_results')
@@ -0,0 +1,31 @@
+"""content_meta table for checksum-gated seeding
+
+Revision ID: 004_content_meta
+Revises: 003_exercise_results_indexes
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004_content_meta'
+down_revision: Union[str, None] = '003_exercise_results_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'content_meta',
+        sa.Column('key', sa.String(50), primary_key=True),
+        sa.Column('checksum', sa.String(64), nullable=False),
+        sa.Column('row_count', sa.Integer()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('content_meta')
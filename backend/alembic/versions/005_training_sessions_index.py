@@ -0,0 +1,25 @@
+"""training_sessions (started_at, id) index for keyset pagination
+
+Revision ID: 005_training_sessions_index
+Revises: 004_content_meta
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '005_training_sessions_index'
+down_revision: Union[str, None] = '004_content_meta'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /api/sessions: newest first, pages continue after (started_at, id)
+    op.create_index('ix_training_sessions_started_at', 'training_sessions', ['started_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_training_sessions_started_at', table_name='training_sessions')
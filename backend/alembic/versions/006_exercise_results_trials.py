@@ -0,0 +1,26 @@
+"""exercise_results.trials packed per-trial arrays
+
+Revision ID: 006_exercise_results_trials
+Revises: 005_training_sessions_index
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006_exercise_results_trials'
+down_revision: Union[str, None] = '005_training_sessions_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # See app/services/trial_codec.py for the layout
+    op.add_column('exercise_results', sa.Column('trials', sa.LargeBinary()))
+
+
+def downgrade() -> None:
+    op.drop_column('exercise_results', 'trials')
@@ -0,0 +1,35 @@
+"""reading_texts length and readability metrics
+
+Revision ID: 007_reading_text_metrics
+Revises: 006_exercise_results_trials
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007_reading_text_metrics'
+down_revision: Union[str, None] = '006_exercise_results_trials'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by seed_data.py (see app/services/text_metrics.py); the changed
+    # content checksum makes the next seed rewrite reading_texts. SQLite
+    # databases get the columns from seed_data.py, which recreates the
+    # content tables whenever the content changes
+    op.add_column('reading_texts', sa.Column('syllable_count', sa.Integer()))
+    op.add_column('reading_texts', sa.Column('sentence_count', sa.Integer()))
+    op.add_column('reading_texts', sa.Column('readability', sa.Float()))
+    op.create_index('ix_reading_texts_difficulty_word_count', 'reading_texts', ['difficulty', 'word_count', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reading_texts_difficulty_word_count', table_name='reading_texts')
+    op.drop_column('reading_texts', 'readability')
+    op.drop_column('reading_texts', 'sentence_count')
+    op.drop_column('reading_texts', 'syllable_count')
@@ -1,10 +1,90 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 import os
 
 class Settings(BaseSettings):
     # Use SQLite for local development if PostgreSQL is not available
     DATABASE_URL: str = "sqlite+aiosqlite:///./brain_training.db"
 
+    # Optional read replica for GET endpoints; without it reads use DATABASE_URL.
+    # A session written within READ_YOUR_WRITES_SECONDS is still read from the
+    # primary so replication lag cannot hide it.
+    DATABASE_REPLICA_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = 10.0
+
+    # Engine profile. Pool settings apply to server databases and SQLite files,
+    # the prepared statement cache to asyncpg only.
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: int = 30
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+
+    # Applied to every new SQLite connection; empty/None skips a pragma
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: Optional[int] = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: Optional[int] = -64_000  # negative = KiB
+    SQLITE_BUSY_TIMEOUT_MS: Optional[int] = 5000
+
+    # Prebuilt read-only content file (python seed_data.py --build-content PATH).
+    # When set, every SQLite connection ATTACHes it with immutable=1 and the main
+    # database only keeps user data. SQLite only.
+    CONTENT_DATABASE_PATH: Optional[str] = None
+
+    # "generated" builds arithmetic tests procedurally (services/math_generator.py)
+    # at MATH_DIFFICULTY; "bank" samples the fixed math_problems table
+    MATH_SOURCE: str = "generated"
+    MATH_DIFFICULTY: int = 2
+
+    # Sessions whose already-shown memory words are remembered (LRU), so
+    # GET /api/exercises/memory-words?session_id= does not repeat them
+    MEMORY_SEEN_SESSIONS: int = 10_000
+
+    # Above this many math_problems rows the content catalog leaves math problems
+    # in the database and samples them by primary-key range instead
+    MATH_CATALOG_MAX_ROWS: int = 100_000
+
+    # Pre-serialized arithmetic/stroop payloads kept ready per exercise type.
+    # The pool is refilled up to DEPTH once it drops below LOW_WATERMARK.
+    PAYLOAD_POOL_ENABLED: bool = True
+    PAYLOAD_POOL_DEPTH: int = 200
+    PAYLOAD_POOL_LOW_WATERMARK: int = 50
+
+    # "sync" writes each POST /api/results immediately; "queued" accepts it
+    # with 202 and group-commits in the background (see services/result_writer.py)
+    RESULT_INGESTION_MODE: str = "sync"
+    RESULT_QUEUE_MAX_BATCH: int = 200
+    RESULT_QUEUE_FLUSH_INTERVAL_MS: int = 50
+    RESULT_QUEUE_MAX_SIZE: int = 10_000
+    # Transient write errors (e.g. "database is locked") are retried this many
+    # times, waiting RETRY_BACKOFF_MS and doubling it after each attempt
+    RESULT_QUEUE_MAX_RETRIES: int = 3
+    RESULT_QUEUE_RETRY_BACKOFF_MS: int = 50
+
+    # Per-request SQL profile, returned as a Server-Timing header: requests that
+    # send SQL_PROFILE_HEADER (None disables it) plus a random SAMPLE_RATE share
+    SQL_PROFILE_HEADER: Optional[str] = "X-SQL-Profile"
+    SQL_PROFILE_SAMPLE_RATE: float = 0.0
+    # Statements at least this slow are logged with their EXPLAIN plan; None disables
+    SLOW_QUERY_MS: Optional[float] = 200.0
+    SLOW_QUERY_EXPLAIN: bool = True
+
+    # /metrics endpoint and the request/SQL instrumentation behind it
+    METRICS_ENABLED: bool = True
+
+    # Responses of at least this many bytes are gzip/brotli compressed for
+    # clients that accept it (brotli needs pip install brotli); 0 disables
+    COMPRESSION_MIN_SIZE: int = 1000
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
+    # Token for /api/admin endpoints, sent as X-Admin-Token; None disables them
+    ADMIN_TOKEN: Optional[str] = None
+    # Rows per server-side cursor fetch (and Parquet row group) in result exports
+    EXPORT_CHUNK_ROWS: int = 5000
+
     class Config:
         env_file = ".env"
 
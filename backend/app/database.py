@@ -1,18 +1,150 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import time
+from pathlib import Path
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from app.config import settings
+from app.config import settings, Settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+def sqlite_pragmas(config: Settings) -> list:
+    pragmas = []
+    if config.SQLITE_JOURNAL_MODE:
+        pragmas.append(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+    if config.SQLITE_SYNCHRONOUS:
+        pragmas.append(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+    if config.SQLITE_MMAP_SIZE is not None:
+        pragmas.append(f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}")
+    if config.SQLITE_CACHE_SIZE is not None:
+        pragmas.append(f"PRAGMA cache_size={int(config.SQLITE_CACHE_SIZE)}")
+    if config.SQLITE_BUSY_TIMEOUT_MS is not None:
+        pragmas.append(f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}")
+    return pragmas
+
+def content_database_uri(path: str) -> str:
+    # immutable=1 skips all locking and change detection, so the file must
+    # never be written while attached; it is replaced with the image instead
+    return Path(path).resolve().as_uri() + "?mode=ro&immutable=1"
+
+def build_engine(url: str, config: Settings = settings) -> AsyncEngine:
+    """Create an async engine with the pool and connection settings from `config`."""
+    backend = make_url(url).get_backend_name()
+    database = make_url(url).database
+    kwargs = {"echo": config.DB_ECHO}
+
+    if backend == "sqlite" and database in (None, "", ":memory:"):
+        # The database lives and dies with its one connection. aiosqlite's
+        # default StaticPool hands that connection to concurrent sessions at
+        # once ("cannot commit transaction - SQL statements in progress");
+        # a one-slot queue pool makes them take turns instead
+        kwargs.update(poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0, pool_timeout=config.DB_POOL_TIMEOUT)
+    else:
+        kwargs.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_pre_ping=backend != "sqlite",
+        )
+    if backend == "sqlite" and "poolclass" not in kwargs:
+        # aiosqlite defaults to NullPool for files, which reopens the file and
+        # replays the pragmas on every checkout
+        kwargs["poolclass"] = AsyncAdaptedQueuePool
+    if backend == "postgresql" and make_url(url).get_driver_name() == "asyncpg":
+        kwargs["connect_args"] = {"prepared_statement_cache_size": config.DB_PREPARED_STATEMENT_CACHE_SIZE}
+    if backend == "sqlite" and config.CONTENT_DATABASE_PATH:
+        # ATTACH only accepts URI filenames on connections opened with uri=True
+        kwargs["connect_args"] = {"uri": True}
+
+    engine = create_async_engine(url, **kwargs)
+
+    if backend == "sqlite":
+        pragmas = sqlite_pragmas(config)
+        content_uri = content_database_uri(config.CONTENT_DATABASE_PATH) if config.CONTENT_DATABASE_PATH else None
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            if content_uri is not None:
+                # Unqualified names resolve to main first, then to attached
+                # databases, so content queries need no schema prefix as long
+                # as main holds no content tables (see seed_data.py)
+                cursor.execute("ATTACH DATABASE ? AS content", (content_uri,))
+                if config.SQLITE_MMAP_SIZE is not None:
+                    cursor.execute(f"PRAGMA content.mmap_size={int(config.SQLITE_MMAP_SIZE)}")
+            cursor.close()
+
+    return engine
+
+class RecentWrites:
+    """Remembers recently written training sessions for read-your-writes routing.
+
+    Process-local: with several workers a client may land on one that did not
+    see the write, so keep READ_YOUR_WRITES_SECONDS above the replica lag.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._expires = {}
+        self._next_purge = 0.0
+
+    def mark(self, session_id: int) -> None:
+        now = time.monotonic()
+        self._expires[session_id] = now + self.window_seconds
+        # Sessions that are never read back would otherwise pile up
+        if now >= self._next_purge:
+            self.purge()
+            self._next_purge = now + self.window_seconds
+
+    def is_recent(self, session_id: int) -> bool:
+        expires = self._expires.get(session_id)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            del self._expires[session_id]
+            return False
+        return True
+
+    def purge(self) -> None:
+        now = time.monotonic()
+        self._expires = {k: v for k, v in self._expires.items() if v >= now}
+
+engine = build_engine(settings.DATABASE_URL)
+read_engine = build_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else engine
 
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
+ReadSessionLocal = sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
 
 Base = declarative_base()
 
-async def get_db():
+recent_writes = RecentWrites(settings.READ_YOUR_WRITES_SECONDS)
+
+async def get_write_db():
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
             await session.close()
+
+# The primary; kept under its original name for existing callers and overrides
+get_db = get_write_db
+
+async def get_read_db():
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+def get_read_session_factory():
+    """Sessionmaker for reads that outlive the request, e.g. streamed responses.
+
+    Sessions from get_read_db are closed before a StreamingResponse body runs.
+    """
+    return ReadSessionLocal
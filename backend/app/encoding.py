@@ -0,0 +1,249 @@
+"""Response encoding: ORJSON/MessagePack bodies and gzip/brotli compression.
+
+orjson, msgpack and brotli are in requirements.txt. The imports still
+tolerate their absence: responses then fall back to the standard JSON
+encoder, MessagePack is not offered and compression is gzip only.
+
+Routers opt into negotiation with `route_class=NegotiatedRoute` and
+`default_response_class=FastJSONResponse`: a request whose Accept header lists
+application/msgpack gets the same content as MessagePack, everything else
+gets JSON rendered by orjson. CompressionMiddleware then compresses bodies of
+at least `minimum_size` bytes with the best encoding the client accepts.
+"""
+import gzip
+import json
+import zlib
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.responses import Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+# Already compressed, or streamed in pieces too small to gain from it
+_UNCOMPRESSED_TYPES = ("application/vnd.apache.parquet", "application/zip", "application/gzip", "image/")
+
+_wants_msgpack: ContextVar[bool] = ContextVar("wants_msgpack", default=False)
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    """Media types or encodings of an Accept/Accept-Encoding header with their q values."""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """True if MessagePack is available and the client prefers it to JSON."""
+    if msgpack is None or not accept:
+        return False
+    accepted = _accepted(accept)
+    q = max(accepted.get(t, 0.0) for t in _MSGPACK_TYPES)
+    return q > 0 and q >= accepted.get("application/json", 0.0)
+
+
+def packb(content) -> bytes:
+    return msgpack.packb(content, use_bin_type=True)
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON through orjson, or MessagePack when the route negotiated it."""
+
+    def render(self, content) -> bytes:
+        if _wants_msgpack.get():
+            # Read by init_headers, which runs after render
+            self.media_type = MSGPACK_MEDIA_TYPE
+            return packb(content)
+        return dumps(content)
+
+
+class NegotiatedRoute(APIRoute):
+    """Route that serves MessagePack to clients asking for it.
+
+    Responses rendered from the endpoint's return value go through
+    FastJSONResponse; pre-serialized JSON bodies (pooled payloads) are
+    converted. Streaming responses keep their own format.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            wanted = wants_msgpack(request.headers.get("accept"))
+            token = _wants_msgpack.set(wanted)
+            try:
+                response = await handler(request)
+            finally:
+                _wants_msgpack.reset(token)
+            if (wanted and not isinstance(response, StreamingResponse)
+                    and response.media_type == "application/json"):
+                headers = {k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")}
+                response = Response(packb(json.loads(response.body)), status_code=response.status_code,
+                                    headers=headers, media_type=MSGPACK_MEDIA_TYPE)
+            # The body depends on Accept, so shared caches must key on it
+            response.headers.add_vary_header("Accept")
+            return response
+
+        return negotiated_handler
+
+
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    if not accept_encoding:
+        return None
+    accepted = _accepted(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compressed `data`, flushed so the client can decode it right away."""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def compress(data: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def _add_vary(headers: list, value: bytes) -> None:
+    """Append `value` to the Vary header of raw ASGI headers, adding one if missing."""
+    for i, (name, existing) in enumerate(headers):
+        if name.lower() == b"vary":
+            if value.lower() not in (v.strip().lower() for v in existing.split(b",")):
+                headers[i] = (name, existing + b", " + value)
+            return
+    headers.append((b"vary", value))
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing responses with gzip or brotli.
+
+    Whole bodies under `minimum_size` bytes are sent as they are. Streamed
+    bodies are compressed chunk by chunk, each flushed so NDJSON rows still
+    arrive as they are produced.
+    """
+
+    def __init__(self, app, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                passthrough = (b"content-encoding" in headers
+                               or any(content_type.startswith(t) for t in _UNCOMPRESSED_TYPES))
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held until the first body chunk shows whether compression pays off
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                first, start = start, None
+                if not more_body and len(body) < self.minimum_size:
+                    await send(first)
+                    await send(message)
+                    passthrough = True
+                    return
+                headers = [(k, v) for k, v in first.get("headers", []) if k.lower() != b"content-length"]
+                headers.append((b"content-encoding", encoding.encode()))
+                _add_vary(headers, b"Accept-Encoding")
+                if not more_body:
+                    body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**first, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                await send({**first, "headers": headers})
+
+            data = compressor.chunk(body) if more_body else compressor.chunk(body) + compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
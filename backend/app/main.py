@@ -1,8 +1,43 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import exercises, results
+from app import encoding, metrics, profiling
+from app.config import settings
+from app.database import AsyncSessionLocal, ReadSessionLocal, engine, read_engine
+from app.routers import admin, analytics, exercises, results, training
+from app.services import content_catalog, payload_pool, result_writer
 
-app = FastAPI(title="Brain Training API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Exercise content is static between seeds, so load it once up front
+    async with ReadSessionLocal() as db:
+        await content_catalog.reload_catalog(db)
+    if settings.PAYLOAD_POOL_ENABLED:
+        payload_pool.start(settings.PAYLOAD_POOL_DEPTH, settings.PAYLOAD_POOL_LOW_WATERMARK)
+    if settings.RESULT_INGESTION_MODE == "queued":
+        result_writer.start(
+            AsyncSessionLocal,
+            max_batch=settings.RESULT_QUEUE_MAX_BATCH,
+            flush_interval=settings.RESULT_QUEUE_FLUSH_INTERVAL_MS / 1000,
+            max_size=settings.RESULT_QUEUE_MAX_SIZE,
+            max_retries=settings.RESULT_QUEUE_MAX_RETRIES,
+            retry_backoff=settings.RESULT_QUEUE_RETRY_BACKOFF_MS / 1000,
+        )
+    yield
+    # Flush queued results before the process exits
+    await result_writer.stop()
+    await payload_pool.stop()
+
+app = FastAPI(title="Brain Training API", version="1.0.0", lifespan=lifespan)
+
+if settings.COMPRESSION_MIN_SIZE > 0:
+    # Innermost, so the middlewares around it see the final headers and sizes
+    app.add_middleware(
+        encoding.CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -10,10 +45,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Export-Watermark"],
 )
 
+app.add_middleware(
+    profiling.SqlProfilerMiddleware,
+    header=settings.SQL_PROFILE_HEADER,
+    sample_rate=settings.SQL_PROFILE_SAMPLE_RATE,
+)
+for db_engine in {engine, read_engine}:
+    profiling.instrument_engine(db_engine, settings.SLOW_QUERY_MS, settings.SLOW_QUERY_EXPLAIN)
+
+if settings.METRICS_ENABLED:
+    # Added last so it is outermost and its latency covers CORS handling too
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.instrument_engine(engine, "primary")
+    if read_engine is not engine:
+        metrics.instrument_engine(read_engine, "replica")
+
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 app.include_router(exercises.router)
 app.include_router(results.router)
+app.include_router(training.router)
+app.include_router(analytics.router)
+app.include_router(admin.router)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,236 @@
+"""In-process metrics exposed at /metrics in the Prometheus text format.
+
+Every observation happens on the event loop thread - including SQLAlchemy
+cursor and pool events, which the async engine runs in greenlets on that
+thread - so the counters are plain ints and floats without locks. Histograms
+have fixed buckets: an observation is one bisect and two additions.
+
+Each process keeps its own numbers; with several workers scrape each one.
+"""
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+HTTP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # counts[i] holds observations in (bounds[i-1], bounds[i]]; the last slot is +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Family:
+    """A metric with a fixed set of label names and one child per label values."""
+
+    def __init__(self, kind: str, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=None):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.children: Dict[Tuple[str, ...], object] = {}
+
+    def histogram(self, *labels: str) -> Histogram:
+        child = self.children.get(labels)
+        if child is None:
+            child = self.children[labels] = Histogram(self.buckets)
+        return child
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.children[labels] = self.children.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, child in sorted(self.children.items()):
+            pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, labels)]
+            if self.kind != "histogram":
+                yield f"{self.name}{_labels(pairs)} {_number(child)}"
+                continue
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                yield f"{self.name}_bucket{_labels(pairs + [le])} {cumulative}"
+            yield f"{self.name}_sum{_labels(pairs)} {_number(child.sum)}"
+            yield f"{self.name}_count{_labels(pairs)} {cumulative}"
+
+
+def _labels(pairs: List[str]) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+http_requests = Family("counter", "http_requests_total", "HTTP requests by route template and status",
+                       ("method", "route", "status"))
+http_duration = Family("histogram", "http_request_duration_seconds", "HTTP request latency",
+                       ("method", "route"), HTTP_BUCKETS)
+http_in_flight = Family("gauge", "http_requests_in_flight", "HTTP requests being served", ("method", "route"))
+db_statements = Family("counter", "db_statements_total", "SQL statements executed", ("engine", "operation"))
+db_duration = Family("histogram", "db_statement_duration_seconds", "SQL statement execution time",
+                     ("engine", "operation"), DB_BUCKETS)
+db_checkout_wait = Family("histogram", "db_pool_checkout_wait_seconds",
+                          "Time to obtain a pooled connection, including connecting", ("engine",), DB_BUCKETS)
+
+FAMILIES = [http_requests, http_duration, http_in_flight, db_statements, db_duration, db_checkout_wait]
+
+# (engine label, AsyncEngine) pairs whose pool usage is reported at scrape time
+_engines: List[Tuple[str, AsyncEngine]] = []
+
+
+class RouteTemplates:
+    """Maps a request to the path template of the route that will serve it.
+
+    Mirrors the router's first-match order using the routes' compiled regexes
+    only, without building child scopes; parameterless paths are memoized.
+    """
+
+    def __init__(self, routes):
+        self._routes = [
+            (route.path_regex, getattr(route, "methods", None), route.path, not getattr(route, "param_convertors", None))
+            for route in routes
+            if hasattr(route, "path_regex")
+        ]
+        self._static: Dict[Tuple[str, str], str] = {}
+
+    def resolve(self, method: str, path: str) -> str:
+        template = self._static.get((method, path))
+        if template is not None:
+            return template
+        partial = None
+        for regex, methods, template, static in self._routes:
+            if regex.match(path):
+                if methods is None or method in methods:
+                    if static:
+                        self._static[(method, path)] = template
+                    return template
+                partial = partial or template
+        # Unknown paths share one label so scanners cannot blow up the series count
+        return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; records count, latency and in-flight requests per route."""
+
+    def __init__(self, app):
+        self.app = app
+        self._templates = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self._templates is None:
+            # Routes are complete once the app serves its first request
+            self._templates = RouteTemplates(scope["app"].router.routes)
+        method = scope["method"]
+        route = self._templates.resolve(method, scope["path"])
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_duration.histogram(method, route).observe(time.perf_counter() - started)
+            http_requests.inc(method, route, str(status))
+            http_in_flight.inc(method, route, amount=-1)
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip()[:8].upper()
+    for op in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+        if head.startswith(op):
+            return "SELECT" if op == "WITH" else op
+    return "OTHER"
+
+
+def instrument_engine(engine: AsyncEngine, label: str) -> None:
+    """Time SQL statements and pool checkouts of `engine`."""
+    sync_engine = engine.sync_engine
+    if getattr(sync_engine, "_metrics_label", None) is not None:
+        return
+    sync_engine._metrics_label = label
+    _engines.append((label, engine))
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+        operation = _operation(statement)
+        db_statements.inc(label, operation)
+        db_duration.histogram(label, operation).observe(elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        # after_cursor_execute does not run for failed statements
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    # Pool events fire only once a connection is handed out, so the wait is
+    # measured around raw_connection(), which every Connection goes through
+    raw_connection = sync_engine.raw_connection
+
+    def timed_raw_connection():
+        started = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            db_checkout_wait.histogram(label).observe(time.perf_counter() - started)
+
+    sync_engine.raw_connection = timed_raw_connection
+
+
+def _pool_lines() -> Iterable[str]:
+    yield "# HELP db_pool_connections_in_use Connections currently checked out of the pool"
+    yield "# TYPE db_pool_connections_in_use gauge"
+    for label, engine in _engines:
+        checkedout = getattr(engine.sync_engine.pool, "checkedout", None)
+        if checkedout is not None:
+            yield f'db_pool_connections_in_use{{engine="{label}"}} {checkedout()}'
+
+
+def render() -> str:
+    lines: List[str] = []
+    for family in FAMILIES:
+        lines.extend(family.render())
+    lines.extend(_pool_lines())
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Forget every observation; for tests."""
+    for family in FAMILIES:
+        family.children.clear()
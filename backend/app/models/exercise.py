@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, JSON
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Float, Index
+from sqlalchemy.sql import func
 from app.database import Base
 
 class ExerciseType(Base):
@@ -24,9 +25,18 @@ class ReadingText(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String(200))
     content = Column(Text, nullable=False)
+    # word_count..difficulty are computed from content by services/text_metrics.py
     word_count = Column(Integer)
     source = Column(String(200))
     difficulty = Column(Integer, default=1)
+    syllable_count = Column(Integer)
+    sentence_count = Column(Integer)
+    readability = Column(Float)
+
+    __table_args__ = (
+        # Text selection by difficulty band and length
+        Index("ix_reading_texts_difficulty_word_count", "difficulty", "word_count", "id"),
+    )
 
 class WordList(Base):
     __tablename__ = "word_lists"
@@ -42,3 +52,12 @@ class StroopColor(Base):
     id = Column(Integer, primary_key=True)
     color_name = Column(String(20), nullable=False)
     color_code = Column(String(7), nullable=False)
+
+class ContentMeta(Base):
+    """Checksum of the seeded content; seed_data.py skips an unchanged dataset."""
+    __tablename__ = "content_meta"
+
+    key = Column(String(50), primary_key=True)
+    checksum = Column(String(64), nullable=False)
+    row_count = Column(Integer)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, JSON, Index, LargeBinary
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -9,10 +9,18 @@ class TrainingSession(Base):
     id = Column(Integer, primary_key=True)
     started_at = Column(DateTime, server_default=func.now())
     completed_at = Column(DateTime)
+    # Aggregates kept up to date by services/result_service.apply_results on every write
     total_score = Column(Integer, default=0)
+    result_count = Column(Integer, default=0, server_default="0")
+    best_scores = Column(JSON)  # {exercise_type: best score}
 
     results = relationship("ExerciseResult", back_populates="session")
 
+    # Keyset pagination of GET /api/sessions; see alembic/versions/005_training_sessions_index.py
+    __table_args__ = (
+        Index("ix_training_sessions_started_at", "started_at", "id"),
+    )
+
 class ExerciseResult(Base):
     __tablename__ = "exercise_results"
 
@@ -26,5 +34,16 @@ class ExerciseResult(Base):
     correct_answers = Column(Integer)
     total_questions = Column(Integer)
     details = Column(JSON)  # Changed from JSONB for SQLite compatibility
+    # Packed per-trial arrays (services/trial_codec.py); deferred so only
+    # GET /api/results/{id}/trials loads them
+    trials = deferred(Column(LargeBinary))
 
     session = relationship("TrainingSession", back_populates="results")
+
+    # Keep in sync with alembic/versions/003_exercise_results_indexes.py;
+    # tests/test_db/test_query_plans.py fails if a key query stops using them
+    __table_args__ = (
+        Index("ix_exercise_results_session_id_started_at", "session_id", "started_at"),
+        Index("ix_exercise_results_exercise_type_started_at", "exercise_type", "started_at", "id"),
+        Index("ix_exercise_results_started_at", "started_at", "id"),
+    )
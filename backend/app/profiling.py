@@ -0,0 +1,206 @@
+"""Per-request SQL profiling and the slow-query log.
+
+A request is profiled when it carries the SQL_PROFILE_HEADER header or is
+picked by SQL_PROFILE_SAMPLE_RATE. Every statement it runs - in get_db,
+get_read_db or any other session used while serving it - is recorded with its
+duration and row count, returned in a Server-Timing header and logged to
+"app.sql_profile" as one JSON line.
+
+Independently, any statement slower than SLOW_QUERY_MS is logged to
+"app.slow_query" as JSON with the route that ran it and the EXPLAIN plan,
+taken on the same DBAPI connection so it sees the same transaction.
+"""
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+profile_logger = logging.getLogger("app.sql_profile")
+slow_query_logger = logging.getLogger("app.slow_query")
+
+# Entries sent as individual Server-Timing metrics; the rest only count towards "db"
+SERVER_TIMING_MAX_STATEMENTS = 20
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.statements: List[dict] = []
+
+    @property
+    def db_ms(self) -> float:
+        return sum(s["duration_ms"] for s in self.statements)
+
+    def server_timing(self, total_ms: float) -> str:
+        entries = [
+            f'db;dur={self.db_ms:.3f};desc="{len(self.statements)} statements"',
+            f"total;dur={total_ms:.3f}",
+        ]
+        for i, s in enumerate(self.statements[:SERVER_TIMING_MAX_STATEMENTS], 1):
+            entries.append(f'sql-{i};dur={s["duration_ms"]:.3f};desc="{s["operation"]} rows={s["rows"]}"')
+        return ", ".join(entries)
+
+
+_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+# The ASGI scope of the request being served, for naming the route in slow-query records
+_scope: ContextVar[Optional[dict]] = ContextVar("sql_profile_scope", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _profile.get()
+
+
+class SqlProfilerMiddleware:
+    """Pure ASGI middleware that switches profiling on per request."""
+
+    def __init__(self, app, header: Optional[str] = None, sample_rate: float = 0.0):
+        self.app = app
+        self.header = header.lower().encode("latin-1") if header else None
+        self.sample_rate = sample_rate
+
+    def _wanted(self, scope) -> bool:
+        if self.header is not None:
+            for name, value in scope["headers"]:
+                if name == self.header:
+                    return value.lower() not in (b"0", b"false", b"off")
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        scope_token = _scope.set(scope)
+        try:
+            if not self._wanted(scope):
+                await self.app(scope, receive, send)
+                return
+
+            profile = RequestProfile(scope["method"], scope["path"])
+            started = time.perf_counter()
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    total_ms = (time.perf_counter() - started) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", profile.server_timing(total_ms).encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            token = _profile.set(profile)
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                _profile.reset(token)
+                profile_logger.info(json.dumps({
+                    "event": "sql_profile",
+                    "method": profile.method,
+                    "route": _route(scope),
+                    "db_ms": round(profile.db_ms, 3),
+                    "total_ms": round((time.perf_counter() - started) * 1000, 3),
+                    "statements": profile.statements,
+                }, ensure_ascii=False, default=str))
+        finally:
+            _scope.reset(scope_token)
+
+
+def _route(scope: Optional[dict]) -> Optional[str]:
+    if scope is None:
+        return None
+    # The router stores the matched route in the (shared) scope
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("path")
+
+
+def _operation(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+
+
+def _row_count(cursor) -> int:
+    # The async adapters fetch result rows up front; rowcount is -1 for SELECT on SQLite
+    rows = getattr(cursor, "_rows", None)
+    if rows is not None and cursor.description is not None:
+        return len(rows)
+    return cursor.rowcount
+
+
+def explain(conn, statement: str, parameters) -> str:
+    """EXPLAIN `statement` on the DBAPI connection behind `conn`, bypassing engine events."""
+    dialect = conn.dialect.name
+    dbapi_connection = conn.connection.dbapi_connection
+    cursor = dbapi_connection.cursor()
+    try:
+        if dialect == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+        if dialect == "postgresql":
+            # A failing EXPLAIN must not abort the request's transaction
+            cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(f"EXPLAIN {statement}", parameters)
+                plan = "\n".join(str(row[0]) for row in cursor.fetchall())
+            except Exception:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                raise
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        cursor.execute(f"EXPLAIN {statement}", parameters)
+        return "\n".join(" ".join(str(c) for c in row) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_ms: Optional[float] = None, explain_slow: bool = True) -> None:
+    """Record statements of profiled requests and log slow statements of `engine`."""
+    sync_engine = engine.sync_engine
+    if getattr(sync_engine, "_profiling_instrumented", False):
+        return
+    sync_engine._profiling_instrumented = True
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["profile_started"].pop()) * 1000
+        profile = _profile.get()
+        slow = slow_query_ms is not None and duration_ms >= slow_query_ms
+        if profile is None and not slow:
+            return
+
+        operation = _operation(statement)
+        rows = _row_count(cursor)
+        if profile is not None:
+            profile.statements.append({
+                "operation": operation,
+                "statement": statement,
+                "duration_ms": round(duration_ms, 3),
+                "rows": rows,
+            })
+        if slow:
+            record = {
+                "event": "slow_query",
+                "route": _route(_scope.get()),
+                "duration_ms": round(duration_ms, 3),
+                "rows": rows,
+                "statement": statement,
+                "parameters": repr(parameters)[:500],
+            }
+            if explain_slow and not executemany and operation in ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT"):
+                try:
+                    record["plan"] = explain(conn, statement, parameters)
+                except Exception as exc:
+                    record["plan_error"] = str(exc)
+            slow_query_logger.warning(json.dumps(record, ensure_ascii=False, default=str), extra={"slow_query": record})
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("profile_started") if context.connection is not None else None
+        if started:
+            started.pop()
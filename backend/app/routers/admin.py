@@ -0,0 +1,44 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import get_read_db, get_read_session_factory
+from app.services import export_service
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        # Admin endpoints do not exist unless a token is configured
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/export/results")
+async def export_results(
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    since_id: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+    session_factory=Depends(get_read_session_factory),
+):
+    """Stream exercise_results with id > since_id as CSV or Parquet.
+
+    X-Export-Watermark is the largest id included; pass it as since_id next time.
+    """
+    if format == "parquet" and not export_service.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow on the server")
+    plan = await export_service.plan_export(db, since_id, settings.EXPORT_CHUNK_ROWS)
+
+    async def body():
+        # Own session: the request's get_read_db session is gone once streaming starts
+        async with session_factory() as stream_db:
+            async for chunk in export_service.export_chunks(format, stream_db, plan, settings.EXPORT_CHUNK_ROWS):
+                yield chunk
+
+    filename = f"exercise_results_{plan.since_id}_{plan.watermark}.{format}"
+    return StreamingResponse(body(), media_type=export_service.FORMATS[format], headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Export-Watermark": str(plan.watermark),
+    })
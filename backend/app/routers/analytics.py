@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_read_db
+from app.models.result import TrainingSession
+from app.routers.results import get_session_db
+from app.schemas.exercise import SessionMetricsOut, MetricsHistoryOut
+from app.services import cognitive_metrics
+
+router = APIRouter(prefix="/api", tags=["analytics"])
+
+@router.get("/sessions/{session_id}/metrics", response_model=SessionMetricsOut)
+async def get_session_metrics(session_id: int, db: AsyncSession = Depends(get_session_db)):
+    """Metrics computed from the session's stored results, not the client's scores."""
+    if await db.scalar(select(TrainingSession.id).where(TrainingSession.id == session_id)) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return await cognitive_metrics.session_metrics(db, session_id)
+
+@router.get("/metrics/history", response_model=MetricsHistoryOut)
+async def get_metrics_history(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Distribution (mean, median, p10, p90) of each metric across sessions started in [since, until)."""
+    metrics = await cognitive_metrics.history_summary(db, since, until)
+    return MetricsHistoryOut(since=since, until=until, metrics=metrics)
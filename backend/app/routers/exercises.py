@@ -1,28 +1,79 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
+from app.database import get_read_db, get_write_db, recent_writes, ReadSessionLocal
+from app.encoding import FastJSONResponse, NegotiatedRoute
 from app.schemas.exercise import (
-    ArithmeticResponse, ReadingTextOut, StroopResponse, MemoryWordsResponse
+    ArithmeticResponse, ReadingTextOut, StroopResponse, MemoryWordsResponse, GradeRequest, GradeResponse
 )
-from app.services import math_service, stroop_service, reading_service, memory_service
+from app.services import math_service, stroop_service, reading_service, memory_service, payload_pool, grading_service
+from app.services.text_metrics import MAX_DIFFICULTY
 
-router = APIRouter(prefix="/api/exercises", tags=["exercises"])
+router = APIRouter(prefix="/api/exercises", tags=["exercises"], route_class=NegotiatedRoute,
+                   default_response_class=FastJSONResponse)
+
+async def build_arithmetic_payload(session_factory=ReadSessionLocal) -> bytes:
+    if math_service.uses_generator():
+        return math_service.generate_payload(count=math_service.ARITHMETIC_TEST_ITEMS)
+    async with session_factory() as db:
+        problems = await math_service.get_random_problems(db, count=math_service.ARITHMETIC_TEST_ITEMS)
+    return ArithmeticResponse(problems=problems, time_limit_seconds=120).model_dump_json().encode()
+
+async def build_stroop_payload(session_factory=ReadSessionLocal) -> bytes:
+    async with session_factory() as db:
+        return await stroop_service.generate_stroop_payload(db, count=stroop_service.STROOP_TEST_ITEMS)
+
+payload_pool.register("arithmetic", build_arithmetic_payload)
+payload_pool.register("stroop", build_stroop_payload)
 
 @router.get("/arithmetic", response_model=ArithmeticResponse)
-async def get_arithmetic_problems(db: AsyncSession = Depends(get_db)):
-    problems = await math_service.get_random_problems(db, count=50)
-    return ArithmeticResponse(problems=problems, time_limit_seconds=120)
+async def get_arithmetic_problems(db: AsyncSession = Depends(get_read_db)):
+    pool = payload_pool.get_pool("arithmetic")
+    if pool is not None:
+        return Response(content=await pool.take(), media_type="application/json")
+    test_id = math_service.new_test_id() if math_service.uses_generator() else None
+    problems = await math_service.get_random_problems(db, count=math_service.ARITHMETIC_TEST_ITEMS, seed=test_id)
+    return ArithmeticResponse(problems=problems, time_limit_seconds=120, test_id=test_id)
 
 @router.get("/reading", response_model=ReadingTextOut)
-async def get_reading_text(db: AsyncSession = Depends(get_db)):
-    return await reading_service.get_random_text(db)
+async def get_reading_text(
+    min_words: Optional[int] = Query(None, ge=0),
+    max_words: Optional[int] = Query(None, ge=0),
+    min_difficulty: Optional[int] = Query(None, ge=1, le=MAX_DIFFICULTY),
+    max_difficulty: Optional[int] = Query(None, ge=1, le=MAX_DIFFICULTY),
+    db: AsyncSession = Depends(get_read_db),
+):
+    try:
+        return await reading_service.get_random_text(db, min_words, max_words, min_difficulty, max_difficulty)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="No reading text matches the requested ranges")
 
 @router.get("/stroop", response_model=StroopResponse)
-async def get_stroop_test(db: AsyncSession = Depends(get_db)):
-    items = await stroop_service.generate_stroop_test(db, count=50)
-    return StroopResponse(items=items, time_limit_seconds=120)
+async def get_stroop_test(db: AsyncSession = Depends(get_read_db)):
+    pool = payload_pool.get_pool("stroop")
+    if pool is not None:
+        return Response(content=await pool.take(), media_type="application/json")
+    test_id = stroop_service.new_test_id()
+    items = await stroop_service.generate_stroop_test(db, count=stroop_service.STROOP_TEST_ITEMS, seed=test_id)
+    return StroopResponse(items=items, time_limit_seconds=120, test_id=test_id)
 
 @router.get("/memory-words", response_model=MemoryWordsResponse)
-async def get_memory_words(db: AsyncSession = Depends(get_db)):
-    words = await memory_service.get_memory_words(db, word_count=12)
+async def get_memory_words(session_id: Optional[int] = None, db: AsyncSession = Depends(get_read_db)):
+    words = await memory_service.get_memory_words(db, word_count=12, session_id=session_id)
     return MemoryWordsResponse(words=words)
+
+@router.post("/{exercise_type}/grade", response_model=GradeResponse)
+async def grade_test(exercise_type: str, data: GradeRequest, db: AsyncSession = Depends(get_write_db)):
+    """Grade a submitted answer set against the server's key and store the result."""
+    if exercise_type not in grading_service.GRADED_TYPES:
+        raise HTTPException(status_code=404, detail="Exercise type cannot be graded")
+    try:
+        graded = await grading_service.grade(db, exercise_type, data)
+    except grading_service.GradingError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    recent_writes.mark(graded.session_id)
+    return graded
+
+@router.get("/pools")
+async def get_pool_stats():
+    return payload_pool.stats()
@@ -1,59 +1,191 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from app.database import get_db
+from app.database import get_write_db, get_read_db, get_read_session_factory, recent_writes
+from app.encoding import FastJSONResponse, NegotiatedRoute
 from app.models.result import TrainingSession, ExerciseResult
-from app.schemas.exercise import ExerciseResultCreate, ExerciseResultOut, SessionOut, SessionCreate
+from app.schemas.exercise import (
+    ExerciseResultCreate, ExerciseResultOut, SessionOut, SessionCreate,
+    ExerciseResultBatchCreate, ExerciseResultBatchOut, ExerciseResultAccepted,
+    ExerciseResultListItem, ExerciseResultPage, SessionSummary, SessionPage, TrialsOut
+)
+from app.services import result_service, result_writer, history_service, trial_codec
 
-router = APIRouter(prefix="/api", tags=["results"])
+router = APIRouter(prefix="/api", tags=["results"], route_class=NegotiatedRoute, default_response_class=FastJSONResponse)
+
+async def get_session_db(
+    session_id: int,
+    read_db: AsyncSession = Depends(get_read_db),
+    write_db: AsyncSession = Depends(get_write_db),
+) -> AsyncSession:
+    """Read from the replica unless this session was just written (read-your-writes)."""
+    return write_db if recent_writes.is_recent(session_id) else read_db
+
+NDJSON = "application/x-ndjson"
+# Rows fetched per round trip from the server-side cursor when streaming
+STREAM_CHUNK_ROWS = 500
+
+def wants_ndjson(request: Request, format: Optional[str]) -> bool:
+    if format is not None:
+        return format == "ndjson"
+    return NDJSON in request.headers.get("accept", "")
+
+def build_listing(db: AsyncSession, query, **filters):
+    try:
+        return query(db.get_bind().dialect.name, **filters)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+async def fetch_page(db: AsyncSession, stmt, limit: int, item_model):
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = history_service.encode_cursor(rows[-1].cursor_key, rows[-1].id)
+    return [item_model.model_validate(dict(row._mapping)) for row in rows], next_cursor
+
+def stream_ndjson(session_factory, stmt, item_model) -> StreamingResponse:
+    """Stream every matching row as one JSON object per line from a server-side cursor."""
+    async def lines():
+        # Own session: the request's get_read_db session is gone once streaming starts
+        async with session_factory() as db:
+            result = await db.stream(stmt.execution_options(yield_per=STREAM_CHUNK_ROWS))
+            async for partition in result.partitions():
+                yield "".join(
+                    item_model.model_validate(dict(row._mapping)).model_dump_json() + "\n" for row in partition
+                ).encode()
+
+    return StreamingResponse(lines(), media_type=NDJSON)
+
+@router.get("/sessions", response_model=SessionPage, responses={200: {"content": {NDJSON: {}}}})
+async def list_sessions(
+    request: Request,
+    exercise_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_read_db),
+    session_factory=Depends(get_read_session_factory),
+):
+    """Sessions newest first. Pass next_cursor back as `cursor` for the next page;
+    NDJSON (format=ndjson or Accept: application/x-ndjson) streams every page at once."""
+    stmt = build_listing(
+        db, history_service.sessions_query, exercise_type=exercise_type, since=since, until=until, cursor=cursor
+    )
+    if wants_ndjson(request, format):
+        return stream_ndjson(session_factory, stmt, SessionSummary)
+    items, next_cursor = await fetch_page(db, stmt, limit, SessionSummary)
+    return SessionPage(items=items, next_cursor=next_cursor)
+
+@router.get("/results", response_model=ExerciseResultPage, responses={200: {"content": {NDJSON: {}}}})
+async def list_results(
+    request: Request,
+    exercise_type: Optional[str] = None,
+    session_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_read_db),
+    session_factory=Depends(get_read_session_factory),
+):
+    """Exercise results newest first, paginated like GET /api/sessions."""
+    stmt = build_listing(
+        db, history_service.results_query,
+        exercise_type=exercise_type, session_id=session_id, since=since, until=until, cursor=cursor,
+    )
+    if wants_ndjson(request, format):
+        return stream_ndjson(session_factory, stmt, ExerciseResultListItem)
+    items, next_cursor = await fetch_page(db, stmt, limit, ExerciseResultListItem)
+    return ExerciseResultPage(items=items, next_cursor=next_cursor)
 
 @router.post("/sessions", response_model=SessionOut)
-async def create_session(db: AsyncSession = Depends(get_db)):
+async def create_session(db: AsyncSession = Depends(get_write_db)):
     session = TrainingSession()
     db.add(session)
     await db.commit()
     await db.refresh(session)
+    recent_writes.mark(session.id)
     return SessionOut(id=session.id, total_score=0, results=[])
 
-@router.post("/results", response_model=ExerciseResultOut)
-async def save_result(data: ExerciseResultCreate, db: AsyncSession = Depends(get_db)):
+@router.post("/results", response_model=ExerciseResultOut, responses={202: {"model": ExerciseResultAccepted}})
+async def save_result(data: ExerciseResultCreate, db: AsyncSession = Depends(get_write_db)):
+    # In queued ingestion mode the background writer persists the result
+    writer = result_writer.get_writer()
+    if writer is not None:
+        try:
+            ticket = writer.submit(data)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Result queue is full")
+        if data.session_id is not None:
+            recent_writes.mark(data.session_id)
+        return JSONResponse(status_code=202, content=ExerciseResultAccepted(ticket=ticket).model_dump())
+
     session_id = data.session_id
 
     # If session_id not provided, create a new training session so results are not orphaned.
     if session_id is None:
-        new_session = TrainingSession()
-        db.add(new_session)
-        await db.commit()
-        await db.refresh(new_session)
-        session_id = new_session.id
-
-    result = ExerciseResult(
-        session_id=session_id,
-        exercise_type=data.exercise_type,
-        score=data.score,
-        time_seconds=data.time_seconds,
-        correct_answers=data.correct_answers,
-        total_questions=data.total_questions,
-        details=data.details
-    )
+        session_id = await result_service.create_session(db)
+
+    row = result_service.result_row(session_id, data)
+    result = ExerciseResult(**row)
     db.add(result)
+    await db.flush()
+    await result_service.apply_results(db, [row])
     await db.commit()
-    await db.refresh(result)
+    recent_writes.mark(session_id)
 
     return result
 
+@router.post("/results/batch", response_model=ExerciseResultBatchOut)
+async def save_results_batch(data: ExerciseResultBatchCreate, db: AsyncSession = Depends(get_write_db)):
+    """Save every result of a training run in one transaction."""
+    session_id = data.session_id
+    if session_id is None:
+        session_id = await result_service.create_session(db)
+
+    ids = await result_service.insert_results(db, (result_service.result_row(session_id, r) for r in data.results))
+    await db.commit()
+    recent_writes.mark(session_id)
+
+    return ExerciseResultBatchOut(session_id=session_id, ids=ids)
+
+@router.get("/results/{result_id}/trials", response_model=TrialsOut)
+async def get_result_trials(result_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Per-trial arrays of one result, decoded from their packed column."""
+    row = (await db.execute(
+        select(ExerciseResult.id, ExerciseResult.trials).where(ExerciseResult.id == result_id)
+    )).one_or_none()
+    if row is None or row.trials is None:
+        raise HTTPException(status_code=404, detail="Trials not found")
+    return TrialsOut(result_id=row.id, **trial_codec.decode_trials(row.trials))
+
+@router.get("/results/queue")
+async def get_result_queue_stats():
+    writer = result_writer.get_writer()
+    if writer is None:
+        return {"mode": "sync"}
+    return {"mode": "queued", **writer.stats()}
+
 @router.get("/sessions/{session_id}", response_model=SessionOut)
-async def get_session(session_id: int, db: AsyncSession = Depends(get_db)):
-    stmt = select(TrainingSession).where(TrainingSession.id == session_id).options(selectinload(TrainingSession.results))
+async def get_session(session_id: int, include_results: bool = False, db: AsyncSession = Depends(get_session_db)):
+    """Session aggregates from a single row; pass include_results=true for the result list."""
+    stmt = select(TrainingSession).where(TrainingSession.id == session_id)
+    if include_results:
+        stmt = stmt.options(selectinload(TrainingSession.results))
     result = await db.execute(stmt)
     session = result.scalar_one_or_none()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    
-    # Calculate total score from results
-    total_score = sum(r.score for r in session.results) if session.results else 0
-    
+
     # Convert results to ExerciseResultOut
     result_list = [
         ExerciseResultOut(
@@ -64,6 +196,14 @@ async def get_session(session_id: int, db: AsyncSession = Depends(get_db)):
             correct_answers=r.correct_answers,
             total_questions=r.total_questions
         ) for r in session.results
-    ]
+    ] if include_results else []
 
-    return SessionOut(id=session.id, total_score=total_score, results=result_list)
+    return SessionOut(
+        id=session.id,
+        total_score=session.total_score or 0,
+        result_count=session.result_count or 0,
+        best_scores=session.best_scores or {},
+        started_at=session.started_at,
+        completed_at=session.completed_at,
+        results=result_list
+    )
@@ -0,0 +1,56 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_write_db, get_read_session_factory, recent_writes
+from app.encoding import FastJSONResponse, NegotiatedRoute
+from app.routers.exercises import build_arithmetic_payload, build_stroop_payload
+from app.schemas.exercise import MemoryWordsResponse, TrainingBundle
+from app.services import memory_service, payload_pool, reading_service, result_service
+
+router = APIRouter(prefix="/api/training", tags=["training"], route_class=NegotiatedRoute,
+                   default_response_class=FastJSONResponse)
+
+async def pooled_payload(name: str, build, session_factory) -> bytes:
+    pool = payload_pool.get_pool(name)
+    if pool is not None:
+        return await pool.take()
+    return await build(session_factory)
+
+async def reading_payload(session_factory) -> bytes:
+    async with session_factory() as db:
+        return (await reading_service.get_random_text(db)).model_dump_json().encode()
+
+async def session_and_memory_payload(db: AsyncSession, session_factory):
+    session_id = await result_service.create_session(db)
+    await db.commit()
+    recent_writes.mark(session_id)
+    # The words are recorded as seen by the new session
+    async with session_factory() as read_db:
+        words = await memory_service.get_memory_words(read_db, word_count=12, session_id=session_id)
+    return session_id, MemoryWordsResponse(words=words).model_dump_json().encode()
+
+@router.get("/bundle", response_model=TrainingBundle)
+async def get_training_bundle(db: AsyncSession = Depends(get_write_db),
+                              session_factory=Depends(get_read_session_factory)):
+    """Create a session and return every exercise's content in one response.
+
+    The parts are fetched concurrently, each on its own session (or from the
+    payload pools and content catalog), and the pre-serialized bodies are
+    spliced into the response without being parsed again.
+    """
+    try:
+        (session_id, memory_words), arithmetic, reading, stroop = await asyncio.gather(
+            session_and_memory_payload(db, session_factory),
+            pooled_payload("arithmetic", build_arithmetic_payload, session_factory),
+            reading_payload(session_factory),
+            pooled_payload("stroop", build_stroop_payload, session_factory),
+        )
+    except LookupError:
+        raise HTTPException(status_code=503, detail="Exercise content is not loaded")
+    body = b"".join((
+        b'{"session_id":%d,"arithmetic":' % session_id, arithmetic,
+        b',"reading":', reading,
+        b',"stroop":', stroop,
+        b',"memory_words":', memory_words, b"}",
+    ))
+    return Response(content=body, media_type="application/json")
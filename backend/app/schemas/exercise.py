@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Annotated, Dict, List, Optional, Union
 
 class MathProblemOut(BaseModel):
     id: int
@@ -9,12 +10,16 @@ class MathProblemOut(BaseModel):
 class ArithmeticResponse(BaseModel):
     problems: List[MathProblemOut]
     time_limit_seconds: int = 120
+    # Generated tests: identifies the test for POST /api/exercises/arithmetic/grade
+    test_id: Optional[int] = None
 
 class ReadingTextOut(BaseModel):
     id: int
     title: Optional[str]
     content: str
     word_count: Optional[int]
+    difficulty: Optional[int] = None
+    readability: Optional[float] = None
 
 class StroopItem(BaseModel):
     id: int
@@ -25,20 +30,64 @@ class StroopItem(BaseModel):
 class StroopResponse(BaseModel):
     items: List[StroopItem]
     time_limit_seconds: int = 120
+    # Identifies the test for POST /api/exercises/stroop/grade
+    test_id: Optional[int] = None
 
 class MemoryWordsResponse(BaseModel):
     words: List[str]
     memorize_time_seconds: int = 60
     recall_time_seconds: int = 120
 
-class ExerciseResultCreate(BaseModel):
-    session_id: Optional[int] = None
+class TrainingBundle(BaseModel):
+    """A new session and the content of every exercise, for starting a run in one request."""
+    session_id: int
+    arithmetic: ArithmeticResponse
+    reading: ReadingTextOut
+    stroop: StroopResponse
+    memory_words: MemoryWordsResponse
+
+MAX_TRIALS = 10_000
+
+class TrialData(BaseModel):
+    """Per-trial arrays of one exercise, index-aligned; stored packed (services/trial_codec.py)."""
+    # Stored as uint32 microseconds
+    latency_ms: List[Annotated[float, Field(ge=0, lt=4_294_967)]] = Field(max_length=MAX_TRIALS)
+    correct: List[bool] = Field(max_length=MAX_TRIALS)
+    item_ids: Optional[List[Annotated[int, Field(ge=0, lt=2**32)]]] = Field(None, max_length=MAX_TRIALS)
+
+    @model_validator(mode="after")
+    def same_length(self):
+        count = len(self.latency_ms)
+        if len(self.correct) != count or (self.item_ids is not None and len(self.item_ids) != count):
+            raise ValueError("latency_ms, correct and item_ids must have the same length")
+        return self
+
+class TrialsOut(TrialData):
+    result_id: int
+
+class ExerciseResultData(BaseModel):
     exercise_type: str
     score: int
     time_seconds: float
     correct_answers: int
     total_questions: int
     details: Optional[dict] = None
+    trials: Optional[TrialData] = None
+
+class ExerciseResultCreate(ExerciseResultData):
+    session_id: Optional[int] = None
+
+class ExerciseResultBatchCreate(BaseModel):
+    session_id: Optional[int] = None
+    results: List[ExerciseResultData] = Field(min_length=1)
+
+class ExerciseResultBatchOut(BaseModel):
+    session_id: int
+    ids: List[int]
+
+class ExerciseResultAccepted(BaseModel):
+    ticket: str
+    status: str = "accepted"
 
 class ExerciseResultOut(BaseModel):
     id: int
@@ -51,7 +100,88 @@ class ExerciseResultOut(BaseModel):
 class SessionCreate(BaseModel):
     pass
 
-class SessionOut(BaseModel):
+class ExerciseResultListItem(ExerciseResultOut):
+    session_id: Optional[int] = None
+    started_at: Optional[datetime] = None
+
+class ExerciseResultPage(BaseModel):
+    items: List[ExerciseResultListItem]
+    next_cursor: Optional[str] = None
+
+class SessionSummary(BaseModel):
     id: int
     total_score: int
+    result_count: int = 0
+    best_scores: Dict[str, int] = {}
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    @field_validator("total_score", "result_count", "best_scores", mode="before")
+    @classmethod
+    def null_as_empty(cls, value, info):
+        # Columns are NULL for sessions that have no results yet
+        if value is None:
+            return {} if info.field_name == "best_scores" else 0
+        return value
+
+class SessionPage(BaseModel):
+    items: List[SessionSummary]
+    next_cursor: Optional[str] = None
+
+class SessionOut(SessionSummary):
     results: List[ExerciseResultOut] = []
+
+class SessionMetricsOut(BaseModel):
+    """Server-side metrics of one session (services/cognitive_metrics.py); null without input"""
+    session_id: int
+    arithmetic_per_minute: Optional[float] = None
+    reading_wpm: Optional[float] = None
+    memory_recall_rate: Optional[float] = None
+    stroop_interference_ms: Optional[float] = None
+
+class MetricSummary(BaseModel):
+    sessions: int
+    mean: Optional[float] = None
+    median: Optional[float] = None
+    p10: Optional[float] = None
+    p90: Optional[float] = None
+
+class MetricsHistoryOut(BaseModel):
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    metrics: Dict[str, MetricSummary]
+
+class GradeAnswer(BaseModel):
+    id: int  # problem id (arithmetic) or item id (stroop)
+    answer: Union[int, str, None] = None
+    latency_ms: Optional[float] = Field(None, ge=0, lt=4_294_967)
+
+class GradeRequest(BaseModel):
+    session_id: Optional[int] = None
+    time_seconds: float
+    # The test_id of the graded test; required for Stroop and generated arithmetic
+    test_id: Optional[int] = None
+    # Questions shown; defaults to the test size
+    total_questions: Optional[int] = Field(None, ge=0)
+    answers: List[GradeAnswer] = Field(max_length=MAX_TRIALS)
+
+    @model_validator(mode="after")
+    def unique_ids(self):
+        if len({a.id for a in self.answers}) != len(self.answers):
+            raise ValueError("Each question can be answered once")
+        if self.total_questions is not None and self.total_questions < len(self.answers):
+            raise ValueError("total_questions is smaller than the number of answers")
+        return self
+
+class GradedItem(BaseModel):
+    id: int
+    correct: bool
+    expected: Union[int, str, None] = None
+
+class GradeResponse(BaseModel):
+    result_id: int
+    session_id: int
+    score: int
+    correct_answers: int
+    total_questions: int
+    items: List[GradedItem]
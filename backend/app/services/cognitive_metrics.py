@@ -0,0 +1,182 @@
+"""Server-side cognitive metrics computed from stored results with NumPy.
+
+Per session:
+
+    arithmetic_per_minute   correct answers per minute of arithmetic
+    reading_wpm             words per minute; the text is details["text_id"]
+                            of the reading result, its word_count comes from
+                            reading_texts
+    memory_recall_rate      recalled / presented words
+    stroop_interference_ms  Stroop time per item minus reading time per word
+                            in the same session
+
+Every Stroop item is incongruent (the display colour never matches the word),
+so there is no congruent condition to subtract; the session's own word
+reading pace is the baseline, as in Stroop's original reading-vs-naming
+comparison.
+
+Sessions are processed in id order, `batch_sessions` at a time: one query
+per batch loads the result columns, and each metric is a few bincount/divide
+operations over the whole batch. A session with several results of one type
+uses their totals. Metrics without their inputs are NaN (null in JSON).
+"""
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Optional
+import numpy as np
+from sqlalchemy import case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.exercise import ReadingText
+from app.models.result import ExerciseResult, TrainingSession
+from app.services.history_service import started_at_key, bind_started_at
+
+METRIC_NAMES = ("arithmetic_per_minute", "reading_wpm", "memory_recall_rate", "stroop_interference_ms")
+BATCH_SESSIONS = 5000
+
+# exercise_type -> small int code; other types are loaded as -1 and ignored
+_TYPE_CODES = {"arithmetic": 0, "reading": 1, "memory": 2, "stroop": 3}
+
+
+class SessionMetrics:
+    """Metric columns for a batch of sessions, index-aligned with session_ids."""
+
+    def __init__(self, session_ids: np.ndarray, values: Dict[str, np.ndarray]):
+        self.session_ids = session_ids
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.session_ids)
+
+    def rows(self):
+        """Per-session dicts with NaN as None."""
+        columns = [self.values[name].tolist() for name in METRIC_NAMES]
+        for i, session_id in enumerate(self.session_ids.tolist()):
+            yield {"session_id": session_id, **{
+                name: None if column[i] != column[i] else column[i] for name, column in zip(METRIC_NAMES, columns)
+            }}
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray, scale: float = 1.0) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = numerator * scale / denominator
+    result[denominator <= 0] = np.nan
+    return result
+
+
+def compute(session_ids: np.ndarray, result_session: np.ndarray, types: np.ndarray, time_seconds: np.ndarray,
+            correct: np.ndarray, total: np.ndarray, words: np.ndarray) -> SessionMetrics:
+    """Metrics for `session_ids` from result columns (one element per result).
+
+    `result_session` must only hold ids from the sorted `session_ids`; `words`
+    is the word count of the text read, NaN for other results.
+    """
+    index = np.searchsorted(session_ids, result_session)
+    n = len(session_ids)
+
+    def per_session(mask: np.ndarray, column: np.ndarray) -> np.ndarray:
+        return np.bincount(index[mask], weights=column[mask], minlength=n)
+
+    arithmetic = types == _TYPE_CODES["arithmetic"]
+    memory = types == _TYPE_CODES["memory"]
+    stroop = types == _TYPE_CODES["stroop"]
+    # Reading results whose text is unknown cannot give a pace
+    reading = (types == _TYPE_CODES["reading"]) & ~np.isnan(words)
+
+    reading_words = per_session(reading, words)
+    reading_time = per_session(reading, time_seconds)
+    stroop_ms_per_item = _ratio(per_session(stroop, time_seconds), per_session(stroop, total), 1000)
+    return SessionMetrics(session_ids, {
+        "arithmetic_per_minute": _ratio(per_session(arithmetic, correct), per_session(arithmetic, time_seconds), 60),
+        "reading_wpm": _ratio(reading_words, reading_time, 60),
+        "memory_recall_rate": _ratio(per_session(memory, correct), per_session(memory, total)),
+        "stroop_interference_ms": stroop_ms_per_item - _ratio(reading_time, reading_words, 1000),
+    })
+
+
+def _session_filter(stmt, dialect: str, since: Optional[datetime], until: Optional[datetime]):
+    # Compared like the history listings, see history_service.started_at_key
+    key = started_at_key(TrainingSession.started_at, dialect)
+    if since is not None:
+        stmt = stmt.where(key >= bind_started_at(since, dialect))
+    if until is not None:
+        stmt = stmt.where(key < bind_started_at(until, dialect))
+    return stmt
+
+
+def batch_query(first_session_id: int, last_session_id: int):
+    """Result columns of the sessions in an id range, all numeric."""
+    text_id = ExerciseResult.details["text_id"].as_integer()
+    return (
+        select(
+            ExerciseResult.session_id,
+            case(_TYPE_CODES, value=ExerciseResult.exercise_type, else_=-1),
+            ExerciseResult.time_seconds,
+            ExerciseResult.correct_answers,
+            ExerciseResult.total_questions,
+            ReadingText.word_count,
+        )
+        .outerjoin(ReadingText, (ExerciseResult.exercise_type == "reading") & (ReadingText.id == text_id))
+        # No exercise_type filter: it would steer SQLite to the exercise_type index and
+        # scan every result of those types per batch; other types come back as -1
+        .where(ExerciseResult.session_id >= first_session_id, ExerciseResult.session_id <= last_session_id)
+    )
+
+
+async def load_batch(db: AsyncSession, session_ids: np.ndarray) -> SessionMetrics:
+    """Metrics for a sorted array of session ids, from one query."""
+    stmt = batch_query(int(session_ids[0]), int(session_ids[-1]))
+    # Core execution: the ORM result layer costs more than the arithmetic here
+    rows = (await (await db.connection()).execute(stmt)).all()
+    # Every selected column is numeric, so the rows become one float matrix; NULL -> NaN.
+    # Plain tuples: numpy probes Row objects for array attributes, which is slow
+    columns = np.array(list(map(tuple, rows)), dtype=np.float64).reshape(-1, 6).T
+    result_session = columns[0].astype(np.int64)
+    # Sessions inside the id range that the batch filtered out (by date) are dropped
+    keep = np.isin(result_session, session_ids)
+    return compute(session_ids, result_session[keep], columns[1][keep].astype(np.int8), *columns[2:, keep])
+
+
+async def iter_session_metrics(db: AsyncSession, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                               batch_sessions: int = BATCH_SESSIONS) -> AsyncIterator[SessionMetrics]:
+    """Metrics of every session (optionally by start date) in id order, a batch at a time."""
+    dialect = db.get_bind().dialect.name
+    after = 0
+    while True:
+        stmt = _session_filter(select(TrainingSession.id), dialect, since, until)
+        stmt = stmt.where(TrainingSession.id > after).order_by(TrainingSession.id).limit(batch_sessions)
+        session_ids = np.array((await db.scalars(stmt)).all(), dtype=np.int64)
+        if not len(session_ids):
+            return
+        yield await load_batch(db, session_ids)
+        after = int(session_ids[-1])
+
+
+async def session_metrics(db: AsyncSession, session_id: int) -> Dict[str, Optional[float]]:
+    batch = await load_batch(db, np.array([session_id], dtype=np.int64))
+    return next(batch.rows())
+
+
+def summarize(values: np.ndarray) -> Dict[str, Optional[float]]:
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {"sessions": 0, "mean": None, "median": None, "p10": None, "p90": None}
+    p10, median, p90 = np.percentile(values, [10, 50, 90]).tolist()
+    return {"sessions": int(len(values)), "mean": float(values.mean()), "median": median, "p10": p10, "p90": p90}
+
+
+async def history_summary(db: AsyncSession, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                          batch_sessions: int = BATCH_SESSIONS,
+                          on_batch: Optional[Callable[[SessionMetrics], None]] = None) -> Dict[str, dict]:
+    """Distribution of each metric across sessions; keeps one float per session and metric.
+
+    on_batch, if given, sees every batch of per-session metrics as it is computed.
+    """
+    parts: Dict[str, list] = {name: [] for name in METRIC_NAMES}
+    async for batch in iter_session_metrics(db, since, until, batch_sessions):
+        if on_batch is not None:
+            on_batch(batch)
+        for name in METRIC_NAMES:
+            parts[name].append(batch.values[name])
+    return {
+        name: summarize(np.concatenate(chunks) if chunks else np.empty(0))
+        for name, chunks in parts.items()
+    }
@@ -0,0 +1,185 @@
+import random
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from app.config import settings
+from app.models.exercise import MathProblem, ReadingText, WordList, StroopColor
+from app.services import payload_pool
+
+
+class ContentCatalog:
+    """Read-only snapshot of exercise content held in compact parallel tuples.
+
+    The content tables only change when seed_data.py runs, so they are loaded
+    once and sampled in memory instead of running ORDER BY random() per request.
+    """
+
+    def __init__(self):
+        # False when math_problems is too large to mirror; see MATH_CATALOG_MAX_ROWS
+        self.math_in_memory = True
+        self.math_ids: Tuple[int, ...] = ()
+        self.math_expressions: Tuple[str, ...] = ()
+        self.math_answers: Tuple[int, ...] = ()
+
+        self.text_ids: Tuple[int, ...] = ()
+        self.text_titles: Tuple[Optional[str], ...] = ()
+        self.text_contents: Tuple[str, ...] = ()
+        self.text_word_counts: Tuple[Optional[int], ...] = ()
+        self.text_difficulties: Tuple[Optional[int], ...] = ()
+        self.text_readability: Tuple[Optional[float], ...] = ()
+        # difficulty -> (word counts ascending, matching text indices), for range selection
+        self._text_bands: Dict[int, Tuple[List[int], List[int]]] = {}
+
+        self.word_lists: Tuple[Tuple[str, ...], ...] = ()
+        # Flat word index: every distinct word once, tagged with the index of its
+        # (first) category; category_words[c] lists the word indices of category c
+        self.words: Tuple[str, ...] = ()
+        self.word_categories: Tuple[int, ...] = ()
+        self.categories: Tuple[str, ...] = ()
+        self.category_words: Tuple[Tuple[int, ...], ...] = ()
+        # Bitmask of each category's word indices
+        self.category_masks: Tuple[int, ...] = ()
+
+        self.color_names: Tuple[str, ...] = ()
+        self.color_codes: Tuple[str, ...] = ()
+
+        self._math_answer_index: Optional[Dict[int, int]] = None
+
+    async def load(self, db: AsyncSession) -> None:
+        math_rows = (await db.execute(select(func.count()).select_from(MathProblem))).scalar_one()
+        self.math_in_memory = math_rows <= settings.MATH_CATALOG_MAX_ROWS
+        if self.math_in_memory:
+            rows = (await db.execute(
+                select(MathProblem.id, MathProblem.expression, MathProblem.answer).order_by(MathProblem.id)
+            )).all()
+            self.math_ids, self.math_expressions, self.math_answers = _columns(rows, 3)
+
+        rows = (await db.execute(
+            select(ReadingText.id, ReadingText.title, ReadingText.content, ReadingText.word_count,
+                   ReadingText.difficulty, ReadingText.readability)
+            .order_by(ReadingText.id)
+        )).all()
+        (self.text_ids, self.text_titles, self.text_contents, self.text_word_counts,
+         self.text_difficulties, self.text_readability) = _columns(rows, 6)
+        self._index_texts()
+
+        rows = (await db.execute(select(WordList.category, WordList.words).order_by(WordList.id))).all()
+        self.set_word_lists(rows)
+
+        rows = (await db.execute(
+            select(StroopColor.color_name, StroopColor.color_code).order_by(StroopColor.id)
+        )).all()
+        self.color_names, self.color_codes = _columns(rows, 2)
+
+    def set_word_lists(self, rows) -> None:
+        """Load (category, words) rows in id order and build the flat word index."""
+        self.word_lists = tuple(tuple(words) for _, words in rows)
+        categories: Dict[Optional[str], int] = {}
+        word_index: Dict[str, int] = {}
+        word_categories = []
+        for category, words in rows:
+            c = categories.setdefault(category, len(categories))
+            for word in words:
+                if word not in word_index:
+                    word_index[word] = len(word_index)
+                    word_categories.append(c)
+        members = [[] for _ in categories]
+        for i, c in enumerate(word_categories):
+            members[c].append(i)
+        self.words = tuple(word_index)
+        self.word_categories = tuple(word_categories)
+        self.categories = tuple(categories)
+        self.category_words = tuple(tuple(m) for m in members)
+        self.category_masks = tuple(sum(1 << i for i in m) for m in members)
+
+    def math_answer_index(self) -> Dict[int, int]:
+        """Problem id -> answer, built on first use (grading only)."""
+        if self._math_answer_index is None:
+            self._math_answer_index = dict(zip(self.math_ids, self.math_answers))
+        return self._math_answer_index
+
+    def sample_math_indices(self, count: int) -> List[int]:
+        return random.sample(range(len(self.math_ids)), min(count, len(self.math_ids)))
+
+    def _index_texts(self) -> None:
+        bands: Dict[int, List[Tuple[int, int]]] = {}
+        for i, (words, difficulty) in enumerate(zip(self.text_word_counts, self.text_difficulties)):
+            # Texts without metrics can only be picked unfiltered
+            if words is not None and difficulty is not None:
+                bands.setdefault(difficulty, []).append((words, i))
+        self._text_bands = {
+            difficulty: ([words for words, _ in entries], [i for _, i in entries])
+            for difficulty, entries in ((d, sorted(e)) for d, e in bands.items())
+        }
+
+    def random_text_index(self) -> int:
+        if not self.text_ids:
+            raise LookupError("No reading texts loaded")
+        return random.randrange(len(self.text_ids))
+
+    def select_text_index(self, min_words: Optional[int] = None, max_words: Optional[int] = None,
+                          min_difficulty: Optional[int] = None, max_difficulty: Optional[int] = None) -> int:
+        """A random text within the word-count and difficulty ranges (inclusive, None = open).
+
+        Bisects each difficulty band's sorted word counts, so the cost does not
+        depend on how many texts there are. Raises LookupError if none match.
+        """
+        if min_words is None and max_words is None and min_difficulty is None and max_difficulty is None:
+            return self.random_text_index()
+        spans = []
+        total = 0
+        for difficulty, (word_counts, indices) in self._text_bands.items():
+            if min_difficulty is not None and difficulty < min_difficulty:
+                continue
+            if max_difficulty is not None and difficulty > max_difficulty:
+                continue
+            lo = 0 if min_words is None else bisect_left(word_counts, min_words)
+            hi = len(word_counts) if max_words is None else bisect_right(word_counts, max_words)
+            if hi > lo:
+                spans.append((indices, lo, hi))
+                total += hi - lo
+        if not total:
+            raise LookupError("No reading text matches the requested ranges")
+        pick = random.randrange(total)
+        for indices, lo, hi in spans:
+            if pick < hi - lo:
+                return indices[lo + pick]
+            pick -= hi - lo
+
+
+def _columns(rows, width: int):
+    if not rows:
+        return ((),) * width
+    return tuple(tuple(column) for column in zip(*rows))
+
+
+_catalog: Optional[ContentCatalog] = None
+
+
+async def get_catalog(db: AsyncSession) -> ContentCatalog:
+    """Return the loaded catalog, loading it through `db` on first use."""
+    global _catalog
+    if _catalog is None:
+        catalog = ContentCatalog()
+        await catalog.load(db)
+        _catalog = catalog
+    return _catalog
+
+
+async def reload_catalog(db: AsyncSession) -> ContentCatalog:
+    """Reload content from the database, e.g. after re-seeding."""
+    global _catalog
+    catalog = ContentCatalog()
+    await catalog.load(db)
+    _catalog = catalog
+    # Pooled payloads were built from the previous content
+    payload_pool.clear_all()
+    return _catalog
+
+
+def invalidate_catalog() -> None:
+    """Drop the cached catalog; the next request reloads it from the database."""
+    global _catalog
+    _catalog = None
+    payload_pool.clear_all()
@@ -0,0 +1,225 @@
+"""Bulk export of exercise_results to CSV or Parquet.
+
+Rows are read in id order from a server-side cursor and written one chunk at
+a time (one Parquet row group per chunk), so memory stays bounded by a chunk
+whatever the size of the table.
+
+`details` is flattened into one column per key path, e.g. {"errors": {"sum": 2}}
+becomes "details.errors.sum"; lists and other non-scalar values are written as
+JSON text. CSV headers and Parquet schemas must be known before the first row,
+so plan_export makes a first pass over the `details` column alone to collect
+the key paths and their value types.
+
+Exports are incremental: plan_export fixes the watermark at max(id) when it
+runs, the export covers since_id < id <= watermark, and the watermark is the
+since_id of the next export. On PostgreSQL ids are taken at insert time, so a
+row whose transaction was still open at that moment can commit below the
+watermark; result writes are single short transactions, so leave a little time
+between the last write that must be included and the export.
+"""
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.result import ExerciseResult
+
+EXPORT_CHUNK_ROWS = 5000
+
+BASE_COLUMNS = (
+    "id", "session_id", "exercise_type", "started_at", "completed_at",
+    "score", "time_seconds", "correct_answers", "total_questions",
+)
+
+FORMATS = {"csv": "text/csv; charset=utf-8", "parquet": "application/vnd.apache.parquet"}
+
+
+class ExportPlan:
+    def __init__(self, since_id: int, watermark: int, details_kinds: Dict[str, str]):
+        self.since_id = since_id
+        self.watermark = watermark
+        # Flattened details column -> "bool" | "int" | "float" | "string"
+        self.details_kinds = details_kinds
+        # Rows handed out so far by iter_chunks
+        self.rows = 0
+
+    @property
+    def columns(self) -> List[str]:
+        return list(BASE_COLUMNS) + sorted(self.details_kinds)
+
+
+def flatten_details(details: Any, prefix: str = "details") -> Dict[str, Any]:
+    if not isinstance(details, dict):
+        return {} if details is None else {prefix: details}
+    flat: Dict[str, Any] = {}
+    for key, value in details.items():
+        name = f"{prefix}.{key}"
+        if isinstance(value, dict) and value:
+            flat.update(flatten_details(value, name))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _kind(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "string"
+
+
+def _merge_kinds(known: Optional[str], seen: Optional[str]) -> Optional[str]:
+    if known is None or known == seen:
+        return seen or known
+    if seen is None:
+        return known
+    return "float" if {known, seen} == {"int", "float"} else "string"
+
+
+def _coerce(value: Any, kind: str) -> Any:
+    if value is None:
+        return None
+    if kind == "string":
+        return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    if kind == "float":
+        return float(value)
+    return value
+
+
+def _in_range(stmt, plan: ExportPlan):
+    return stmt.where(ExerciseResult.id > plan.since_id, ExerciseResult.id <= plan.watermark)
+
+
+async def plan_export(db: AsyncSession, since_id: int = 0, chunk_rows: int = EXPORT_CHUNK_ROWS) -> ExportPlan:
+    """Fix the watermark and discover the flattened details columns."""
+    watermark = await db.scalar(select(func.max(ExerciseResult.id))) or 0
+    plan = ExportPlan(since_id, max(watermark, since_id), {})
+    kinds: Dict[str, Optional[str]] = {}
+    stmt = _in_range(select(ExerciseResult.details), plan).where(ExerciseResult.details.isnot(None))
+    result = await db.stream(stmt.execution_options(yield_per=chunk_rows))
+    async for partition in result.partitions():
+        for (details,) in partition:
+            for name, value in flatten_details(details).items():
+                kinds[name] = _merge_kinds(kinds.get(name), _kind(value))
+    # Keys that were only ever null are exported as empty text columns
+    plan.details_kinds = {name: kind or "string" for name, kind in kinds.items()}
+    return plan
+
+
+async def iter_chunks(db: AsyncSession, plan: ExportPlan, chunk_rows: int = EXPORT_CHUNK_ROWS
+                      ) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Rows of the plan's id range as flat dicts, chunk_rows at a time, in id order."""
+    columns = [getattr(ExerciseResult, name) for name in BASE_COLUMNS]
+    stmt = _in_range(select(*columns, ExerciseResult.details), plan).order_by(ExerciseResult.id)
+    result = await db.stream(stmt.execution_options(yield_per=chunk_rows))
+    async for partition in result.partitions():
+        rows = []
+        for row in partition:
+            flat = dict(zip(BASE_COLUMNS, row))
+            for name, value in flatten_details(row.details).items():
+                flat[name] = _coerce(value, plan.details_kinds[name])
+            rows.append(flat)
+        plan.rows += len(rows)
+        yield rows
+
+
+async def csv_chunks(db: AsyncSession, plan: ExportPlan, chunk_rows: int = EXPORT_CHUNK_ROWS) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=plan.columns, lineterminator="\n")
+    writer.writeheader()
+    async for rows in iter_chunks(db, plan, chunk_rows):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header of an empty export
+        yield buffer.getvalue()
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError("Parquet export needs pyarrow (see requirements.txt)") from exc
+    return pyarrow
+
+
+def parquet_available() -> bool:
+    try:
+        _pyarrow()
+    except RuntimeError:
+        return False
+    return True
+
+
+class _ChunkSink:
+    """Write-only file object that hands the written bytes out piece by piece."""
+
+    closed = False
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def parquet_schema(plan: ExportPlan):
+    pa = _pyarrow()
+    types = {"bool": pa.bool_(), "int": pa.int64(), "float": pa.float64(), "string": pa.string()}
+    fields = [
+        ("id", pa.int64()), ("session_id", pa.int64()), ("exercise_type", pa.string()),
+        ("started_at", pa.timestamp("us")), ("completed_at", pa.timestamp("us")),
+        ("score", pa.int64()), ("time_seconds", pa.float64()),
+        ("correct_answers", pa.int64()), ("total_questions", pa.int64()),
+    ]
+    fields += [(name, types[plan.details_kinds[name]]) for name in sorted(plan.details_kinds)]
+    return pa.schema(fields)
+
+
+async def parquet_chunks(db: AsyncSession, plan: ExportPlan, chunk_rows: int = EXPORT_CHUNK_ROWS
+                         ) -> AsyncIterator[bytes]:
+    """A Parquet file as byte chunks: one row group per chunk, then the footer."""
+    pa = _pyarrow()
+    schema = parquet_schema(plan)
+    sink = _ChunkSink()
+    writer = pa.parquet.ParquetWriter(sink, schema)
+    try:
+        async for rows in iter_chunks(db, plan, chunk_rows):
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def export_chunks(format: str, db: AsyncSession, plan: ExportPlan, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    if format == "csv":
+        return csv_chunks(db, plan, chunk_rows)
+    if format == "parquet":
+        return parquet_chunks(db, plan, chunk_rows)
+    raise ValueError(f"Unknown export format: {format}")
@@ -0,0 +1,164 @@
+"""Server-side grading of a whole test in one request.
+
+Answer keys are looked up in memory. Generated arithmetic and Stroop tests
+are regenerated from their test_id (through LRU caches) and only the served
+items count: a generated problem id outside the test is wrong even though
+its answer could be decoded from the id. Bank arithmetic answers are looked
+up by id in the content catalog (one IN query per test when math_problems is
+too large to mirror). The computed score is stored like any other result.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.exercise import MathProblem
+from app.schemas.exercise import ExerciseResultCreate, GradeAnswer, GradeRequest, GradeResponse, GradedItem, TrialData
+from app.config import settings
+from app.services import math_generator, math_service, result_service, stroop_service
+from app.services.content_catalog import get_catalog
+
+GRADED_TYPES = ("arithmetic", "stroop")
+
+
+class GradingError(ValueError):
+    """The request cannot be graded, e.g. a Stroop answer set without test_id."""
+
+
+def served_positions(test_id: int) -> Dict[int, int]:
+    """1-based position of every problem of the generated test `test_id`, by problem id."""
+    served = math_service.served_problem_ids(settings.MATH_DIFFICULTY, test_id)
+    return {problem_id: n for n, problem_id in enumerate(served, 1)}
+
+
+def generated_answers(test_id: int, ids: Iterable[int]) -> Dict[int, int]:
+    """Answers of the given ids that belong to the generated test `test_id`."""
+    served = served_positions(test_id)
+    return {i: math_generator.decode_problem(i)[1] for i in ids if i in served}
+
+
+async def arithmetic_answers(db: AsyncSession, ids: Iterable[int]) -> Dict[int, int]:
+    """Answers of the given bank problem ids that exist; generated ids have none."""
+    key = {}
+    bank_ids = [i for i in ids if math_generator.decode_problem(i) is None]
+    if not bank_ids:
+        return key
+    catalog = await get_catalog(db)
+    if catalog.math_in_memory:
+        index = catalog.math_answer_index()
+        key.update((i, index[i]) for i in bank_ids if i in index)
+    else:
+        rows = await db.execute(select(MathProblem.id, MathProblem.answer).where(MathProblem.id.in_(bank_ids)))
+        key.update(rows.all())
+    return key
+
+
+def _as_int(answer) -> Optional[int]:
+    if isinstance(answer, int):
+        return answer
+    if isinstance(answer, str):
+        try:
+            return int(answer.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def check_arithmetic(key: Dict[int, int], answers: List[GradeAnswer]) -> List[GradedItem]:
+    items = []
+    for a in answers:
+        expected = key.get(a.id)
+        items.append(GradedItem(id=a.id, correct=expected is not None and _as_int(a.answer) == expected,
+                                expected=expected))
+    return items
+
+
+def check_stroop(names: Tuple[str, ...], inks: Tuple[int, ...], answers: List[GradeAnswer]) -> List[GradedItem]:
+    lowered = tuple(name.lower() for name in names)
+    items = []
+    for a in answers:
+        if not 1 <= a.id <= len(inks):
+            items.append(GradedItem(id=a.id, correct=False))
+            continue
+        ink = inks[a.id - 1]
+        correct = isinstance(a.answer, str) and a.answer.strip().lower() == lowered[ink]
+        items.append(GradedItem(id=a.id, correct=correct, expected=names[ink]))
+    return items
+
+
+async def grade_arithmetic(db: AsyncSession, request: GradeRequest) -> List[GradedItem]:
+    ids = (a.id for a in request.answers)
+    if request.test_id is not None:
+        return check_arithmetic(generated_answers(request.test_id, ids), request.answers)
+    if math_service.uses_generator():
+        raise GradingError("test_id is required to grade a generated arithmetic test")
+    return check_arithmetic(await arithmetic_answers(db, ids), request.answers)
+
+
+async def grade_stroop(db: AsyncSession, request: GradeRequest) -> List[GradedItem]:
+    if request.test_id is None:
+        raise GradingError("test_id is required to grade a Stroop test")
+    names = (await get_catalog(db)).color_names
+    return check_stroop(names, stroop_service.stroop_answer_key(len(names), request.test_id), request.answers)
+
+
+def _item_ids(exercise_type: str, request: GradeRequest) -> Optional[List[int]]:
+    """Item ids stored with the trials, or None if they do not fit the uint32 column.
+
+    Generated problem ids are above 2**40, so generated arithmetic tests store
+    each answer's position in the served test instead (0: not in the test).
+    """
+    if exercise_type == "arithmetic" and request.test_id is not None:
+        positions = served_positions(request.test_id)
+        return [positions.get(a.id, 0) for a in request.answers]
+    ids = [a.id for a in request.answers]
+    return ids if all(0 <= i < 2**32 for i in ids) else None
+
+
+def _trials(exercise_type: str, request: GradeRequest, items: List[GradedItem]) -> Optional[TrialData]:
+    # Stored only when every answer carries its reaction time
+    if not request.answers or any(a.latency_ms is None for a in request.answers):
+        return None
+    return TrialData(
+        latency_ms=[a.latency_ms for a in request.answers],
+        correct=[item.correct for item in items],
+        item_ids=_item_ids(exercise_type, request),
+    )
+
+
+async def grade(db: AsyncSession, exercise_type: str, request: GradeRequest) -> GradeResponse:
+    """Grade, store the result (and its session aggregates) and commit."""
+    if exercise_type == "arithmetic":
+        items = await grade_arithmetic(db, request)
+        total = request.total_questions if request.total_questions is not None else math_service.ARITHMETIC_TEST_ITEMS
+    elif exercise_type == "stroop":
+        items = await grade_stroop(db, request)
+        total = request.total_questions if request.total_questions is not None else stroop_service.STROOP_TEST_ITEMS
+    else:
+        raise GradingError(f"Exercise type {exercise_type!r} cannot be graded")
+
+    correct = sum(item.correct for item in items)
+    details = {"graded": True}
+    if request.test_id is not None:
+        details["test_id"] = request.test_id
+    data = ExerciseResultCreate(
+        exercise_type=exercise_type,
+        score=correct,
+        time_seconds=request.time_seconds,
+        correct_answers=correct,
+        total_questions=max(total, len(items)),
+        details=details,
+        trials=_trials(exercise_type, request, items),
+    )
+
+    session_id = request.session_id
+    if session_id is None:
+        session_id = await result_service.create_session(db)
+    (result_id,) = await result_service.insert_results(db, [result_service.result_row(session_id, data)])
+    await db.commit()
+    return GradeResponse(
+        result_id=result_id,
+        session_id=session_id,
+        score=data.score,
+        correct_answers=correct,
+        total_questions=data.total_questions,
+        items=items,
+    )
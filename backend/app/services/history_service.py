@@ -0,0 +1,119 @@
+"""Keyset-paginated listings of training sessions and exercise results.
+
+Both listings are ordered newest first by (started_at, id), and a page starts
+strictly after the cursor row, so pages never overlap or skip rows however
+many rows share a timestamp. The cursor is opaque to clients.
+"""
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, Optional, Tuple
+from sqlalchemy import String, select, tuple_, type_coerce, exists
+from sqlalchemy.sql import Select
+from app.models.result import TrainingSession, ExerciseResult
+
+
+def started_at_key(column, dialect: str):
+    """The started_at expression used for ordering, filters and cursors.
+
+    SQLite keeps DateTime as text, and CURRENT_TIMESTAMP defaults have no
+    fractional seconds while SQLAlchemy binds ".000000", so a bound datetime
+    would not compare equal to the stored value. On SQLite the raw text is
+    compared instead; type_coerce adds no CAST, so the index is still used.
+    """
+    return type_coerce(column, String) if dialect == "sqlite" else column
+
+
+def bind_started_at(value: datetime, dialect: str) -> Any:
+    if dialect != "sqlite":
+        return value
+    if value.tzinfo is not None:
+        # CURRENT_TIMESTAMP is UTC
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    text = value.strftime("%Y-%m-%d %H:%M:%S")
+    return f"{text}.{value.microsecond:06d}" if value.microsecond else text
+
+
+def encode_cursor(key: Any, row_id: int) -> str:
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    raw = json.dumps([key, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, dialect: str) -> Tuple[Any, int]:
+    """Raises ValueError for a cursor this API did not issue."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key, row_id = json.loads(raw)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(key, str) or not isinstance(row_id, int):
+        raise ValueError("Invalid cursor")
+    if dialect != "sqlite":
+        key = datetime.fromisoformat(key)
+    return key, row_id
+
+
+def _keyset(stmt: Select, model, dialect: str, since: Optional[datetime], until: Optional[datetime],
+            cursor: Optional[str]) -> Select:
+    key = started_at_key(model.started_at, dialect)
+    if since is not None:
+        stmt = stmt.where(key >= bind_started_at(since, dialect))
+    if until is not None:
+        stmt = stmt.where(key < bind_started_at(until, dialect))
+    if cursor is not None:
+        after_key, after_id = decode_cursor(cursor, dialect)
+        stmt = stmt.where(tuple_(key, model.id) < tuple_(after_key, after_id))
+    return stmt.order_by(key.desc(), model.id.desc())
+
+
+def results_query(
+    dialect: str,
+    exercise_type: Optional[str] = None,
+    session_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+) -> Select:
+    stmt = select(
+        ExerciseResult.id,
+        ExerciseResult.session_id,
+        ExerciseResult.exercise_type,
+        ExerciseResult.score,
+        ExerciseResult.time_seconds,
+        ExerciseResult.correct_answers,
+        ExerciseResult.total_questions,
+        ExerciseResult.started_at,
+        started_at_key(ExerciseResult.started_at, dialect).label("cursor_key"),
+    )
+    if exercise_type is not None:
+        stmt = stmt.where(ExerciseResult.exercise_type == exercise_type)
+    if session_id is not None:
+        stmt = stmt.where(ExerciseResult.session_id == session_id)
+    return _keyset(stmt, ExerciseResult, dialect, since, until, cursor)
+
+
+def sessions_query(
+    dialect: str,
+    exercise_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+) -> Select:
+    stmt = select(
+        TrainingSession.id,
+        TrainingSession.total_score,
+        TrainingSession.result_count,
+        TrainingSession.best_scores,
+        TrainingSession.started_at,
+        TrainingSession.completed_at,
+        started_at_key(TrainingSession.started_at, dialect).label("cursor_key"),
+    )
+    if exercise_type is not None:
+        # Sessions that contain at least one result of this type
+        stmt = stmt.where(exists().where(
+            ExerciseResult.session_id == TrainingSession.id,
+            ExerciseResult.exercise_type == exercise_type,
+        ))
+    return _keyset(stmt, TrainingSession, dialect, since, until, cursor)
@@ -0,0 +1,162 @@
+"""Procedural arithmetic problems, generated without a database round trip.
+
+A problem is an operator and two operands; its id encodes all three:
+
+    GENERATED_ID_BASE | operator << 34 | a << 17 | b
+
+so ids of generated problems never collide with math_problems ids, stay
+below 2**53 for JavaScript clients, and the answer can be recomputed from the
+id alone (see decode_problem), which is how generated tests are graded.
+For "÷" the operands are the quotient and the divisor; the dividend shown is
+their product, so every answer is an integer.
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.schemas.exercise import MathProblemOut
+
+OPERATORS = ("+", "-", "×", "÷")
+
+GENERATED_ID_BASE = 1 << 40
+_OPERAND_BITS = 17
+MAX_OPERAND = (1 << _OPERAND_BITS) - 1
+_OPERAND_MASK = MAX_OPERAND
+
+Range = Tuple[int, int]
+
+
+class MathProfile:
+    """Operator mix and operand ranges of one kind of test.
+
+    `weights` maps operators to their relative frequency; `ranges[op]` is a
+    pair of inclusive (min, max) ranges for the left and right operand. For
+    "-" the right operand is capped at the left one so answers are never
+    negative; for "÷" the ranges are the quotient and the divisor.
+    """
+
+    def __init__(self, weights: Dict[str, float], ranges: Dict[str, Tuple[Range, Range]]):
+        ops = [op for op in OPERATORS if weights.get(op, 0) > 0]
+        if not ops:
+            raise ValueError("At least one operator needs a positive weight")
+        for op in weights:
+            if op not in OPERATORS:
+                raise ValueError(f"Unknown operator {op!r}")
+        self.weights = {op: weights[op] for op in ops}
+        self.ranges = {}
+        self.sizes = {}
+        for op in ops:
+            (a_min, a_max), (b_min, b_max) = ranges[op]
+            if not 0 <= a_min <= a_max <= MAX_OPERAND or not 0 <= b_min <= b_max <= MAX_OPERAND:
+                raise ValueError(f"Operand ranges of {op!r} must lie within 0..{MAX_OPERAND}")
+            if op == "÷" and b_min == 0:
+                raise ValueError("Divisors must be positive")
+            if op == "-":
+                # The left operand must leave room for the smallest right operand
+                a_min = max(a_min, b_min)
+                if a_min > a_max:
+                    raise ValueError("No non-negative differences in the ranges of '-'")
+                self.sizes[op] = sum(min(b_max, a) - b_min + 1 for a in range(a_min, a_max + 1))
+            else:
+                self.sizes[op] = (a_max - a_min + 1) * (b_max - b_min + 1)
+            self.ranges[op] = ((a_min, a_max), (b_min, b_max))
+
+        # Per-operator columns for vectorized drawing, indexed by position in self.weights
+        weights = np.array(list(self.weights.values()), dtype=np.float64)
+        self._cumulative = np.cumsum(weights) / weights.sum()
+        self._prefix = np.array(
+            [GENERATED_ID_BASE | OPERATORS.index(op) << 2 * _OPERAND_BITS for op in ops], dtype=np.int64
+        )
+        self._a_min = np.array([self.ranges[op][0][0] for op in ops], dtype=np.int64)
+        self._b_min = np.array([self.ranges[op][1][0] for op in ops], dtype=np.int64)
+        self._b_span = np.array([self.ranges[op][1][1] - self.ranges[op][1][0] + 1 for op in ops], dtype=np.int64)
+        self._pairs = (np.array([self.ranges[op][0][1] for op in ops], dtype=np.int64) - self._a_min + 1) * self._b_span
+        self._ordered = np.array([op == "-" for op in ops])
+
+    @property
+    def size(self) -> int:
+        """Number of distinct problems the profile can produce."""
+        return sum(self.sizes.values())
+
+
+# Level 2 is the mix of the seeded math_problems bank
+DIFFICULTIES = {
+    1: MathProfile({"+": 1, "-": 1}, {"+": ((1, 20), (1, 20)), "-": ((1, 20), (1, 20))}),
+    2: MathProfile(
+        {"+": 2, "-": 1, "×": 1},
+        {"+": ((1, 20), (1, 20)), "-": ((1, 20), (1, 20)), "×": ((2, 10), (2, 10))},
+    ),
+    3: MathProfile(
+        {"+": 1, "-": 1, "×": 1, "÷": 1},
+        {"+": ((10, 99), (10, 99)), "-": ((10, 99), (10, 99)), "×": ((2, 12), (2, 12)), "÷": ((2, 12), (2, 12))},
+    ),
+}
+
+
+def get_profile(difficulty: int) -> MathProfile:
+    try:
+        return DIFFICULTIES[difficulty]
+    except KeyError:
+        raise ValueError(f"Unknown difficulty {difficulty}; expected one of {sorted(DIFFICULTIES)}")
+
+
+def generate_ids(profile: MathProfile, count: int, rng: np.random.Generator) -> List[int]:
+    """Ids of `count` distinct problems drawn from `profile`.
+
+    The operator is drawn by weight, then the operand pair uniformly from its
+    ranges; a "-" pair with b > a is redrawn, so every problem of an operator
+    is equally likely. Candidates are drawn in vectorized rounds of 2 * count.
+    """
+    if count > profile.size:
+        raise ValueError(f"The profile has only {profile.size} distinct problems, {count} requested")
+    # A dict keeps the ids in draw order
+    seen = {}
+    while len(seen) < count:
+        draws = rng.random((2, 2 * count))
+        op = np.minimum(np.searchsorted(profile._cumulative, draws[0], side="right"), len(profile._prefix) - 1)
+        a, b = np.divmod((draws[1] * profile._pairs[op]).astype(np.int64), profile._b_span[op])
+        a += profile._a_min[op]
+        b += profile._b_min[op]
+        ids = (profile._prefix[op] | a << _OPERAND_BITS | b)[~(profile._ordered[op] & (b > a))]
+        for problem_id in ids.tolist():
+            seen[problem_id] = None
+            if len(seen) == count:
+                break
+    return list(seen)
+
+
+@lru_cache(maxsize=65536)
+def decode_problem(problem_id: int) -> Optional[Tuple[str, int]]:
+    """Expression and answer of a generated problem id; None for any other id."""
+    if problem_id >> 2 * _OPERAND_BITS + 2 != GENERATED_ID_BASE >> 2 * _OPERAND_BITS + 2:
+        return None
+    op = OPERATORS[problem_id >> 2 * _OPERAND_BITS & 3]
+    a = problem_id >> _OPERAND_BITS & _OPERAND_MASK
+    b = problem_id & _OPERAND_MASK
+    if op == "+":
+        return f"{a} + {b}", a + b
+    if op == "-":
+        return (f"{a} - {b}", a - b) if a >= b else None
+    if op == "×":
+        return f"{a} × {b}", a * b
+    return (f"{a * b} ÷ {b}", a) if b else None
+
+
+@lru_cache(maxsize=65536)
+def _problem_json(problem_id: int) -> str:
+    expression, answer = decode_problem(problem_id)
+    return f'{{"id":{problem_id},"expression":"{expression}","answer":{answer}}}'
+
+
+def render_problems(ids: List[int]) -> List[MathProblemOut]:
+    problems = []
+    for problem_id in ids:
+        expression, answer = decode_problem(problem_id)
+        problems.append(MathProblemOut(id=problem_id, expression=expression, answer=answer))
+    return problems
+
+
+def render_arithmetic_json(ids: List[int], time_limit_seconds: int = 120, test_id: Optional[int] = None) -> bytes:
+    """Serialize an ArithmeticResponse body from cached per-problem JSON; expressions need no escaping."""
+    items = ",".join(map(_problem_json, ids))
+    test_id = "null" if test_id is None else test_id
+    return f'{{"problems":[{items}],"time_limit_seconds":{time_limit_seconds},"test_id":{test_id}}}'.encode()
@@ -1,12 +1,101 @@
+import math
 import random
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
+from app.config import settings
 from app.models.exercise import MathProblem
 from app.schemas.exercise import MathProblemOut
+from app.services import math_generator
+from app.services.content_catalog import get_catalog
+from app.services.stroop_service import new_test_id
 
-async def get_random_problems(db: AsyncSession, count: int = 100) -> List[MathProblemOut]:
-    stmt = select(MathProblem).order_by(func.random()).limit(count)
-    result = await db.execute(stmt)
-    problems = result.scalars().all()
-    return [MathProblemOut(id=p.id, expression=p.expression, answer=p.answer) for p in problems]
+ARITHMETIC_TEST_ITEMS = 50
+
+def uses_generator() -> bool:
+    return settings.MATH_SOURCE != "bank"
+
+# Shared by unseeded tests; creating a Generator costs about as much as drawing a test
+_rng = np.random.default_rng()
+
+def generate_problem_ids(count: int, seed: Optional[int] = None) -> List[int]:
+    """Problem ids of a procedural test at MATH_DIFFICULTY; the same seed gives the same test."""
+    profile = math_generator.get_profile(settings.MATH_DIFFICULTY)
+    return math_generator.generate_ids(profile, count, _rng if seed is None else np.random.default_rng(seed))
+
+def generate_payload(count: int = ARITHMETIC_TEST_ITEMS, seed: Optional[int] = None) -> bytes:
+    """Response body of a new test; `seed` (random by default) is sent as its test_id."""
+    test_id = new_test_id() if seed is None else seed
+    return math_generator.render_arithmetic_json(generate_problem_ids(count, test_id), test_id=test_id)
+
+@lru_cache(maxsize=4096)
+def served_problem_ids(difficulty: int, test_id: int, count: int = ARITHMETIC_TEST_ITEMS) -> Tuple[int, ...]:
+    """Ids of the test generated from `test_id` in served order; regenerated for grading instead of stored."""
+    profile = math_generator.get_profile(difficulty)
+    return tuple(math_generator.generate_ids(profile, count, np.random.default_rng(test_id)))
+
+async def get_random_problems(db: AsyncSession, count: int = 100, seed: Optional[int] = None) -> List[MathProblemOut]:
+    if uses_generator():
+        return math_generator.render_problems(generate_problem_ids(count, seed))
+    return await get_bank_problems(db, count)
+
+async def get_bank_problems(db: AsyncSession, count: int = 100) -> List[MathProblemOut]:
+    catalog = await get_catalog(db)
+    if not catalog.math_in_memory:
+        return await sample_problems_by_id_range(db, count)
+
+    return [
+        MathProblemOut(id=catalog.math_ids[i], expression=catalog.math_expressions[i], answer=catalog.math_answers[i])
+        for i in catalog.sample_math_indices(count)
+    ]
+
+async def sample_problems_by_id_range(db: AsyncSession, count: int) -> List[MathProblemOut]:
+    """Sample `count` distinct problems without scanning math_problems.
+
+    Draws random ids between MIN(id) and MAX(id) and fetches them through the
+    primary key. Ids missing because of gaps are made up in further rounds,
+    oversampling by the hit rate observed so far. Works the same on SQLite and
+    PostgreSQL; returns fewer than `count` only if the table has fewer rows.
+    """
+    # Separate subqueries so both SQLite and PostgreSQL answer MIN/MAX from the index
+    low, high = (await db.execute(select(
+        select(func.min(MathProblem.id)).scalar_subquery(),
+        select(func.max(MathProblem.id)).scalar_subquery(),
+    ))).one()
+    if low is None:
+        return []
+
+    span = high - low + 1
+    tried: Set[int] = set()
+    found = {}
+    hit_rate = 1.0
+    while len(found) < count and len(tried) < span:
+        need = count - len(found)
+        batch = min(span - len(tried), math.ceil(need / hit_rate * 1.25) + 8)
+        candidates = _draw_untried_ids(low, high, tried, batch)
+        tried.update(candidates)
+
+        stmt = select(MathProblem.id, MathProblem.expression, MathProblem.answer).where(MathProblem.id.in_(candidates))
+        rows = (await db.execute(stmt)).all()
+        for row in rows:
+            found[row.id] = row
+        hit_rate = max(len(rows) / len(candidates), 0.01)
+
+    rows = random.sample(list(found.values()), min(count, len(found)))
+    return [MathProblemOut(id=r.id, expression=r.expression, answer=r.answer) for r in rows]
+
+def _draw_untried_ids(low: int, high: int, tried: Set[int], batch: int) -> List[int]:
+    remaining = high - low + 1 - len(tried)
+    if batch * 2 >= remaining:
+        # Few ids left: enumerating them is cheaper than rejection sampling
+        untried = [i for i in range(low, high + 1) if i not in tried]
+        return random.sample(untried, min(batch, len(untried)))
+
+    drawn: Set[int] = set()
+    while len(drawn) < batch:
+        candidate = random.randint(low, high)
+        if candidate not in tried:
+            drawn.add(candidate)
+    return list(drawn)
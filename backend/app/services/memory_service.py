@@ -1,19 +1,125 @@
 import random
-from typing import List
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.models.exercise import WordList
+from app.config import settings
+from app.services.content_catalog import ContentCatalog, get_catalog
 
-async def get_memory_words(db: AsyncSession, word_count: int = 12) -> List[str]:
-    stmt = select(WordList).order_by(func.random()).limit(3)
-    result = await db.execute(stmt)
-    word_lists = result.scalars().all()
 
-    all_words = []
-    for wl in word_lists:
-        all_words.extend(wl.words)
+class SeenWords:
+    """Words shown to each session, as bitmasks over the catalog's flat word index.
 
-    random.shuffle(all_words)
-    words = all_words[:word_count]
+    Per session: the words of the current round (see sample_word_indices) and
+    those of the last test. Only the `capacity` most recently used sessions
+    are kept. Masks are only valid for the catalog they were built against;
+    after a reload they read as empty.
+    """
 
-    return words
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._masks: "OrderedDict[int, Tuple[Tuple[str, ...], int, int]]" = OrderedDict()
+
+    def get(self, session_id: int, catalog: ContentCatalog) -> Tuple[int, int]:
+        """(seen, last test) masks of the session."""
+        entry = self._masks.get(session_id)
+        if entry is None or entry[0] is not catalog.words:
+            return 0, 0
+        self._masks.move_to_end(session_id)
+        return entry[1], entry[2]
+
+    def set(self, session_id: int, catalog: ContentCatalog, seen: int, last: int) -> None:
+        self._masks[session_id] = (catalog.words, seen, last)
+        self._masks.move_to_end(session_id)
+        while len(self._masks) > self.capacity:
+            self._masks.popitem(last=False)
+
+    def clear(self) -> None:
+        self._masks.clear()
+
+
+seen_words = SeenWords(settings.MEMORY_SEEN_SESSIONS)
+_rng = random.Random()
+
+
+def _mask(indices: List[int]) -> int:
+    mask = 0
+    for i in indices:
+        mask |= 1 << i
+    return mask
+
+
+def _draw(members: Tuple[int, ...], quota: int, available: int, excluded: int, rng: random.Random) -> List[int]:
+    """`quota` of the `available` word indices in `members` that are not in `excluded`."""
+    if quota * 2 > available:
+        # Most of what is left is needed: enumerate it
+        return rng.sample([i for i in members if not excluded >> i & 1], quota)
+    # Otherwise rejection sampling: len(members) / available draws per word on average,
+    # at most half of what enumerating the category would check
+    picked = []
+    rand = rng.random
+    size = len(members)
+    while len(picked) < quota:
+        i = members[int(rand() * size)]
+        if not excluded >> i & 1:
+            excluded |= 1 << i
+            picked.append(i)
+    return picked
+
+
+def sample_word_indices(catalog: ContentCatalog, count: int, seen: int, rng: random.Random,
+                        last: int = 0) -> Tuple[List[int], int]:
+    """Flat indices of `count` distinct words and the session's updated seen mask.
+
+    Words are spread as evenly as possible over the categories (in a random
+    order for the remainder) and never taken from `seen`. Once fewer than
+    `count` unseen words are left, the rest are all used and the test is
+    topped up from words seen earlier, avoiding the `last` test's words when
+    there are enough others; the top-up starts the next round of `seen`. So
+    no word is repeated before every word has been shown, nor (with at least
+    2 * count words) in two consecutive tests.
+
+    Expected cost is O(count) while every category is at most half seen; the
+    draws per word grow as a category's unseen share shrinks.
+    """
+    count = min(count, len(catalog.words))
+    unseen = len(catalog.words) - seen.bit_count()
+    if unseen < count:
+        first = [i for i in range(len(catalog.words)) if not seen >> i & 1]
+        excluded = _mask(first)
+        if len(catalog.words) - (excluded | last).bit_count() >= count - len(first):
+            excluded |= last
+        rest, _ = sample_word_indices(catalog, count - len(first), excluded, rng)
+        indices = first + rest
+        rng.shuffle(indices)
+        return indices, _mask(rest)
+
+    n_categories = len(catalog.categories)
+    available = [len(members) - (seen & mask).bit_count()
+                 for members, mask in zip(catalog.category_words, catalog.category_masks)]
+    order = list(range(n_categories))
+    rng.shuffle(order)
+    quotas = [0] * n_categories
+    left = count
+    # Round-robin, skipping categories with nothing left
+    while left:
+        for c in order:
+            if left and quotas[c] < available[c]:
+                quotas[c] += 1
+                left -= 1
+
+    indices = []
+    for c in order:
+        if quotas[c]:
+            indices.extend(_draw(catalog.category_words[c], quotas[c], available[c], seen, rng))
+    rng.shuffle(indices)
+    return indices, seen | _mask(indices)
+
+
+async def get_memory_words(db: AsyncSession, word_count: int = 12, session_id: Optional[int] = None) -> List[str]:
+    """Words for one memory test; with a session_id, none the session has seen recently."""
+    catalog = await get_catalog(db)
+    seen, last = seen_words.get(session_id, catalog) if session_id is not None else (0, 0)
+    indices, seen = sample_word_indices(catalog, word_count, seen, _rng, last)
+    if session_id is not None:
+        seen_words.set(session_id, catalog, seen, _mask(indices))
+    return [catalog.words[i] for i in indices]
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional
+
+PayloadBuilder = Callable[[], Awaitable[bytes]]
+
+logger = logging.getLogger(__name__)
+
+
+class PayloadPool:
+    """Queue of ready-to-send response bodies for one exercise type.
+
+    Requests pop pre-serialized bytes; a background task tops the queue back up
+    to `depth` whenever it drops below `low_watermark`. An empty pool is a miss
+    and the payload is built inline, so callers always get a body. A failed
+    refill is logged and retried after `retry_delay` seconds.
+    """
+
+    def __init__(self, name: str, build: PayloadBuilder, depth: int, low_watermark: int, retry_delay: float = 1.0):
+        self.name = name
+        self.depth = depth
+        self.low_watermark = min(low_watermark, depth)
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.errors = 0
+        self.retry_delay = retry_delay
+        self._build = build
+        self._payloads: deque = deque()
+        self._refill_requested = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    async def take(self) -> bytes:
+        if self._payloads:
+            self.hits += 1
+            payload = self._payloads.popleft()
+        else:
+            self.misses += 1
+            payload = await self._build()
+        if len(self._payloads) < self.low_watermark:
+            self._refill_requested.set()
+        return payload
+
+    async def fill(self) -> None:
+        while len(self._payloads) < self.depth:
+            self._payloads.append(await self._build())
+            # Let request handlers run between builds
+            await asyncio.sleep(0)
+        self.refills += 1
+
+    def clear(self) -> None:
+        self._payloads.clear()
+        self._refill_requested.set()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.fill()
+            except Exception:
+                # Keep the task alive: requests fall back to inline builds meanwhile
+                self.errors += 1
+                logger.exception("Failed to refill the %s payload pool", self.name)
+                await asyncio.sleep(self.retry_delay)
+                continue
+            self._refill_requested.clear()
+            await self._refill_requested.wait()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._payloads),
+            "depth": self.depth,
+            "low_watermark": self.low_watermark,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refills": self.refills,
+            "errors": self.errors,
+        }
+
+
+_builders: Dict[str, PayloadBuilder] = {}
+_pools: Dict[str, PayloadPool] = {}
+_tasks: List[asyncio.Task] = []
+
+
+def register(name: str, build: PayloadBuilder) -> None:
+    """Declare a pooled exercise type; the pool itself is created by start()."""
+    _builders[name] = build
+
+
+def get_pool(name: str) -> Optional[PayloadPool]:
+    return _pools.get(name)
+
+
+def start(depth: int, low_watermark: int) -> None:
+    for name, build in _builders.items():
+        pool = PayloadPool(name, build, depth, low_watermark)
+        _pools[name] = pool
+        _tasks.append(asyncio.create_task(pool.run(), name=f"payload-pool-{name}"))
+
+
+async def stop() -> None:
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+    _pools.clear()
+
+
+def clear_all() -> None:
+    """Discard pooled payloads, e.g. after the content catalog is reloaded."""
+    for pool in _pools.values():
+        pool.clear()
+
+
+def stats() -> Dict[str, dict]:
+    return {name: pool.stats() for name, pool in _pools.items()}
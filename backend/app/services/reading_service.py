@@ -1,16 +1,20 @@
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.models.exercise import ReadingText
 from app.schemas.exercise import ReadingTextOut
+from app.services.content_catalog import get_catalog
 
-async def get_random_text(db: AsyncSession) -> ReadingTextOut:
-    stmt = select(ReadingText).order_by(func.random()).limit(1)
-    result = await db.execute(stmt)
-    text = result.scalar_one()
+async def get_random_text(db: AsyncSession, min_words: Optional[int] = None, max_words: Optional[int] = None,
+                          min_difficulty: Optional[int] = None, max_difficulty: Optional[int] = None
+                          ) -> ReadingTextOut:
+    """A random text, optionally within word-count and difficulty ranges; LookupError if none match."""
+    catalog = await get_catalog(db)
+    i = catalog.select_text_index(min_words, max_words, min_difficulty, max_difficulty)
 
     return ReadingTextOut(
-        id=text.id,
-        title=text.title,
-        content=text.content,
-        word_count=text.word_count
+        id=catalog.text_ids[i],
+        title=catalog.text_titles[i],
+        content=catalog.text_contents[i],
+        word_count=catalog.text_word_counts[i],
+        difficulty=catalog.text_difficulties[i],
+        readability=catalog.text_readability[i],
     )
@@ -0,0 +1,87 @@
+from collections import defaultdict
+from typing import Iterable, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, select, update, func
+from app.models.result import TrainingSession, ExerciseResult
+from app.schemas.exercise import ExerciseResultData
+from app.services.trial_codec import encode_trials
+
+async def create_session(db: AsyncSession) -> int:
+    session = TrainingSession()
+    db.add(session)
+    await db.flush()
+    return session.id
+
+def result_row(session_id: int, data: ExerciseResultData) -> dict:
+    return {
+        "session_id": session_id,
+        "exercise_type": data.exercise_type,
+        "score": data.score,
+        "time_seconds": data.time_seconds,
+        "correct_answers": data.correct_answers,
+        "total_questions": data.total_questions,
+        "details": data.details,
+        "trials": encode_trials(**data.trials.model_dump()) if data.trials is not None else None,
+    }
+
+async def insert_results(db: AsyncSession, rows: Iterable[dict]) -> List[int]:
+    """Insert result rows with one executemany statement; ids come back in row order.
+
+    Session aggregates are updated in the same transaction.
+    """
+    rows = list(rows)
+    stmt = insert(ExerciseResult).returning(ExerciseResult.id, sort_by_parameter_order=True)
+    ids = list((await db.scalars(stmt, rows)).all())
+    await apply_results(db, rows)
+    return ids
+
+async def apply_results(db: AsyncSession, rows: Iterable[dict]) -> None:
+    """Fold newly written results into their sessions' aggregate columns.
+
+    The counters are bumped with a relative UPDATE first, which takes the row
+    (or, on SQLite, database) write lock before best_scores is read back and
+    merged, so concurrent writers to one session cannot lose updates.
+    """
+    totals = defaultdict(int)
+    counts = defaultdict(int)
+    best = defaultdict(dict)
+    for row in rows:
+        session_id = row["session_id"]
+        if session_id is None:
+            continue
+        score = row["score"] or 0
+        totals[session_id] += score
+        counts[session_id] += 1
+        exercise_type = row["exercise_type"]
+        best[session_id][exercise_type] = max(score, best[session_id].get(exercise_type, score))
+
+    if not counts:
+        return
+
+    for session_id in counts:
+        await db.execute(
+            update(TrainingSession)
+            .where(TrainingSession.id == session_id)
+            .values(
+                total_score=func.coalesce(TrainingSession.total_score, 0) + totals[session_id],
+                result_count=func.coalesce(TrainingSession.result_count, 0) + counts[session_id],
+                completed_at=func.now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    stored = await db.execute(
+        select(TrainingSession.id, TrainingSession.best_scores).where(TrainingSession.id.in_(list(counts)))
+    )
+    for session_id, best_scores in stored.all():
+        merged = dict(best_scores or {})
+        for exercise_type, score in best[session_id].items():
+            if exercise_type not in merged or score > merged[exercise_type]:
+                merged[exercise_type] = score
+        if merged != best_scores:
+            await db.execute(
+                update(TrainingSession)
+                .where(TrainingSession.id == session_id)
+                .values(best_scores=merged)
+                .execution_options(synchronize_session=False)
+            )
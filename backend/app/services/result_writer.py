@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import List, Optional, Tuple
+from sqlalchemy.exc import DBAPIError, OperationalError
+from app.schemas.exercise import ExerciseResultCreate
+from app.services import result_service
+
+logger = logging.getLogger(__name__)
+
+# Queued by stop(); everything ahead of it is flushed before the writer exits
+_STOP = object()
+
+Batch = List[Tuple[str, ExerciseResultCreate]]
+
+
+def _is_transient(exc: Exception) -> bool:
+    # "database is locked", dropped connections: the same rows can succeed later
+    return isinstance(exc, OperationalError) or (isinstance(exc, DBAPIError) and exc.connection_invalidated)
+
+
+class ResultWriter:
+    """Write-behind queue for POST /api/results.
+
+    Requests only validate and enqueue; one background task drains the queue
+    and group-commits up to `max_batch` results per transaction, waiting at most
+    `flush_interval` seconds for a batch to fill. With SQLite this turns many
+    competing write-lock acquisitions into one per batch.
+
+    Transient database errors are retried up to `max_retries` times with
+    exponential backoff starting at `retry_backoff` seconds. Any other error
+    splits the batch in halves until the failing results are isolated, so
+    only those are dropped.
+    """
+
+    def __init__(self, session_factory, max_batch: int, flush_interval: float, max_size: int,
+                 max_retries: int = 3, retry_backoff: float = 0.05):
+        self._session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._batch_full = asyncio.Event()
+        self.accepted = 0
+        self.written = 0
+        self.failed = 0
+        self.retries = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def submit(self, data: ExerciseResultCreate) -> str:
+        """Queue a result and return its ticket; raises asyncio.QueueFull when saturated."""
+        if self._closing:
+            raise asyncio.QueueFull("result writer is shutting down")
+        ticket = uuid.uuid4().hex
+        self._queue.put_nowait((ticket, data))
+        self.accepted += 1
+        if self._queue.qsize() + 1 >= self.max_batch:
+            self._batch_full.set()
+        return ticket
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="result-writer")
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the background task."""
+        self._closing = True
+        if self._task is not None:
+            await self._queue.put(_STOP)
+            self._batch_full.set()
+            await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            if self._queue.qsize() + 1 < self.max_batch and not self._closing:
+                # Hold the window open until it expires or submit() reports a full batch
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._batch_full.clear()
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _insert(self, batch: Batch) -> None:
+        async with self._session_factory() as db:
+            rows = []
+            for _, data in batch:
+                # Same as the synchronous path: results without a session get their own
+                session_id = data.session_id
+                if session_id is None:
+                    session_id = await result_service.create_session(db)
+                rows.append(result_service.result_row(session_id, data))
+            await result_service.insert_results(db, rows)
+            await db.commit()
+
+    async def _insert_with_retry(self, batch: Batch) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._insert(batch)
+                return
+            except Exception as exc:
+                if attempt == self.max_retries or not _is_transient(exc):
+                    raise
+                self.retries += 1
+                logger.warning("Retrying %d queued results after transient error: %s", len(batch), exc)
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def _write(self, batch: Batch) -> None:
+        try:
+            await self._insert_with_retry(batch)
+            self.written += len(batch)
+        except Exception as exc:
+            # Retries are exhausted for transient errors, splitting would not help
+            if len(batch) == 1 or _is_transient(exc):
+                self.failed += len(batch)
+                logger.exception("Failed to write %d queued results: %s", len(batch), [t for t, _ in batch])
+                return
+            middle = len(batch) // 2
+            await self._write(batch[:middle])
+            await self._write(batch[middle:])
+
+    async def _flush(self, batch: Batch) -> None:
+        started = time.perf_counter()
+        await self._write(batch)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "accepted": self.accepted,
+            "written": self.written,
+            "failed": self.failed,
+            "retries": self.retries,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+        }
+
+
+_writer: Optional[ResultWriter] = None
+
+
+def get_writer() -> Optional[ResultWriter]:
+    return _writer
+
+
+def start(session_factory, max_batch: int, flush_interval: float, max_size: int,
+          max_retries: int = 3, retry_backoff: float = 0.05) -> ResultWriter:
+    global _writer
+    _writer = ResultWriter(session_factory, max_batch, flush_interval, max_size, max_retries, retry_backoff)
+    _writer.start()
+    return _writer
+
+
+async def stop() -> None:
+    global _writer
+    if _writer is not None:
+        await _writer.stop()
+        _writer = None
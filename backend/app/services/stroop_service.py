@@ -1,26 +1,177 @@
+import json
 import random
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.models.exercise import StroopColor
 from app.schemas.exercise import StroopItem
+from app.services.content_catalog import get_catalog
 
-async def generate_stroop_test(db: AsyncSession, count: int = 50) -> List[StroopItem]:
-    stmt = select(StroopColor)
-    result = await db.execute(stmt)
-    colors = result.scalars().all()
+# Items per test served by GET /api/exercises/stroop and graded by test_id
+STROOP_TEST_ITEMS = 50
 
-    items = []
-    for i in range(count):
-        word_color = random.choice(colors)
-        display_colors = [c for c in colors if c.id != word_color.id]
-        display_color = random.choice(display_colors)
 
-        items.append(StroopItem(
+class StroopTable:
+    """Per-color-set lookup tables shared by every generated test.
+
+    `fragments[word][ink]` is the pre-encoded JSON body of the matching item,
+    so a test is just two index arrays until it is rendered.
+    """
+
+    def __init__(self, names: Tuple[str, ...], codes: Tuple[str, ...]):
+        if len(names) < 2:
+            raise ValueError("Stroop test needs at least two colors")
+        self.names = names
+        self.codes = codes
+        self.words = tuple(name.upper() for name in names)
+        self.fragments = tuple(
+            tuple(
+                json.dumps(
+                    {"word": self.words[w], "display_color": codes[ink], "correct_answer": names[ink]},
+                    ensure_ascii=False,
+                )[1:-1]
+                for ink in range(len(names))
+            )
+            for w in range(len(names))
+        )
+
+
+@lru_cache(maxsize=8)
+def get_stroop_table(names: Tuple[str, ...], codes: Tuple[str, ...]) -> StroopTable:
+    return StroopTable(names, codes)
+
+
+@lru_cache(maxsize=8)
+def incongruent_words(n_colors: int) -> Tuple[Tuple[int, ...], ...]:
+    """`incongruent_words(n)[ink]` lists every word index that differs from `ink`."""
+    return tuple(tuple(w for w in range(n_colors) if w != ink) for ink in range(n_colors))
+
+
+def generate_stroop_indices(
+    n_colors: int,
+    count: int,
+    rng: random.Random,
+    no_immediate_repeats: bool = True,
+    balanced: bool = True,
+) -> Tuple[List[int], List[int]]:
+    """Build the word and ink index arrays of one test in a single pass.
+
+    Every word differs from its ink. With `balanced` each ink is used
+    count // n_colors or one more times; with `no_immediate_repeats` neither the
+    ink nor the word repeats between neighbouring items.
+    """
+    if balanced:
+        remaining = [count // n_colors] * n_colors
+        for ink in rng.sample(range(n_colors), count % n_colors):
+            remaining[ink] += 1
+    else:
+        remaining = None
+
+    word_choices = incongruent_words(n_colors)
+    # int(random() * k) is several times cheaper than randrange(k)
+    rand = rng.random
+    inks: List[int] = []
+    words: List[int] = []
+    prev_ink = prev_word = -1
+    for left in range(count, 0, -1):
+        if remaining is not None:
+            ink = _next_balanced_ink(remaining, left, prev_ink if no_immediate_repeats else -1, rand)
+            remaining[ink] -= 1
+        elif no_immediate_repeats and prev_ink >= 0:
+            ink = int(rand() * (n_colors - 1))
+            if ink >= prev_ink:
+                ink += 1
+        else:
+            ink = int(rand() * n_colors)
+
+        choices = word_choices[ink]
+        word = choices[int(rand() * len(choices))]
+        if no_immediate_repeats and word == prev_word and len(choices) > 1:
+            # Swap for another incongruent word; prev_word is in `choices`
+            word = choices[(choices.index(word) + 1 + int(rand() * (len(choices) - 1))) % len(choices)]
+
+        inks.append(ink)
+        words.append(word)
+        prev_ink, prev_word = ink, word
+
+    return words, inks
+
+
+def _next_balanced_ink(remaining: List[int], left: int, prev_ink: int, rand) -> int:
+    # A color holding more than half of what is left must be placed now,
+    # otherwise two of its items would end up adjacent
+    if max(remaining) * 2 > left:
+        for ink, n in enumerate(remaining):
+            if n * 2 > left and ink != prev_ink:
+                return ink
+
+    available = left - (remaining[prev_ink] if prev_ink >= 0 else 0)
+    if available == 0:
+        # Only the previous color is left, so the repeat is unavoidable
+        return prev_ink
+
+    pick = int(rand() * available)
+    for ink, n in enumerate(remaining):
+        if ink == prev_ink:
+            continue
+        if pick < n:
+            return ink
+        pick -= n
+
+
+def render_stroop_items(table: StroopTable, words: List[int], inks: List[int]) -> List[StroopItem]:
+    return [
+        StroopItem(
             id=i + 1,
-            word=word_color.color_name.upper(),
-            display_color=display_color.color_code,
-            correct_answer=display_color.color_name
-        ))
+            word=table.words[w],
+            display_color=table.codes[ink],
+            correct_answer=table.names[ink]
+        )
+        for i, (w, ink) in enumerate(zip(words, inks))
+    ]
+
+
+def render_stroop_json(table: StroopTable, words: List[int], inks: List[int], time_limit_seconds: int = 120,
+                       test_id: Optional[int] = None) -> bytes:
+    """Serialize a StroopResponse body straight from the pre-encoded fragments."""
+    fragments = table.fragments
+    items = ",".join(
+        f'{{"id":{i + 1},{fragments[w][ink]}}}' for i, (w, ink) in enumerate(zip(words, inks))
+    )
+    test = "null" if test_id is None else test_id
+    return f'{{"items":[{items}],"time_limit_seconds":{time_limit_seconds},"test_id":{test}}}'.encode()
+
+
+def new_test_id() -> int:
+    """Seed of a new test; below 2**53 so JavaScript clients keep it exact."""
+    return random.getrandbits(53)
+
+
+@lru_cache(maxsize=4096)
+def stroop_answer_key(n_colors: int, test_id: int, count: int = STROOP_TEST_ITEMS) -> Tuple[int, ...]:
+    """Ink index of every item of the test generated from `test_id`, by item id - 1.
+
+    Tests are regenerated from their seed instead of being stored; the cache
+    covers the usual case of grading shortly after the test was served.
+    """
+    return tuple(generate_stroop_indices(n_colors, count, random.Random(test_id))[1])
+
+
+async def _load_table(db: AsyncSession) -> StroopTable:
+    catalog = await get_catalog(db)
+    return get_stroop_table(catalog.color_names, catalog.color_codes)
+
+
+async def generate_stroop_test(db: AsyncSession, count: int = STROOP_TEST_ITEMS, seed: Optional[int] = None
+                               ) -> List[StroopItem]:
+    table = await _load_table(db)
+    words, inks = generate_stroop_indices(len(table.names), count, random.Random(seed))
+    return render_stroop_items(table, words, inks)
+
 
-    return items
+async def generate_stroop_payload(db: AsyncSession, count: int = STROOP_TEST_ITEMS, seed: Optional[int] = None
+                                  ) -> bytes:
+    """Response body of a new test; `seed` (random by default) is sent as its test_id."""
+    table = await _load_table(db)
+    test_id = new_test_id() if seed is None else seed
+    words, inks = generate_stroop_indices(len(table.names), count, random.Random(test_id))
+    return render_stroop_json(table, words, inks, test_id=test_id)
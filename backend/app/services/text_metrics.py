@@ -0,0 +1,50 @@
+"""Length and readability of Russian reading texts, computed once at ingestion.
+
+    words        tokens of letters/digits; hyphenated words ("розово-оранжевые")
+                 count once, dashes and punctuation not at all
+    syllables    vowels, one per syllable in Russian
+    sentences    runs of text ended by . ! ? or …
+    readability  Oborneva's adaptation of the Flesch reading ease to Russian:
+                 206.835 - 1.3 * words/sentence - 60.1 * syllables/word;
+                 higher is easier
+    difficulty   band of the readability score, 1 (easiest) to 5
+"""
+import re
+from typing import Dict, Union
+
+_WORD = re.compile(r"[^\W_]+(?:-[^\W_]+)*")
+_VOWELS = re.compile(r"[аеёиоуыэюяaeiouy]", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"[.!?…]+")
+
+# (lowest readability, difficulty), checked in order; anything lower is 5
+DIFFICULTY_BANDS = ((80.0, 1), (65.0, 2), (50.0, 3), (30.0, 4))
+MAX_DIFFICULTY = 5
+
+
+def readability(words: int, sentences: int, syllables: int) -> float:
+    if not words:
+        return 0.0
+    return 206.835 - 1.3 * words / max(sentences, 1) - 60.1 * syllables / words
+
+
+def difficulty_band(score: float) -> int:
+    for lowest, band in DIFFICULTY_BANDS:
+        if score >= lowest:
+            return band
+    return MAX_DIFFICULTY
+
+
+def text_metrics(content: str) -> Dict[str, Union[int, float]]:
+    """Column values for a reading_texts row with this content."""
+    words = _WORD.findall(content)
+    syllables = len(_VOWELS.findall(content))
+    # Text after the last terminator (no final period) is a sentence too
+    sentences = sum(1 for part in _SENTENCE_END.split(content) if _WORD.search(part))
+    score = round(readability(len(words), sentences, syllables), 2)
+    return {
+        "word_count": len(words),
+        "syllable_count": syllables,
+        "sentence_count": sentences,
+        "readability": score,
+        "difficulty": difficulty_band(score),
+    }
@@ -0,0 +1,92 @@
+"""Packed binary storage of per-trial arrays (exercise_results.trials).
+
+Layout, little-endian throughout:
+
+    version  uint8     TRIALS_FORMAT_VERSION
+    flags    uint8     bit 0: item ids present
+    count    uint32    number of trials
+    latency  uint32 * count         reaction time, microseconds
+    correct  ceil(count / 8) bytes  bit i of byte i // 8 (LSB first)
+    item_id  uint32 * count         only with flag bit 0
+
+Latencies are integer microseconds rather than float32: the same 4 bytes,
+exact to 1 us up to 71 minutes, and they decode to clean millisecond values,
+where float32 would need rounding that costs more than parsing the JSON.
+"""
+import struct
+import sys
+from array import array
+from itertools import chain
+from typing import Dict, List, Optional
+
+TRIALS_FORMAT_VERSION = 1
+FLAG_ITEM_IDS = 0x01
+
+_HEADER = struct.Struct("<BBI")
+_BIG_ENDIAN = sys.byteorder == "big"
+_UINT32 = "I" if array("I").itemsize == 4 else "L"
+
+
+def _to_le(values: array) -> bytes:
+    if _BIG_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values
+
+
+def _pack_bits(flags: List[bool]) -> bytes:
+    packed = bytearray((len(flags) + 7) // 8)
+    for i, flag in enumerate(flags):
+        if flag:
+            packed[i >> 3] |= 1 << (i & 7)
+    return bytes(packed)
+
+
+# The 8 flags encoded by each byte value
+_BYTE_BITS = [tuple(bool(byte >> i & 1) for i in range(8)) for byte in range(256)]
+
+
+def _unpack_bits(packed: bytes, count: int) -> List[bool]:
+    flags = list(chain.from_iterable(map(_BYTE_BITS.__getitem__, packed)))
+    del flags[count:]
+    return flags
+
+
+def encode_trials(latency_ms: List[float], correct: List[bool], item_ids: Optional[List[int]] = None) -> bytes:
+    count = len(latency_ms)
+    if len(correct) != count or (item_ids is not None and len(item_ids) != count):
+        raise ValueError("Trial arrays must have the same length")
+    flags = FLAG_ITEM_IDS if item_ids is not None else 0
+    parts = [_HEADER.pack(TRIALS_FORMAT_VERSION, flags, count), _to_le(array(_UINT32, [round(v * 1000) for v in latency_ms])), _pack_bits(correct)]
+    if item_ids is not None:
+        parts.append(_to_le(array(_UINT32, item_ids)))
+    return b"".join(parts)
+
+
+def decode_trials(blob: bytes) -> Dict[str, Optional[list]]:
+    """Raises ValueError for an unknown version or a truncated blob."""
+    if len(blob) < _HEADER.size:
+        raise ValueError("Trial data is truncated")
+    version, flags, count = _HEADER.unpack_from(blob)
+    if version != TRIALS_FORMAT_VERSION:
+        raise ValueError(f"Unsupported trial data version {version}")
+
+    latency_end = _HEADER.size + 4 * count
+    bits_end = latency_end + (count + 7) // 8
+    end = bits_end + (4 * count if flags & FLAG_ITEM_IDS else 0)
+    if len(blob) != end:
+        raise ValueError("Trial data is truncated")
+
+    return {
+        "latency_ms": [us / 1000 for us in _from_le(_UINT32, blob[_HEADER.size:latency_end])],
+        "correct": _unpack_bits(blob[latency_end:bits_end], count),
+        "item_ids": _from_le(_UINT32, blob[bits_end:end]).tolist() if flags & FLAG_ITEM_IDS else None,
+    }
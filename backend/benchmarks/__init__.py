@@ -0,0 +1 @@
+# Benchmark scripts, run from backend/ as `python -m benchmarks.<name>`
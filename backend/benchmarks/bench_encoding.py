@@ -0,0 +1,120 @@
+"""Payload size and serialization CPU per route: JSON vs ORJSON vs MessagePack, plain and compressed.
+
+    python -m benchmarks.bench_encoding --repeat 2000
+
+Bodies come from the real app (httpx ASGITransport on a seeded temporary
+SQLite file, one session with --results results). Each body is decoded once
+and then re-encoded --repeat times per encoder; compression is timed on the
+JSON body. Sizes are in bytes, times in microseconds per response.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app import encoding
+from app.database import build_engine, get_db, get_read_db, get_read_session_factory
+from app.config import Settings
+from app.main import app
+from app.services.content_catalog import invalidate_catalog
+from seed_data import seed
+
+
+def stdlib_json(content) -> bytes:
+    # What JSONResponse.render does
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+async def fetch_bodies(args) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = build_engine(f"sqlite+aiosqlite:///{path}", Settings())
+    await seed(engine)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with Session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_read_session_factory] = lambda: Session
+    invalidate_catalog()
+    headers = {"Accept-Encoding": "identity"}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", headers=headers) as client:
+            session_id = (await client.post("/api/sessions")).json()["id"]
+            await client.post("/api/results/batch", json={"session_id": session_id, "results": [
+                {"exercise_type": "arithmetic", "score": i % 50, "time_seconds": 60.5, "correct_answers": i % 50,
+                 "total_questions": 50, "details": {"mode": "timed"}}
+                for i in range(args.results)
+            ]})
+            routes = {
+                "arithmetic": "/api/exercises/arithmetic",
+                "stroop": "/api/exercises/stroop",
+                "reading": "/api/exercises/reading",
+                "memory-words": "/api/exercises/memory-words",
+                "bundle": "/api/training/bundle",
+                "session": f"/api/sessions/{session_id}",
+                "results-page": "/api/results?limit=100",
+            }
+            bodies = {}
+            for name, url in routes.items():
+                response = await client.get(url)
+                response.raise_for_status()
+                bodies[name] = response.json()
+            return bodies
+    finally:
+        app.dependency_overrides.clear()
+        invalidate_catalog()
+        await engine.dispose()
+
+
+def per_call_us(fn, content, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(content)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main(args):
+    bodies = asyncio.run(fetch_bodies(args))
+    encoders = {"json": stdlib_json}
+    if encoding.orjson is not None:
+        encoders["orjson"] = encoding.dumps
+    if encoding.msgpack is not None:
+        encoders["msgpack"] = encoding.packb
+    compressors = {"gzip": lambda data: encoding.compress(data, "gzip", args.gzip_level)}
+    if encoding.brotli is not None:
+        compressors["br"] = lambda data: encoding.compress(data, "br", brotli_quality=args.brotli_quality)
+
+    size_columns = ["json"] + list(compressors) + (["msgpack", "msgpack+gzip"] if "msgpack" in encoders else [])
+    print("Size, bytes")
+    print(f"{'route':>14} " + " ".join(f"{c:>13}" for c in size_columns))
+    for name, content in bodies.items():
+        body = stdlib_json(content)
+        sizes = [len(body)] + [len(compress(body)) for compress in compressors.values()]
+        if "msgpack" in encoders:
+            packed = encoding.packb(content)
+            sizes += [len(packed), len(compressors["gzip"](packed))]
+        print(f"{name:>14} " + " ".join(f"{s:>13}" for s in sizes))
+
+    print("\nCPU per response, us")
+    print(f"{'route':>14} " + " ".join(f"{c:>13}" for c in list(encoders) + list(compressors)))
+    for name, content in bodies.items():
+        body = stdlib_json(content)
+        times = [per_call_us(fn, content, args.repeat) for fn in encoders.values()]
+        times += [per_call_us(fn, body, max(args.repeat // 10, 1)) for fn in compressors.values()]
+        print(f"{name:>14} " + " ".join(f"{t:>13.1f}" for t in times))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--results", type=int, default=100)
+    parser.add_argument("--gzip-level", type=int, default=Settings().GZIP_LEVEL)
+    parser.add_argument("--brotli-quality", type=int, default=Settings().BROTLI_QUALITY)
+    main(parser.parse_args())
@@ -0,0 +1,55 @@
+"""Throughput of server-side grading of one test, without the database write.
+
+    python -m benchmarks.bench_grading --tests 20000
+
+Arithmetic answers are checked against an in-memory id -> answer index; Stroop
+answers against the ink sequence regenerated from the test_id, once with a new
+test_id every time (cold key) and once with a key already in the LRU cache.
+"""
+import argparse
+import random
+import time
+from app.schemas.exercise import GradeRequest
+from app.services.grading_service import check_arithmetic, check_stroop
+from app.services.stroop_service import STROOP_TEST_ITEMS, stroop_answer_key
+from seed_data import STROOP_COLORS
+
+NAMES = tuple(name for name, _ in STROOP_COLORS)
+
+
+def arithmetic_case(problems: int, count: int):
+    rng = random.Random(1)
+    key = {i: rng.randrange(-100, 1000) for i in range(1, problems + 1)}
+    ids = rng.sample(sorted(key), count)
+    request = GradeRequest(time_seconds=60, answers=[{"id": i, "answer": key[i]} for i in ids])
+    return lambda test_id: check_arithmetic(key, request.answers)
+
+
+def stroop_case(cached: bool):
+    inks = stroop_answer_key(len(NAMES), 0)
+    request = GradeRequest(time_seconds=60, test_id=0, answers=[
+        {"id": i + 1, "answer": NAMES[ink]} for i, ink in enumerate(inks)
+    ])
+    if cached:
+        return lambda test_id: check_stroop(NAMES, stroop_answer_key(len(NAMES), 0), request.answers)
+    return lambda test_id: check_stroop(NAMES, stroop_answer_key(len(NAMES), test_id), request.answers)
+
+
+def main(args):
+    print(f"{'variant':>16} {'tests/s':>10}")
+    for name, fn in (("arithmetic", arithmetic_case(args.problems, args.count)),
+                     ("stroop_cold_key", stroop_case(cached=False)),
+                     ("stroop_cached", stroop_case(cached=True))):
+        started = time.perf_counter()
+        for test_id in range(1, args.tests + 1):
+            fn(test_id)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>16} {args.tests / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tests", type=int, default=20000)
+    parser.add_argument("--count", type=int, default=STROOP_TEST_ITEMS, help="arithmetic answers per test")
+    parser.add_argument("--problems", type=int, default=5000, help="size of the arithmetic answer index")
+    main(parser.parse_args())
@@ -0,0 +1,38 @@
+"""Throughput of procedural arithmetic tests, per difficulty level.
+
+    python -m benchmarks.bench_math_generator --tests 20000
+
+Times drawing the problem ids alone, rendering ArithmeticResponse bytes from
+the cached per-problem JSON, and the same through MathProblemOut models and model_dump_json.
+"""
+import argparse
+import time
+import numpy as np
+from app.schemas.exercise import ArithmeticResponse
+from app.services.math_generator import DIFFICULTIES, generate_ids, render_arithmetic_json, render_problems
+
+
+def main(args):
+    print(f"{'level':>5} {'variant':>16} {'tests/s':>10}")
+    for level, profile in DIFFICULTIES.items():
+        rng = np.random.default_rng(level)
+        variants = (
+            ("ids_only", lambda: generate_ids(profile, args.count, rng)),
+            ("to_json", lambda: render_arithmetic_json(generate_ids(profile, args.count, rng))),
+            ("to_models", lambda: ArithmeticResponse(
+                problems=render_problems(generate_ids(profile, args.count, rng))
+            ).model_dump_json().encode()),
+        )
+        for name, fn in variants:
+            started = time.perf_counter()
+            for _ in range(args.tests):
+                fn()
+            elapsed = time.perf_counter() - started
+            print(f"{level:>5} {name:>16} {args.tests / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tests", type=int, default=20000)
+    parser.add_argument("--count", type=int, default=50)
+    main(parser.parse_args())
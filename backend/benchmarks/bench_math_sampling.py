@@ -0,0 +1,73 @@
+"""Compare ORDER BY random() with id-range sampling across math_problems sizes.
+
+    python -m benchmarks.bench_math_sampling --sizes 1000 10000 100000 1000000
+    python -m benchmarks.bench_math_sampling --url postgresql+asyncpg://... --sizes 1000000
+
+Each size is built in a fresh table (a temporary SQLite file by default) with
+a few deleted rows so the id range has gaps, as after real re-seeding.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from sqlalchemy import select, func, insert, delete
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.exercise import MathProblem
+from app.services.math_service import sample_problems_by_id_range
+
+async def order_by_random(db: AsyncSession, count: int):
+    stmt = select(MathProblem).order_by(func.random()).limit(count)
+    return (await db.execute(stmt)).scalars().all()
+
+async def fill_table(engine, size: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        chunk = 50_000
+        for start in range(1, size + 1, chunk):
+            rows = [
+                {"id": i, "expression": f"{i % 97} + {i % 89}", "answer": i % 97 + i % 89, "difficulty": 1}
+                for i in range(start, min(start + chunk, size + 1))
+            ]
+            await conn.execute(insert(MathProblem), rows)
+        # Punch ~5% holes into the id range
+        await conn.execute(delete(MathProblem).where(MathProblem.id % 20 == 7))
+
+async def time_strategy(Session, strategy, count: int, repeats: int):
+    timings = []
+    async with Session() as db:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            problems = await strategy(db, count)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert len({p.id for p in problems}) == count
+    return statistics.median(timings), max(timings)
+
+async def main(args):
+    tmpdir = None
+    url = args.url
+    if url is None:
+        tmpdir = tempfile.mkdtemp()
+        url = f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    engine = create_async_engine(url)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    print(f"{'rows':>10} {'strategy':>16} {'median ms':>10} {'max ms':>10}")
+    for size in args.sizes:
+        await fill_table(engine, size)
+        for name, strategy in (("order_by_random", order_by_random), ("id_range", sample_problems_by_id_range)):
+            median, worst = await time_strategy(Session, strategy, args.count, args.repeats)
+            print(f"{size:>10} {name:>16} {median:>10.2f} {worst:>10.2f}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
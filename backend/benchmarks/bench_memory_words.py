@@ -0,0 +1,76 @@
+"""Memory-word sampling: the old pick-three-lists sampler vs the flat word index.
+
+    python -m benchmarks.bench_memory_words --tests 20000
+
+Runs on the seeded categories and on a synthetic index (--categories x
+--words-per-category). Besides tests/s it reports how lumpy the category mix
+is (mean difference between the most and least represented category of a
+test) and how many words of each test were already in the previous one.
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from app.services.content_catalog import ContentCatalog
+from app.services.memory_service import sample_word_indices
+from seed_data import WORD_CATEGORIES
+
+
+def build_catalog(categories: dict) -> ContentCatalog:
+    catalog = ContentCatalog()
+    catalog.set_word_lists(list(categories.items()))
+    return catalog
+
+
+def legacy(catalog: ContentCatalog, count: int, rng: random.Random):
+    # The list-based sampler: three random lists, shuffled, first `count` words
+    words = [w for words in rng.sample(catalog.word_lists, min(3, len(catalog.word_lists))) for w in words]
+    rng.shuffle(words)
+    return words[:count]
+
+
+def run(name: str, catalog: ContentCatalog, sampler, args):
+    rng = random.Random(0)
+    started = time.perf_counter()
+    for _ in range(args.tests):
+        sampler(rng)
+    elapsed = time.perf_counter() - started
+
+    category_of = {word: catalog.word_categories[i] for i, word in enumerate(catalog.words)}
+    spread = repeats = 0
+    previous = set()
+    for _ in range(1000):
+        words = sampler(rng)
+        per_category = Counter(category_of[w] for w in words)
+        spread += max(per_category.values()) - min(per_category.get(c, 0) for c in range(len(catalog.categories)))
+        repeats += len(previous & set(words))
+        previous = set(words)
+    print(f"{name:>24} {args.tests / elapsed:>10.0f} {spread / 1000:>8.2f} {repeats / 1000:>8.2f}")
+
+
+def main(args):
+    synthetic = {
+        f"c{c}": [f"w{c}_{i}" for i in range(args.words_per_category)] for c in range(args.categories)
+    }
+    print(f"{'sampler':>24} {'tests/s':>10} {'spread':>8} {'repeats':>8}")
+    for label, catalog in (("seed", build_catalog(WORD_CATEGORIES)), ("synthetic", build_catalog(synthetic))):
+        run(f"{label}/legacy", catalog, lambda rng: legacy(catalog, args.count, rng), args)
+        run(f"{label}/flat", catalog,
+            lambda rng: [catalog.words[i] for i in sample_word_indices(catalog, args.count, 0, rng)[0]], args)
+        state = {"seen": 0, "last": 0}
+
+        def with_history(rng):
+            indices, state["seen"] = sample_word_indices(catalog, args.count, state["seen"], rng, state["last"])
+            state["last"] = sum(1 << i for i in indices)
+            return [catalog.words[i] for i in indices]
+
+        run(f"{label}/flat+seen", catalog, with_history, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tests", type=int, default=20000)
+    parser.add_argument("--count", type=int, default=12)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--words-per-category", type=int, default=500)
+    main(parser.parse_args())
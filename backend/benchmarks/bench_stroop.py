@@ -0,0 +1,52 @@
+"""Throughput of Stroop test generation, old per-item loop vs index generator.
+
+    python -m benchmarks.bench_stroop --tests 5000
+"""
+import argparse
+import random
+import time
+from app.schemas.exercise import StroopItem, StroopResponse
+from app.services.stroop_service import (
+    get_stroop_table, generate_stroop_indices, render_stroop_items, render_stroop_json
+)
+from seed_data import STROOP_COLORS
+
+NAMES = tuple(name for name, _ in STROOP_COLORS)
+CODES = tuple(code for _, code in STROOP_COLORS)
+
+def legacy(count):
+    # The pre-index implementation: rebuild the candidate list for every item
+    colors = list(range(len(NAMES)))
+    items = []
+    for i in range(count):
+        word = random.choice(colors)
+        display = random.choice([c for c in colors if c != word])
+        items.append(StroopItem(id=i + 1, word=NAMES[word].upper(), display_color=CODES[display], correct_answer=NAMES[display]))
+    return StroopResponse(items=items).model_dump_json().encode()
+
+def indices_only(count):
+    return generate_stroop_indices(len(NAMES), count, random.Random())
+
+def indices_to_models(count):
+    words, inks = generate_stroop_indices(len(NAMES), count, random.Random())
+    return StroopResponse(items=render_stroop_items(get_stroop_table(NAMES, CODES), words, inks)).model_dump_json().encode()
+
+def indices_to_json(count):
+    words, inks = generate_stroop_indices(len(NAMES), count, random.Random())
+    return render_stroop_json(get_stroop_table(NAMES, CODES), words, inks)
+
+def main(args):
+    print(f"{'variant':>18} {'tests/s':>10}")
+    for name, fn in (("legacy_models", legacy), ("indices_only", indices_only),
+                     ("indices_to_models", indices_to_models), ("indices_to_json", indices_to_json)):
+        started = time.perf_counter()
+        for _ in range(args.tests):
+            fn(args.count)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>18} {args.tests / elapsed:>10.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tests", type=int, default=5000)
+    parser.add_argument("--count", type=int, default=50)
+    main(parser.parse_args())
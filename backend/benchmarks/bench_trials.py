@@ -0,0 +1,53 @@
+"""Compare per-trial arrays stored as JSON in `details` with the packed trials column.
+
+    python -m benchmarks.bench_trials --counts 50 120 1000
+
+For each trial count: stored size, and median time to encode and to decode
+one result (json.dumps/json.loads of the details dict vs trial_codec).
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from app.services.trial_codec import encode_trials, decode_trials
+
+
+def make_trials(count: int) -> dict:
+    rng = random.Random(count)
+    return {
+        # What performance.now() differences look like after rounding in the browser
+        "latency_ms": [round(rng.uniform(250, 2500), 1) for _ in range(count)],
+        "correct": [rng.random() < 0.85 for _ in range(count)],
+        "item_ids": [rng.randrange(1, 5000) for _ in range(count)],
+    }
+
+
+def median_us(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(timings)
+
+
+def main(args):
+    print(f"{'trials':>7} {'json B':>8} {'packed B':>9} {'ratio':>6} "
+          f"{'json enc us':>12} {'pack us':>8} {'json parse us':>14} {'unpack us':>10}")
+    for count in args.counts:
+        trials = make_trials(count)
+        as_json = json.dumps({"trials": trials})
+        packed = encode_trials(**trials)
+        print(f"{count:>7} {len(as_json):>8} {len(packed):>9} {len(as_json) / len(packed):>6.1f} "
+              f"{median_us(lambda: json.dumps({'trials': trials}), args.repeats):>12.1f} "
+              f"{median_us(lambda: encode_trials(**trials), args.repeats):>8.1f} "
+              f"{median_us(lambda: json.loads(as_json), args.repeats):>14.1f} "
+              f"{median_us(lambda: decode_trials(packed), args.repeats):>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[50, 120, 1000])
+    parser.add_argument("--repeats", type=int, default=2000)
+    main(parser.parse_args())
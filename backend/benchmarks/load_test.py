@@ -0,0 +1,245 @@
+"""HTTP load test: concurrent users walking through a full training session.
+
+    python -m benchmarks.load_test --users 32 --flows 200 --save baseline.json
+    python -m benchmarks.load_test --compare baseline.json
+    python -m benchmarks.load_test --url http://localhost:8000 --users 16
+
+Each flow is what the frontend does: create a session, then for each of the
+five exercises fetch its content (counting has none) and post the result.
+Latencies are recorded per route and reported as req/s and p50/p95/p99.
+
+Without --url every config runs app.main:app in-process over httpx
+ASGITransport, in its own subprocess so that DATABASE_URL and the other
+settings are read fresh, with the app lifespan (catalog, payload pools,
+result writer) running as in production. With --url the flow is driven
+against an already running server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+# Environment overrides per config; "{tmp}" is a fresh temporary directory
+CONFIGS = {
+    "sqlite": {"DATABASE_URL": "sqlite+aiosqlite:///{tmp}/load_test.db"},
+    "memory": {"DATABASE_URL": "sqlite+aiosqlite:///:memory:"},
+    "sqlite_queued": {"DATABASE_URL": "sqlite+aiosqlite:///{tmp}/load_test.db", "RESULT_INGESTION_MODE": "queued"},
+}
+
+EXERCISES = [
+    ("counting", None),
+    ("arithmetic", "/api/exercises/arithmetic"),
+    ("reading", "/api/exercises/reading"),
+    ("stroop", "/api/exercises/stroop"),
+    ("memory", "/api/exercises/memory-words"),
+]
+
+RESULT = {"score": 42, "time_seconds": 95.0, "correct_answers": 42, "total_questions": 50}
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.error_kinds: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client, method: str, path: str, route: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            response.raise_for_status()
+        except Exception as exc:
+            self.errors[route] += 1
+            status = getattr(getattr(exc, "response", None), "status_code", None)
+            reason = status or re.sub(r"0x[0-9a-f]+", "0x", str(exc).splitlines()[0][:100]) or type(exc).__name__
+            self.error_kinds[f"{route}: {reason}"] += 1
+            response = None
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        return response
+
+    def summary(self, elapsed: float, flows: int) -> dict:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            values.sort()
+            routes[route] = {
+                "requests": len(values),
+                "errors": self.errors[route],
+                "rps": round(len(values) / elapsed, 1),
+                "p50_ms": round(percentile(values, 50), 3),
+                "p95_ms": round(percentile(values, 95), 3),
+                "p99_ms": round(percentile(values, 99), 3),
+            }
+        total = sum(r["requests"] for r in routes.values())
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "flows_per_s": round(flows / elapsed, 1),
+            "rps": round(total / elapsed, 1),
+            "errors": sum(self.errors.values()),
+            "error_kinds": dict(self.error_kinds),
+            "routes": routes,
+        }
+
+
+async def run_flow(client, recorder: Recorder, think: float) -> None:
+    response = await recorder.call(client, "POST", "/api/sessions", "POST /api/sessions")
+    session_id = response.json()["id"] if response is not None else None
+    for exercise_type, path in EXERCISES:
+        if path is not None:
+            await recorder.call(client, "GET", path, f"GET {path}")
+        if think:
+            await asyncio.sleep(think)
+        await recorder.call(
+            client, "POST", "/api/results", "POST /api/results",
+            json={**RESULT, "exercise_type": exercise_type, "session_id": session_id},
+        )
+
+
+async def drive(client, users: int, flows: int, think: float) -> dict:
+    # One warm-up flow so lazy loading is not billed to the first users
+    await run_flow(client, Recorder(), 0)
+
+    recorder = Recorder()
+    remaining = [flows]
+
+    async def user():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            await run_flow(client, recorder, think)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(users)))
+    return recorder.summary(time.perf_counter() - started, flows)
+
+
+async def run_in_process(args) -> dict:
+    # Imported here: settings are read from the environment the parent prepared
+    from httpx import AsyncClient, ASGITransport
+    import seed_data
+    from app.main import app
+
+    await seed_data.seed()
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://load-test") as client:
+            return await drive(client, args.users, args.flows, args.think_ms / 1000)
+
+
+async def run_against_url(args) -> dict:
+    from httpx import AsyncClient, Limits
+
+    limits = Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        return await drive(client, args.users, args.flows, args.think_ms / 1000)
+
+
+def run_config(name: str, args) -> dict:
+    """Run one config in a child process and return its summary."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update({key: value.format(tmp=tmp) for key, value in CONFIGS[name].items()})
+        command = [
+            sys.executable, "-m", "benchmarks.load_test", "--child",
+            "--users", str(args.users), "--flows", str(args.flows), "--think-ms", str(args.think_ms),
+        ]
+        output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    # seed_data prints a status line first; the summary is the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_table(name: str, summary: dict) -> None:
+    print(f"\n[{name}] {summary['flows_per_s']} flows/s, {summary['rps']} req/s, {summary['errors']} errors")
+    print(f"{'route':<34} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for route, r in summary["routes"].items():
+        print(f"{route:<34} {r['rps']:>9} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['errors']:>7}")
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Print per-route deltas against a baseline; return the number of regressions."""
+    regressions = 0
+    print(f"\nComparison with baseline ({baseline['meta'].get('commit') or 'unknown commit'}), "
+          f"regression threshold {threshold:.0f}%")
+    print(f"{'config / route':<48} {'metric':>7} {'base':>9} {'now':>9} {'delta':>8}")
+    for name, summary in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<48} not in baseline")
+            continue
+        for route, now in summary["routes"].items():
+            before = base["routes"].get(route)
+            if before is None:
+                continue
+            for metric, higher_is_worse in (("rps", False), ("p50_ms", True), ("p95_ms", True), ("p99_ms", True)):
+                if not before[metric]:
+                    continue
+                delta = (now[metric] - before[metric]) / before[metric] * 100
+                worse = delta > threshold if higher_is_worse else delta < -threshold
+                regressions += worse
+                print(f"{name + ' ' + route:<48} {metric:>7} {before[metric]:>9} {now[metric]:>9} "
+                      f"{delta:>+7.1f}%{' !' if worse else ''}")
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(args) -> int:
+    if args.child:
+        print(json.dumps(asyncio.run(run_in_process(args))))
+        return 0
+
+    if args.url:
+        results = {args.url: asyncio.run(run_against_url(args))}
+    else:
+        results = {name: run_config(name, args) for name in args.configs}
+    report = {
+        "meta": {"commit": git_commit(), "users": args.users, "flows": args.flows, "think_ms": args.think_ms},
+        "results": results,
+    }
+    for name, summary in results.items():
+        print_table(name, summary)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"\n{regressions} metric(s) regressed by more than {args.threshold:.0f}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=32, help="concurrent virtual users")
+    parser.add_argument("--flows", type=int, default=200, help="training sessions to run in total")
+    parser.add_argument("--think-ms", type=float, default=0, help="pause before posting each result")
+    parser.add_argument("--configs", nargs="+", default=["sqlite", "memory"], choices=list(CONFIGS))
+    parser.add_argument("--url", help="drive a running server instead of in-process configs")
+    parser.add_argument("--save", help="write the report as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to diff against; exits 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=25.0, help="regression threshold, percent (p99 is noisy)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    sys.exit(main(parser.parse_args()))
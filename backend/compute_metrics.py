@@ -0,0 +1,58 @@
+"""Compute cognitive metrics for every session in batches.
+
+    python compute_metrics.py
+    python compute_metrics.py --since 2026-01-01 --until 2026-02-01 --output january.csv
+
+Prints the distribution of each metric across the sessions (JSON); with
+--output also writes one CSV row of metrics per session. See
+app/services/cognitive_metrics.py for the definitions.
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+from app.database import ReadSessionLocal
+from app.services import cognitive_metrics
+
+
+async def run(args, session_factory=ReadSessionLocal) -> dict:
+    sessions = 0
+    with contextlib.ExitStack() as stack:
+        writer = None
+        if args.output:
+            output = stack.enter_context(open(args.output, "w", newline="", encoding="utf-8"))
+            writer = csv.DictWriter(output, fieldnames=["session_id", *cognitive_metrics.METRIC_NAMES])
+            writer.writeheader()
+
+        def on_batch(batch):
+            nonlocal sessions
+            sessions += len(batch)
+            if writer is not None:
+                writer.writerows(batch.rows())
+
+        async with session_factory() as db:
+            metrics = await cognitive_metrics.history_summary(
+                db, args.since, args.until, args.batch_sessions, on_batch=on_batch
+            )
+    return {"sessions": sessions, "metrics": metrics}
+
+
+def main(args) -> int:
+    started = time.perf_counter()
+    summary = asyncio.run(run(args))
+    summary["elapsed_s"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=datetime.fromisoformat, help="sessions started at or after this time")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="sessions started before this time")
+    parser.add_argument("--output", help="CSV file for per-session metrics")
+    parser.add_argument("--batch-sessions", type=int, default=cognitive_metrics.BATCH_SESSIONS)
+    sys.exit(main(parser.parse_args()))
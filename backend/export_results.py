@@ -0,0 +1,81 @@
+"""Export exercise_results to CSV or Parquet.
+
+    python export_results.py results.csv
+    python export_results.py results.parquet --since-id 1200
+    python export_results.py nightly.parquet --state export.watermark
+
+The format follows the file extension unless --format is given. Rows are
+streamed in id order, --chunk-rows at a time, with `details` flattened into
+"details.<key>" columns (see app/services/export_service.py). Parquet needs
+pyarrow (pip install pyarrow).
+
+With --state the export starts after the watermark stored in that file and,
+once the output is complete, stores the new one, so a nightly job only
+exports rows added since its previous run. The output is written to a
+temporary file and renamed, so a failed run leaves neither a partial export
+nor an advanced watermark.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from app.config import settings
+from app.database import ReadSessionLocal
+from app.services import export_service
+
+
+def read_watermark(path: str) -> int:
+    try:
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def write_watermark(path: str, watermark: int) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(f"{watermark}\n")
+    os.replace(tmp, path)
+
+
+async def export(output: str, format: str, since_id: int, chunk_rows: int, session_factory=ReadSessionLocal):
+    tmp = f"{output}.part"
+    async with session_factory() as db:
+        plan = await export_service.plan_export(db, since_id, chunk_rows)
+        with open(tmp, "wb") as f:
+            async for chunk in export_service.export_chunks(format, db, plan, chunk_rows):
+                f.write(chunk.encode() if isinstance(chunk, str) else chunk)
+    os.replace(tmp, output)
+    return plan
+
+
+def main(args) -> int:
+    format = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if format not in export_service.FORMATS:
+        print(f"Unknown format {format!r}; use --format csv or --format parquet", file=sys.stderr)
+        return 2
+    if format == "parquet" and not export_service.parquet_available():
+        print("Parquet export needs pyarrow: pip install pyarrow", file=sys.stderr)
+        return 2
+
+    since_id = args.since_id if args.since_id is not None else read_watermark(args.state) if args.state else 0
+    started = time.perf_counter()
+    plan = asyncio.run(export(args.output, format, since_id, args.chunk_rows))
+    if args.state:
+        write_watermark(args.state, plan.watermark)
+    span = f"id {plan.since_id + 1}..{plan.watermark}" if plan.rows else f"nothing after id {plan.since_id}"
+    print(f"Exported {plan.rows} rows ({span}, {len(plan.details_kinds)} details columns) "
+          f"to {args.output} in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="file to write (.csv or .parquet)")
+    parser.add_argument("--format", choices=list(export_service.FORMATS))
+    parser.add_argument("--since-id", type=int, help="export rows with a larger id (overrides --state)")
+    parser.add_argument("--state", help="file holding the watermark between incremental runs")
+    parser.add_argument("--chunk-rows", type=int, default=settings.EXPORT_CHUNK_ROWS)
+    sys.exit(main(parser.parse_args()))
@@ -1,6 +1,29 @@
+"""Seed the exercise content tables.
+
+Safe to run on every start: only content tables are written, user data
+(training_sessions, exercise_results) is never touched, and when the checksum
+of the dataset below matches the one stored in content_meta nothing is
+written at all. Pass --force to rewrite the content anyway.
+
+With --build-content PATH the content is compiled into a standalone SQLite
+file instead (done at image build time). When CONTENT_DATABASE_PATH points to
+such a file, connections ATTACH it read-only and seeding only prepares the
+user tables of the main database.
+"""
+import argparse
 import asyncio
-from app.database import AsyncSessionLocal, engine, Base
-from app.models.exercise import MathProblem, ReadingText, WordList, StroopColor, ExerciseType
+import hashlib
+import json
+import os
+import time
+from sqlalchemy import select, delete, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from app.config import settings, Settings
+from app.database import engine as default_engine, Base
+from app.models.exercise import MathProblem, ReadingText, WordList, StroopColor, ExerciseType, ContentMeta
+from app.services.text_metrics import text_metrics
+# Registers the result tables with Base.metadata so create_all creates them
+from app.models import result  # noqa: F401
 
 STROOP_COLORS = [
     ("красный", "#FF0000"),
@@ -49,43 +72,146 @@ READING_TEXTS = [
     Вечером в саду особенно хорошо. Солнце опускается за горизонт, окрашивая облака в розовый цвет. Птицы поют последние песни перед сном. Аромат цветов становится ещё сильнее. На скамейке под яблоней приятно посидеть, отдыхая после трудового дня. Весенний сад наполняет сердце радостью и надеждой на хорошее лето, богатый урожай и счастливые дни."""),
 ]
 
-async def seed():
+CONTENT_KEY = "content"
+
+
+def content_rows() -> dict:
+    """Rows of every content table, with explicit ids so they stay stable across reseeds."""
+    math = []
+    for a in range(1, 21):
+        for b in range(1, 21):
+            math.append({"expression": f"{a} + {b}", "answer": a + b, "difficulty": 1})
+            if a >= b:
+                math.append({"expression": f"{a} - {b}", "answer": a - b, "difficulty": 1})
+    for a in range(2, 11):
+        for b in range(2, 11):
+            math.append({"expression": f"{a} × {b}", "answer": a * b, "difficulty": 2})
+
+    tables = {
+        ExerciseType: [
+            {"name": name, "description": desc, "duration_seconds": duration, "instructions": instructions}
+            for name, desc, duration, instructions in EXERCISE_TYPES
+        ],
+        StroopColor: [{"color_name": name, "color_code": code} for name, code in STROOP_COLORS],
+        MathProblem: math,
+        WordList: [
+            {"category": category, "words": words, "difficulty": 1}
+            for category, words in WORD_CATEGORIES.items()
+        ],
+        ReadingText: [
+            {"title": title, "content": content, **text_metrics(content)}
+            for title, content in READING_TEXTS
+        ],
+    }
+    return {model: [{"id": i, **row} for i, row in enumerate(rows, 1)] for model, rows in tables.items()}
+
+
+def content_checksum(rows: dict) -> str:
+    digest = hashlib.sha256()
+    for model, table_rows in rows.items():
+        digest.update(model.__tablename__.encode())
+        digest.update(json.dumps(table_rows, ensure_ascii=False, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def content_tables() -> list:
+    return [model.__table__ for model in content_rows()] + [ContentMeta.__table__]
+
+
+async def recreate_content_tables(conn, rows: dict) -> None:
+    """Drop and recreate the content tables so they match the models.
+
+    create_all never adds columns to an existing table, and the Alembic
+    migrations do not run on SQLite; content tables hold no user data.
+    """
+    tables = [model.__table__ for model in rows]
+    await conn.run_sync(Base.metadata.drop_all, tables=tables)
+    await conn.run_sync(Base.metadata.create_all, tables=tables)
+
+
+async def write_content(conn, rows: dict, checksum: str) -> int:
+    # One transaction: readers see either the old or the new content
+    for model, table_rows in rows.items():
+        await conn.execute(delete(model))
+        # A list of parameter sets runs as a single executemany
+        await conn.execute(insert(model), table_rows)
+    row_count = sum(len(table_rows) for table_rows in rows.values())
+    await conn.execute(delete(ContentMeta).where(ContentMeta.key == CONTENT_KEY))
+    await conn.execute(insert(ContentMeta).values(key=CONTENT_KEY, checksum=checksum, row_count=row_count))
+    return row_count
+
+
+async def seed(engine: AsyncEngine = default_engine, force: bool = False, config: Settings = settings) -> bool:
+    """Bring the content tables in line with this file; returns False if they already were."""
+    started = time.perf_counter()
+    if config.CONTENT_DATABASE_PATH:
+        await prepare_user_tables(engine)
+        print(f"✅ Content served from {config.CONTENT_DATABASE_PATH}, user tables ready "
+              f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+        return False
+
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+        # Creates missing tables only; existing ones and their rows are left alone
         await conn.run_sync(Base.metadata.create_all)
 
-    async with AsyncSessionLocal() as db:
-        # Exercise types
-        for name, desc, duration, instructions in EXERCISE_TYPES:
-            et = ExerciseType(name=name, description=desc, duration_seconds=duration, instructions=instructions)
-            db.add(et)
-
-        # Stroop colors
-        for name, code in STROOP_COLORS:
-            db.add(StroopColor(color_name=name, color_code=code))
-
-        # Math problems
-        for a in range(1, 21):
-            for b in range(1, 21):
-                db.add(MathProblem(expression=f"{a} + {b}", answer=a+b, difficulty=1))
-                if a >= b:
-                    db.add(MathProblem(expression=f"{a} - {b}", answer=a-b, difficulty=1))
-
-        for a in range(2, 11):
-            for b in range(2, 11):
-                db.add(MathProblem(expression=f"{a} × {b}", answer=a*b, difficulty=2))
-
-        # Word lists
-        for category, words in WORD_CATEGORIES.items():
-            db.add(WordList(category=category, words=words, difficulty=1))
-
-        # Reading texts
-        for title, content in READING_TEXTS:
-            word_count = len(content.split())
-            db.add(ReadingText(title=title, content=content, word_count=word_count, difficulty=1))
-
-        await db.commit()
-        print("✅ Seed data inserted successfully!")
+    rows = content_rows()
+    checksum = content_checksum(rows)
+    async with engine.begin() as conn:
+        stored = (await conn.execute(
+            select(ContentMeta.checksum).where(ContentMeta.key == CONTENT_KEY)
+        )).scalar_one_or_none()
+        if stored == checksum and not force:
+            print(f"✅ Seed data unchanged, skipped ({(time.perf_counter() - started) * 1000:.0f} ms)")
+            return False
+        # A DML statement first: pysqlite only opens its transaction before DML,
+        # and the DDL below has to run inside it so readers never miss a table
+        await conn.execute(delete(ContentMeta).where(ContentMeta.key == CONTENT_KEY))
+        await recreate_content_tables(conn, rows)
+        row_count = await write_content(conn, rows, checksum)
+
+    print(f"✅ Seed data inserted successfully! {row_count} rows in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return True
+
+
+async def prepare_user_tables(engine: AsyncEngine) -> None:
+    """Create the user tables in main and drop content tables left there by earlier seeding.
+
+    Content tables in main would shadow the attached content database.
+    """
+    content = content_tables()
+    user_tables = [table for table in Base.metadata.sorted_tables if table not in content]
+    async with engine.begin() as conn:
+        for table in content:
+            await conn.exec_driver_sql(f'DROP TABLE IF EXISTS main."{table.name}"')
+        await conn.run_sync(Base.metadata.create_all, tables=user_tables)
+
+
+async def build_content_db(path: str) -> int:
+    """Compile the content tables into a fresh standalone SQLite file."""
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    try:
+        rows = content_rows()
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=content_tables())
+            row_count = await write_content(conn, rows, content_checksum(rows))
+        # Compact the file and leave no -wal/-journal next to it: it is opened with immutable=1
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+            await conn.exec_driver_sql("VACUUM")
+    finally:
+        await engine.dispose()
+    print(f"✅ Content database built: {path} ({row_count} rows)")
+    return row_count
 
 if __name__ == "__main__":
-    asyncio.run(seed())
+    parser = argparse.ArgumentParser(description="Seed exercise content")
+    parser.add_argument("--force", action="store_true", help="rewrite content even if the checksum matches")
+    parser.add_argument("--build-content", metavar="PATH", help="compile the content into a read-only SQLite file")
+    args = parser.parse_args()
+    if args.build_content:
+        asyncio.run(build_content_db(args.build_content))
+    else:
+        asyncio.run(seed(force=args.force))
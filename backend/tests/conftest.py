@@ -6,8 +6,9 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_read_db, get_read_session_factory
 from app.models.exercise import MathProblem, StroopColor, WordList, ReadingText
+from app.services.content_catalog import invalidate_catalog
 
 # Используем SQLite для тестов (in-memory)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -68,7 +69,10 @@ async def seeded_db(test_db):
     ))
 
     await test_db.commit()
+    # Каталог контента кэшируется на уровне процесса - сбрасываем его между тестами
+    invalidate_catalog()
     yield test_db
+    invalidate_catalog()
 
 @pytest_asyncio.fixture
 async def client(seeded_db):
@@ -77,6 +81,11 @@ async def client(seeded_db):
         yield seeded_db
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    # Потоковые ответы открывают собственную сессию
+    app.dependency_overrides[get_read_session_factory] = lambda: sessionmaker(
+        seeded_db.bind, class_=AsyncSession, expire_on_commit=False
+    )
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
@@ -0,0 +1,30 @@
+import pytest
+from httpx import AsyncClient
+
+
+class TestSessionMetrics:
+    """Тесты для GET /api/sessions/{id}/metrics и GET /api/metrics/history"""
+
+    @pytest.mark.asyncio
+    async def test_metrics_from_stored_results(self, client: AsyncClient):
+        text_id = (await client.get("/api/exercises/reading")).json()["id"]  # 10 слов
+        session_id = (await client.post("/api/sessions")).json()["id"]
+        await client.post("/api/results/batch", json={"session_id": session_id, "results": [
+            {"exercise_type": "arithmetic", "score": 99, "time_seconds": 90.0, "correct_answers": 30, "total_questions": 50},
+            {"exercise_type": "reading", "score": 0, "time_seconds": 4.0, "correct_answers": 0, "total_questions": 0,
+             "details": {"text_id": text_id}},
+        ]})
+
+        data = (await client.get(f"/api/sessions/{session_id}/metrics")).json()
+        # Считается по correct_answers, а не по присланному клиентом score
+        assert data["arithmetic_per_minute"] == pytest.approx(20.0)
+        assert data["reading_wpm"] == pytest.approx(150.0)
+        assert data["memory_recall_rate"] is None
+
+        history = (await client.get("/api/metrics/history")).json()
+        assert history["metrics"]["reading_wpm"]["sessions"] == 1
+        assert history["metrics"]["reading_wpm"]["median"] == pytest.approx(150.0)
+
+    @pytest.mark.asyncio
+    async def test_unknown_session(self, client: AsyncClient):
+        assert (await client.get("/api/sessions/999999/metrics")).status_code == 404
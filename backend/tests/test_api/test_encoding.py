@@ -0,0 +1,162 @@
+import gzip
+import json
+import zlib
+import pytest
+from httpx import AsyncClient
+from app import encoding
+from app.encoding import CompressionMiddleware, choose_encoding, wants_msgpack
+
+needs_msgpack = pytest.mark.skipif(encoding.msgpack is None, reason="msgpack не установлен")
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+async def _run(app, accept_encoding="gzip", minimum_size=100):
+    """Сообщения, отправленные CompressionMiddleware"""
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    await CompressionMiddleware(app, minimum_size=minimum_size)(scope, None, send)
+    return sent
+
+
+def _streaming_app(*chunks, content_type=b"application/x-ndjson"):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+
+class TestNegotiation:
+    """Тесты выбора кодировки и формата"""
+
+    def test_choose_encoding(self):
+        assert choose_encoding(None) is None
+        assert choose_encoding("identity") is None
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("gzip;q=0, deflate") is None
+        expected = "br" if encoding.brotli is not None else "gzip"
+        assert choose_encoding("gzip, deflate, br") == expected
+        assert choose_encoding("*") == expected
+
+    @needs_msgpack
+    def test_wants_msgpack(self):
+        assert wants_msgpack("application/msgpack")
+        assert wants_msgpack("application/x-msgpack, application/json;q=0.5")
+        assert not wants_msgpack("application/json, application/msgpack;q=0.5")
+        assert not wants_msgpack("*/*")
+        assert not wants_msgpack(None)
+
+
+@pytest.mark.asyncio
+class TestCompressionMiddleware:
+    """Тесты сжатия ответов"""
+
+    async def test_small_body_not_compressed(self):
+        sent = await _run(_streaming_app(b"x" * 50))
+        assert dict(sent[0]["headers"]).get(b"content-encoding") is None
+        assert sent[1]["body"] == b"x" * 50
+
+    async def test_large_body_compressed(self):
+        sent = await _run(_streaming_app(b"x" * 500))
+        headers = dict(sent[0]["headers"])
+        assert headers[b"content-encoding"] == b"gzip"
+        assert headers[b"vary"] == b"Accept-Encoding"
+        assert int(headers[b"content-length"]) == len(sent[1]["body"])
+        assert gzip.decompress(sent[1]["body"]) == b"x" * 500
+
+    async def test_stream_chunks_decodable_as_they_arrive(self):
+        rows = [json.dumps({"id": i}).encode() + b"\n" for i in range(3)]
+        sent = await _run(_streaming_app(*rows, b""))
+        assert b"content-length" not in dict(sent[0]["headers"])
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        # Каждая строка NDJSON расшифровывается до прихода следующей
+        for row, message in zip(rows, sent[1:]):
+            assert decoder.decompress(message["body"]) == row
+        assert sent[-1]["more_body"] is False
+
+    async def test_vary_merged_with_existing(self):
+        async def app(scope, receive, send):
+            headers = [(b"content-type", b"application/json"), (b"vary", b"Accept")]
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b"x" * 500})
+
+        sent = await _run(app)
+        assert [v for k, v in sent[0]["headers"] if k == b"vary"] == [b"Accept, Accept-Encoding"]
+
+    async def test_parquet_passthrough(self):
+        sent = await _run(_streaming_app(b"PAR1" * 100, content_type=b"application/vnd.apache.parquet"))
+        assert b"content-encoding" not in dict(sent[0]["headers"])
+
+    @pytest.mark.skipif(encoding.brotli is None, reason="brotli не установлен")
+    async def test_brotli(self):
+        sent = await _run(_streaming_app(b"x" * 500), accept_encoding="br, gzip")
+        assert dict(sent[0]["headers"])[b"content-encoding"] == b"br"
+        assert encoding.brotli.decompress(sent[1]["body"]) == b"x" * 500
+
+
+@pytest.mark.asyncio
+class TestEncodedResponses:
+    """Тесты MessagePack и сжатия на эндпоинтах"""
+
+    async def test_arithmetic_gzip(self, client: AsyncClient):
+        response = await client.get("/api/exercises/arithmetic", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["problems"]) == 50
+
+    async def test_small_response_not_compressed(self, client: AsyncClient):
+        response = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    @needs_msgpack
+    async def test_reading_msgpack(self, client: AsyncClient):
+        as_json = (await client.get("/api/exercises/reading")).json()
+        response = await client.get("/api/exercises/reading", headers=MSGPACK)
+        assert response.headers["content-type"] == "application/msgpack"
+        text = encoding.msgpack.unpackb(response.content)
+        assert set(text) == set(as_json)
+        assert text["content"]
+
+    @needs_msgpack
+    async def test_pooled_payload_msgpack(self, client: AsyncClient):
+        response = await client.get("/api/exercises/stroop", headers=MSGPACK)
+        assert response.headers["content-type"] == "application/msgpack"
+        assert len(encoding.msgpack.unpackb(response.content)["items"]) == 50
+
+    @needs_msgpack
+    async def test_bundle_msgpack(self, client: AsyncClient):
+        response = await client.get("/api/training/bundle", headers={**MSGPACK, "Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        bundle = encoding.msgpack.unpackb(response.content)
+        assert len(bundle["arithmetic"]["problems"]) == 50
+
+    async def test_vary_accept_on_negotiated_routes(self, client: AsyncClient):
+        for accept in ("application/json", "application/msgpack"):
+            response = await client.get("/api/exercises/arithmetic",
+                                        headers={"Accept": accept, "Accept-Encoding": "gzip"})
+            # Кэш не должен отдать MessagePack клиенту, ожидающему JSON
+            assert response.headers.get_list("vary") == ["Accept, Accept-Encoding"]
+        response = await client.get("/api/exercises/memory-words", headers={"Accept-Encoding": "identity"})
+        assert response.headers["vary"] == "Accept"
+
+    async def test_json_unchanged(self, client: AsyncClient):
+        response = await client.post("/api/sessions")
+        assert response.headers["content-type"] == "application/json"
+        assert json.loads(response.content) == response.json()
+
+    async def test_ndjson_stream_compressed(self, client: AsyncClient):
+        session_id = (await client.post("/api/sessions")).json()["id"]
+        for score in range(40):
+            await client.post("/api/results", json={
+                "session_id": session_id, "exercise_type": "arithmetic", "score": score,
+                "time_seconds": 60, "correct_answers": score, "total_questions": 50,
+            })
+        response = await client.get("/api/results", params={"format": "ndjson"},
+                                    headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 40
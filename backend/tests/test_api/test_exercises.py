@@ -1,5 +1,7 @@
 import pytest
 from httpx import AsyncClient
+from app.config import settings
+from app.services.math_generator import GENERATED_ID_BASE
 
 
 class TestArithmeticEndpoint:
@@ -149,6 +151,15 @@ class TestMemoryWordsEndpoint:
         assert "memorize_time_seconds" in data
         assert "recall_time_seconds" in data
 
+    @pytest.mark.asyncio
+    async def test_session_gets_all_words_before_repeats(self, client: AsyncClient):
+        """В тестовой БД 12 слов: второй набор сессии - те же слова, но уже новый круг"""
+        session_id = (await client.post("/api/sessions")).json()["id"]
+        first = (await client.get(f"/api/exercises/memory-words?session_id={session_id}")).json()["words"]
+        second = (await client.get(f"/api/exercises/memory-words?session_id={session_id}")).json()["words"]
+        assert sorted(first) == sorted(second)
+        assert len(set(second)) == 12
+
 
 class TestReadingEndpoint:
     """Тесты для GET /api/exercises/reading"""
@@ -171,3 +182,159 @@ class TestReadingEndpoint:
         response = await client.get("/api/exercises/reading")
         data = response.json()
         assert len(data["content"]) > 50, "Текст слишком короткий"
+
+    @pytest.mark.asyncio
+    async def test_selects_by_length_and_difficulty(self, client: AsyncClient):
+        # Тестовый текст: 10 слов, сложность 1
+        response = await client.get("/api/exercises/reading?min_words=5&max_words=20&max_difficulty=1")
+        assert response.status_code == 200
+        assert response.json()["difficulty"] == 1
+
+    @pytest.mark.asyncio
+    async def test_no_matching_text_returns_404(self, client: AsyncClient):
+        response = await client.get("/api/exercises/reading?min_words=1000")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_difficulty_out_of_range_rejected(self, client: AsyncClient):
+        response = await client.get("/api/exercises/reading?min_difficulty=9")
+        assert response.status_code == 422
+
+
+class TestGradeEndpoint:
+    """Тесты для POST /api/exercises/{type}/grade"""
+
+    @pytest.mark.asyncio
+    async def test_grades_arithmetic(self, client: AsyncClient):
+        test = (await client.get("/api/exercises/arithmetic")).json()
+        problems = test["problems"]
+        answers = [{"id": p["id"], "answer": p["answer"]} for p in problems[:10]]
+        # Две ошибки: неверное число и пустой ответ
+        answers[0]["answer"] += 1
+        answers[1]["answer"] = None
+        response = await client.post("/api/exercises/arithmetic/grade", json={
+            "time_seconds": 60, "test_id": test["test_id"], "answers": answers,
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["correct_answers"] == 8
+        assert data["score"] == 8
+        assert data["total_questions"] == 50
+        assert data["items"][0] == {"id": problems[0]["id"], "correct": False, "expected": problems[0]["answer"]}
+
+    @pytest.mark.asyncio
+    async def test_generated_arithmetic_trials(self, client: AsyncClient):
+        test = (await client.get("/api/exercises/arithmetic")).json()
+        problems = test["problems"]
+        answers = [{"id": p["id"], "answer": p["answer"], "latency_ms": 1500 + i} for i, p in enumerate(problems)]
+        # Ответы в другом порядке и один пример не из теста
+        answers.reverse()
+        answers.append({"id": GENERATED_ID_BASE | 7 << 17, "answer": 7, "latency_ms": 900})
+        response = await client.post("/api/exercises/arithmetic/grade", json={
+            "time_seconds": 60, "test_id": test["test_id"], "answers": answers,
+        })
+        assert response.status_code == 200
+        assert response.json()["correct_answers"] == len(problems)
+
+        trials = (await client.get(f"/api/results/{response.json()['result_id']}/trials")).json()
+        # id примеров не помещаются в uint32 - хранятся номера в выданном тесте
+        assert trials["item_ids"] == list(range(len(problems), 0, -1)) + [0]
+        assert trials["latency_ms"][0] == 1500 + len(problems) - 1
+        assert trials["correct"][-1] is False
+
+    @pytest.mark.asyncio
+    async def test_grades_fixed_bank_problems(self, client: AsyncClient, monkeypatch):
+        monkeypatch.setattr(settings, "MATH_SOURCE", "bank")
+        problems = (await client.get("/api/exercises/arithmetic")).json()["problems"]
+        response = await client.post("/api/exercises/arithmetic/grade", json={
+            "time_seconds": 60, "answers": [{"id": p["id"], "answer": p["answer"]} for p in problems],
+        })
+        assert response.json()["correct_answers"] == len(problems)
+
+    @pytest.mark.asyncio
+    async def test_arithmetic_accepts_numeric_strings(self, client: AsyncClient):
+        test = (await client.get("/api/exercises/arithmetic")).json()
+        problem = test["problems"][0]
+        response = await client.post("/api/exercises/arithmetic/grade", json={
+            "time_seconds": 5, "test_id": test["test_id"],
+            "answers": [{"id": problem["id"], "answer": f" {problem['answer']} "}],
+        })
+        assert response.json()["correct_answers"] == 1
+
+    @pytest.mark.asyncio
+    async def test_grades_stroop_by_test_id(self, client: AsyncClient):
+        test = (await client.get("/api/exercises/stroop")).json()
+        answers = [
+            {"id": item["id"], "answer": item["correct_answer"].lower(), "latency_ms": 800 + i}
+            for i, item in enumerate(test["items"])
+        ]
+        answers[-1]["answer"] = "не цвет"
+        response = await client.post("/api/exercises/stroop/grade", json={
+            "time_seconds": 90, "test_id": test["test_id"], "answers": answers,
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["correct_answers"] == len(answers) - 1
+        assert data["total_questions"] == len(test["items"])
+
+        trials = (await client.get(f"/api/results/{data['result_id']}/trials")).json()
+        assert trials["latency_ms"][:2] == [800, 801]
+        assert trials["correct"][-1] is False
+
+    @pytest.mark.asyncio
+    async def test_score_is_saved_to_session(self, client: AsyncClient):
+        session_id = (await client.post("/api/sessions")).json()["id"]
+        test = (await client.get("/api/exercises/arithmetic")).json()
+        await client.post("/api/exercises/arithmetic/grade", json={
+            "session_id": session_id, "time_seconds": 60, "test_id": test["test_id"],
+            "answers": [{"id": p["id"], "answer": p["answer"]} for p in test["problems"][:7]],
+        })
+        session = (await client.get(f"/api/sessions/{session_id}")).json()
+        assert session["total_score"] == 7
+        assert session["best_scores"] == {"arithmetic": 7}
+
+    @pytest.mark.asyncio
+    async def test_unknown_ids_are_incorrect(self, client: AsyncClient):
+        test_id = (await client.get("/api/exercises/arithmetic")).json()["test_id"]
+        response = await client.post("/api/exercises/arithmetic/grade", json={
+            "time_seconds": 5, "test_id": test_id, "answers": [{"id": 10 ** 9, "answer": 4}],
+        })
+        assert response.json()["items"] == [{"id": 10 ** 9, "correct": False, "expected": None}]
+
+    @pytest.mark.asyncio
+    async def test_crafted_generated_ids_are_incorrect(self, client: AsyncClient):
+        test_id = (await client.get("/api/exercises/arithmetic")).json()["test_id"]
+        # Корректно закодированные "a + 0", которых не было в выданном тесте
+        answers = [{"id": GENERATED_ID_BASE | a << 17, "answer": a} for a in range(1, 51)]
+        response = await client.post("/api/exercises/arithmetic/grade", json={
+            "time_seconds": 1, "test_id": test_id, "answers": answers,
+        })
+        assert response.status_code == 200
+        assert response.json()["correct_answers"] == 0
+
+    @pytest.mark.asyncio
+    async def test_generated_arithmetic_requires_test_id(self, client: AsyncClient):
+        problem = (await client.get("/api/exercises/arithmetic")).json()["problems"][0]
+        response = await client.post("/api/exercises/arithmetic/grade", json={
+            "time_seconds": 5, "answers": [{"id": problem["id"], "answer": problem["answer"]}],
+        })
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_stroop_requires_test_id(self, client: AsyncClient):
+        response = await client.post("/api/exercises/stroop/grade", json={
+            "time_seconds": 5, "answers": [{"id": 1, "answer": "Красный"}],
+        })
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_duplicate_answers_rejected(self, client: AsyncClient):
+        response = await client.post("/api/exercises/arithmetic/grade", json={
+            "time_seconds": 5, "answers": [{"id": 1, "answer": 2}, {"id": 1, "answer": 3}],
+        })
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_unknown_type_returns_404(self, client: AsyncClient):
+        response = await client.post("/api/exercises/reading/grade", json={"time_seconds": 5, "answers": []})
+        assert response.status_code == 404
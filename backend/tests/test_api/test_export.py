@@ -0,0 +1,106 @@
+import csv
+import io
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from app.config import settings
+from app.models.result import ExerciseResult
+
+TOKEN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture(autouse=True)
+def admin_settings(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    # Несколько чанков даже на маленькой выборке
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_ROWS", 2)
+
+
+@pytest_asyncio.fixture
+async def results(seeded_db):
+    details = [
+        {"errors": {"sum": 2, "sub": 1}, "answers": [3, 5]},
+        {"errors": {"sum": 0}, "reaction_ms": 512.5},
+        None,
+        {"reaction_ms": 480, "note": "вслух"},
+        {"errors": {"sum": 1}},
+    ]
+    for i, item in enumerate(details, 1):
+        seeded_db.add(ExerciseResult(id=i, exercise_type="stroop", score=i, time_seconds=60.0,
+                                     correct_answers=i, total_questions=10, details=item))
+    await seeded_db.commit()
+
+
+def read_csv(text: str):
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+class TestExportAccess:
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_token_setting(self, client: AsyncClient, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+        response = await client.get("/api/admin/export/results", headers=TOKEN)
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_wrong_token(self, client: AsyncClient):
+        response = await client.get("/api/admin/export/results", headers={"X-Admin-Token": "guess"})
+        assert response.status_code == 403
+
+
+class TestExportCsv:
+
+    @pytest.mark.asyncio
+    async def test_flattened_details(self, client: AsyncClient, results):
+        response = await client.get("/api/admin/export/results", headers=TOKEN)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.headers["x-export-watermark"] == "5"
+
+        rows = read_csv(response.text)
+        assert [r["id"] for r in rows] == ["1", "2", "3", "4", "5"]
+        assert list(rows[0])[-5:] == ["details.answers", "details.errors.sub", "details.errors.sum",
+                                      "details.note", "details.reaction_ms"]
+        assert rows[0]["details.errors.sum"] == "2"
+        assert rows[0]["details.answers"] == "[3, 5]"
+        assert rows[2]["details.errors.sum"] == ""
+        assert rows[3]["details.note"] == "вслух"
+        # int и float в одном ключе дают float-колонку
+        assert rows[3]["details.reaction_ms"] == "480.0"
+
+    @pytest.mark.asyncio
+    async def test_incremental_from_watermark(self, client: AsyncClient, results, seeded_db):
+        first = await client.get("/api/admin/export/results", headers=TOKEN)
+        watermark = first.headers["x-export-watermark"]
+
+        seeded_db.add(ExerciseResult(exercise_type="memory", score=7, time_seconds=30.0,
+                                     correct_answers=7, total_questions=12))
+        await seeded_db.commit()
+
+        second = await client.get("/api/admin/export/results", params={"since_id": watermark}, headers=TOKEN)
+        assert [r["exercise_type"] for r in read_csv(second.text)] == ["memory"]
+        assert second.headers["x-export-watermark"] == "6"
+
+    @pytest.mark.asyncio
+    async def test_empty_export_has_header(self, client: AsyncClient, results):
+        response = await client.get("/api/admin/export/results", params={"since_id": 5}, headers=TOKEN)
+        assert response.text.startswith("id,session_id,exercise_type")
+        assert read_csv(response.text) == []
+
+
+class TestExportParquet:
+
+    @pytest.mark.asyncio
+    async def test_row_groups_per_chunk(self, client: AsyncClient, results):
+        pq = pytest.importorskip("pyarrow.parquet")
+        response = await client.get("/api/admin/export/results", params={"format": "parquet"}, headers=TOKEN)
+        assert response.status_code == 200
+
+        parquet = pq.ParquetFile(io.BytesIO(response.content))
+        assert parquet.metadata.num_rows == 5
+        assert parquet.metadata.num_row_groups == 3
+        table = parquet.read()
+        assert str(table.schema.field("details.errors.sum").type) == "int64"
+        assert str(table.schema.field("details.reaction_ms").type) == "double"
+        assert table.column("details.errors.sum").to_pylist() == [2, 0, None, None, 1]
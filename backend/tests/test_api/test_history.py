@@ -0,0 +1,104 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from app.models.result import TrainingSession, ExerciseResult
+
+BASE = datetime(2026, 3, 1, 12, 0, 0)
+
+
+@pytest_asyncio.fixture
+async def history(seeded_db):
+    """6 сессий по 3 результата; у части строк одинаковое время начала"""
+    for i in range(6):
+        started = BASE + timedelta(minutes=i // 2)  # по две сессии на одну минуту
+        session = TrainingSession(id=i + 1, started_at=started, total_score=10 * i)
+        seeded_db.add(session)
+        for j, exercise_type in enumerate(["arithmetic", "stroop", "reading" if i % 2 else "memory"]):
+            seeded_db.add(ExerciseResult(
+                session_id=i + 1, exercise_type=exercise_type, score=j, time_seconds=60.0,
+                correct_answers=j, total_questions=10, started_at=started,
+            ))
+    await seeded_db.commit()
+
+
+async def collect(client, path, **params):
+    items, cursor = [], None
+    while True:
+        page = (await client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})).json()
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+class TestListSessions:
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_all_sessions_in_order(self, client: AsyncClient, history):
+        items = await collect(client, "/api/sessions", limit=4)
+        # Новые сначала; при равном времени - больший id раньше
+        assert [s["id"] for s in items] == [6, 5, 4, 3, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_last_page_has_no_cursor(self, client: AsyncClient, history):
+        page = (await client.get("/api/sessions", params={"limit": 6})).json()
+        assert len(page["items"]) == 6
+        assert page["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_filter_by_exercise_type(self, client: AsyncClient, history):
+        items = await collect(client, "/api/sessions", exercise_type="reading", limit=2)
+        assert [s["id"] for s in items] == [6, 4, 2]
+
+    @pytest.mark.asyncio
+    async def test_filter_by_date_range(self, client: AsyncClient, history):
+        items = await collect(client, "/api/sessions", since=(BASE + timedelta(minutes=1)).isoformat(),
+                              until=(BASE + timedelta(minutes=2)).isoformat())
+        assert [s["id"] for s in items] == [4, 3]
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, client: AsyncClient, history):
+        response = await client.get("/api/sessions", params={"cursor": "garbage"})
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_sessions_created_in_same_second(self, client: AsyncClient):
+        """Сессии с одинаковым CURRENT_TIMESTAMP не дублируются и не теряются между страницами"""
+        ids = [(await client.post("/api/sessions")).json()["id"] for _ in range(7)]
+        items = await collect(client, "/api/sessions", limit=3)
+        assert [s["id"] for s in items] == sorted(ids, reverse=True)
+
+
+class TestListResults:
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_all_results(self, client: AsyncClient, history):
+        items = await collect(client, "/api/results", limit=5)
+        assert len(items) == 18
+        assert len({r["id"] for r in items}) == 18
+        keys = [(r["started_at"], r["id"]) for r in items]
+        assert keys == sorted(keys, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_filter_by_type_and_session(self, client: AsyncClient, history):
+        stroop = await collect(client, "/api/results", exercise_type="stroop", limit=4)
+        assert len(stroop) == 6
+        assert all(r["exercise_type"] == "stroop" for r in stroop)
+
+        one_session = await collect(client, "/api/results", session_id=3)
+        assert {r["session_id"] for r in one_session} == {3}
+        assert len(one_session) == 3
+
+    @pytest.mark.asyncio
+    async def test_ndjson_stream(self, client: AsyncClient, history):
+        response = await client.get("/api/results", params={"format": "ndjson", "exercise_type": "arithmetic"})
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["session_id"] for r in lines] == [6, 5, 4, 3, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_ndjson_by_accept_header(self, client: AsyncClient, history):
+        response = await client.get("/api/sessions", headers={"Accept": "application/x-ndjson"})
+        assert len(response.text.splitlines()) == 6
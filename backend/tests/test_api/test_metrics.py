@@ -0,0 +1,100 @@
+import re
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from app import metrics
+from app.database import build_engine
+from app.config import Settings
+
+
+def sample(body: str, name: str, **labels) -> float:
+    """Значение одной серии из текстового формата Prometheus"""
+    for line in body.splitlines():
+        if line.startswith("#"):
+            continue
+        series, value = line.rsplit(" ", 1)
+        if series.split("{")[0] != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', series))
+        if all(found.get(k) == v for k, v in labels.items()):
+            return float(value)
+    raise AssertionError(f"{name} {labels} not found")
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestMetricsEndpoint:
+
+    @pytest.mark.asyncio
+    async def test_prometheus_text_format(self, client: AsyncClient):
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+
+    @pytest.mark.asyncio
+    async def test_requests_counted_by_route_template(self, client: AsyncClient):
+        session_id = (await client.post("/api/sessions")).json()["id"]
+        await client.get(f"/api/sessions/{session_id}")
+        await client.get("/api/sessions/999999")
+
+        body = (await client.get("/metrics")).text
+        route = "/api/sessions/{session_id}"
+        assert sample(body, "http_requests_total", method="GET", route=route, status="200") == 1
+        assert sample(body, "http_requests_total", method="GET", route=route, status="404") == 1
+        assert sample(body, "http_request_duration_seconds_count", method="GET", route=route) == 2
+        assert sample(body, "http_request_duration_seconds_bucket", method="GET", route=route, le="+Inf") == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_paths_share_one_label(self, client: AsyncClient):
+        await client.get("/no/such/path")
+        await client.get("/another/missing")
+
+        body = (await client.get("/metrics")).text
+        assert sample(body, "http_requests_total", method="GET", route="unmatched", status="404") == 2
+
+    @pytest.mark.asyncio
+    async def test_in_flight_returns_to_zero(self, client: AsyncClient):
+        await client.get("/health")
+        body = (await client.get("/metrics")).text
+        assert sample(body, "http_requests_in_flight", method="GET", route="/health") == 0
+
+
+class TestHistogram:
+
+    def test_bucket_boundaries(self):
+        histogram = metrics.Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        # le is inclusive: 0.1 falls into the first bucket
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.sum == pytest.approx(2.65)
+
+
+class TestEngineInstrumentation:
+
+    @pytest.mark.asyncio
+    async def test_statements_and_checkouts_recorded(self, monkeypatch):
+        monkeypatch.setattr(metrics, "_engines", [])
+        engine = build_engine("sqlite+aiosqlite:///:memory:", Settings())
+        metrics.instrument_engine(engine, "test")
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                with pytest.raises(Exception):
+                    await conn.execute(text("SELECT * FROM missing_table"))
+        finally:
+            await engine.dispose()
+
+        body = metrics.render()
+        # PRAGMA statements from the connect event run on the raw DBAPI
+        # connection and are not counted
+        assert sample(body, "db_statements_total", engine="test", operation="SELECT") == 1
+        assert sample(body, "db_statement_duration_seconds_count", engine="test", operation="SELECT") == 1
+        assert sample(body, "db_pool_checkout_wait_seconds_count", engine="test") == 1
+        assert sample(body, "db_pool_connections_in_use", engine="test") == 0
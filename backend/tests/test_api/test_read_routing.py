@@ -0,0 +1,105 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import Base, RecentWrites, get_write_db, get_read_db, recent_writes
+from app.models.result import TrainingSession
+
+
+async def make_engine(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+@pytest_asyncio.fixture
+async def primary_and_replica(tmp_path):
+    """Два SQLite-файла: основная БД и «реплика» без репликации"""
+    primary = await make_engine(tmp_path / "primary.db")
+    replica = await make_engine(tmp_path / "replica.db")
+    yield primary, replica
+    await primary.dispose()
+    await replica.dispose()
+
+
+@pytest_asyncio.fixture
+async def routed_client(primary_and_replica):
+    primary, replica = primary_and_replica
+    PrimarySession = sessionmaker(primary, class_=AsyncSession, expire_on_commit=False)
+    ReplicaSession = sessionmaker(replica, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_write_db():
+        async with PrimarySession() as session:
+            yield session
+
+    async def override_read_db():
+        async with ReplicaSession() as session:
+            yield session
+
+    app.dependency_overrides[get_write_db] = override_write_db
+    app.dependency_overrides[get_read_db] = override_read_db
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+
+
+class TestReadWriteRouting:
+
+    @pytest.mark.asyncio
+    async def test_new_session_read_from_primary(self, routed_client: AsyncClient):
+        """Только что созданная сессия видна сразу, хотя на реплике её ещё нет"""
+        session_id = (await routed_client.post("/api/sessions")).json()["id"]
+        response = await routed_client.get(f"/api/sessions/{session_id}")
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_old_session_read_from_replica(self, routed_client: AsyncClient, monkeypatch):
+        session_id = (await routed_client.post("/api/sessions")).json()["id"]
+        monkeypatch.setattr(recent_writes, "_expires", {})
+
+        # Реплика не получила сессию - значит, чтение действительно ушло на неё
+        response = await routed_client.get(f"/api/sessions/{session_id}")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_replica_serves_replicated_rows(self, routed_client: AsyncClient, primary_and_replica):
+        _, replica = primary_and_replica
+        async with AsyncSession(replica) as db:
+            db.add(TrainingSession(id=500, total_score=77))
+            await db.commit()
+
+        response = await routed_client.get("/api/sessions/500")
+        assert response.status_code == 200
+        assert response.json()["total_score"] == 77
+
+    @pytest.mark.asyncio
+    async def test_result_write_marks_session(self, routed_client: AsyncClient, monkeypatch):
+        session_id = (await routed_client.post("/api/sessions")).json()["id"]
+        monkeypatch.setattr(recent_writes, "_expires", {})
+        await routed_client.post("/api/results", json={
+            "session_id": session_id, "exercise_type": "stroop", "score": 40,
+            "time_seconds": 90.0, "correct_answers": 40, "total_questions": 50
+        })
+
+        response = await routed_client.get(f"/api/sessions/{session_id}")
+        assert response.status_code == 200
+        assert response.json()["total_score"] == 40
+
+
+class TestRecentWrites:
+
+    def test_marked_session_is_recent(self):
+        writes = RecentWrites(window_seconds=60)
+        writes.mark(1)
+        assert writes.is_recent(1)
+        assert not writes.is_recent(2)
+
+    def test_entries_expire(self):
+        writes = RecentWrites(window_seconds=-1)
+        writes.mark(1)
+        assert not writes.is_recent(1)
@@ -1,5 +1,6 @@
 import pytest
 from httpx import AsyncClient
+from app.schemas.exercise import MAX_TRIALS
 
 
 class TestSaveResult:
@@ -85,3 +86,156 @@ class TestSession:
     async def test_get_nonexistent_session(self, client: AsyncClient):
         response = await client.get("/api/sessions/99999")
         assert response.status_code == 404
+
+
+class TestSaveResultsBatch:
+    """Тесты для POST /api/results/batch"""
+
+    RESULTS = [
+        {"exercise_type": "arithmetic", "score": 45, "time_seconds": 110.0, "correct_answers": 45, "total_questions": 50},
+        {"exercise_type": "stroop", "score": 40, "time_seconds": 100.0, "correct_answers": 40, "total_questions": 50},
+        {"exercise_type": "memory", "score": 9, "time_seconds": 60.0, "correct_answers": 9, "total_questions": 12,
+         "details": {"words_entered": ["стол", "окно"]}},
+    ]
+
+    @pytest.mark.asyncio
+    async def test_saves_all_results_into_session(self, client: AsyncClient):
+        session_id = (await client.post("/api/sessions")).json()["id"]
+
+        response = await client.post("/api/results/batch", json={"session_id": session_id, "results": self.RESULTS})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["session_id"] == session_id
+        assert len(data["ids"]) == 3
+        assert len(set(data["ids"])) == 3
+
+        session = (await client.get(f"/api/sessions/{session_id}?include_results=true")).json()
+        assert session["total_score"] == 94
+        assert [r["id"] for r in session["results"]] == data["ids"]
+
+    @pytest.mark.asyncio
+    async def test_ids_follow_payload_order(self, client: AsyncClient):
+        data = (await client.post("/api/results/batch", json={"results": self.RESULTS})).json()
+        session = (await client.get(f"/api/sessions/{data['session_id']}?include_results=true")).json()
+        by_id = {r["id"]: r["exercise_type"] for r in session["results"]}
+        assert [by_id[i] for i in data["ids"]] == ["arithmetic", "stroop", "memory"]
+
+    @pytest.mark.asyncio
+    async def test_creates_session_when_missing(self, client: AsyncClient):
+        response = await client.post("/api/results/batch", json={"results": self.RESULTS[:1]})
+        assert response.status_code == 200
+        assert response.json()["session_id"] is not None
+
+    @pytest.mark.asyncio
+    async def test_rejects_empty_batch(self, client: AsyncClient):
+        response = await client.post("/api/results/batch", json={"results": []})
+        assert response.status_code == 422
+
+
+class TestSessionAggregates:
+    """Агрегаты сессии обновляются при каждой записи результата"""
+
+    @staticmethod
+    def result(session_id, exercise_type, score):
+        return {"session_id": session_id, "exercise_type": exercise_type, "score": score,
+                "time_seconds": 60.0, "correct_answers": score, "total_questions": 50}
+
+    @pytest.mark.asyncio
+    async def test_aggregates_after_single_results(self, client: AsyncClient):
+        session_id = (await client.post("/api/sessions")).json()["id"]
+        await client.post("/api/results", json=self.result(session_id, "stroop", 30))
+        await client.post("/api/results", json=self.result(session_id, "stroop", 42))
+        await client.post("/api/results", json=self.result(session_id, "arithmetic", 45))
+
+        data = (await client.get(f"/api/sessions/{session_id}")).json()
+        assert data["total_score"] == 117
+        assert data["result_count"] == 3
+        assert data["best_scores"] == {"stroop": 42, "arithmetic": 45}
+        assert data["completed_at"] is not None
+
+    @pytest.mark.asyncio
+    async def test_aggregates_after_batch(self, client: AsyncClient):
+        session_id = (await client.post("/api/sessions")).json()["id"]
+        await client.post("/api/results", json=self.result(session_id, "memory", 11))
+        await client.post("/api/results/batch", json={"session_id": session_id, "results": [
+            self.result(None, "memory", 8), self.result(None, "stroop", 40),
+        ]})
+
+        data = (await client.get(f"/api/sessions/{session_id}")).json()
+        assert data["total_score"] == 59
+        assert data["result_count"] == 3
+        assert data["best_scores"] == {"memory": 11, "stroop": 40}
+
+    @pytest.mark.asyncio
+    async def test_results_only_included_on_request(self, client: AsyncClient):
+        session_id = (await client.post("/api/sessions")).json()["id"]
+        await client.post("/api/results", json=self.result(session_id, "stroop", 30))
+
+        summary = (await client.get(f"/api/sessions/{session_id}")).json()
+        assert summary["results"] == []
+        assert summary["result_count"] == 1
+
+        full = (await client.get(f"/api/sessions/{session_id}", params={"include_results": True})).json()
+        assert len(full["results"]) == 1
+        assert full["total_score"] == summary["total_score"]
+
+    @pytest.mark.asyncio
+    async def test_new_session_has_empty_aggregates(self, client: AsyncClient):
+        session_id = (await client.post("/api/sessions")).json()["id"]
+        data = (await client.get(f"/api/sessions/{session_id}")).json()
+        assert data["total_score"] == 0
+        assert data["result_count"] == 0
+        assert data["best_scores"] == {}
+        assert data["completed_at"] is None
+
+
+class TestResultTrials:
+    """Тесты для поэлементных данных: POST с trials и GET /api/results/{id}/trials"""
+
+    TRIALS = {
+        "latency_ms": [612.5, 480.25, 1033.0],
+        "correct": [True, False, True],
+        "item_ids": [4, 17, 9],
+    }
+
+    def result(self, **extra):
+        return {"exercise_type": "stroop", "score": 2, "time_seconds": 60.0,
+                "correct_answers": 2, "total_questions": 3, **extra}
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, client: AsyncClient):
+        result_id = (await client.post("/api/results", json=self.result(trials=self.TRIALS))).json()["id"]
+
+        response = await client.get(f"/api/results/{result_id}/trials")
+        assert response.status_code == 200
+        assert response.json() == {"result_id": result_id, **self.TRIALS}
+
+    @pytest.mark.asyncio
+    async def test_batch_without_item_ids(self, client: AsyncClient):
+        trials = {"latency_ms": [500.0] * 9, "correct": [True] * 8 + [False]}
+        ids = (await client.post("/api/results/batch", json={
+            "results": [self.result(), self.result(trials=trials)],
+        })).json()["ids"]
+
+        assert (await client.get(f"/api/results/{ids[0]}/trials")).status_code == 404
+        data = (await client.get(f"/api/results/{ids[1]}/trials")).json()
+        assert data["correct"] == trials["correct"]
+        assert data["item_ids"] is None
+
+    @pytest.mark.asyncio
+    async def test_rejects_misaligned_arrays(self, client: AsyncClient):
+        trials = {"latency_ms": [500.0, 510.0], "correct": [True]}
+        response = await client.post("/api/results", json=self.result(trials=trials))
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_rejects_too_many_latencies(self, client: AsyncClient):
+        trials = {"latency_ms": [500.0] * (MAX_TRIALS + 1), "correct": [True]}
+        response = await client.post("/api/results", json=self.result(trials=trials))
+        assert response.status_code == 422
+        # Ограничение длины у самого latency_ms, а не только проверка согласованности массивов
+        assert any(e["type"] == "too_long" and "latency_ms" in e["loc"] for e in response.json()["detail"])
+
+    @pytest.mark.asyncio
+    async def test_unknown_result(self, client: AsyncClient):
+        assert (await client.get("/api/results/999999/trials")).status_code == 404
@@ -0,0 +1,87 @@
+import json
+import logging
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from app import profiling
+
+
+@pytest_asyncio.fixture
+async def profiled_client(client: AsyncClient, test_engine):
+    # Порог 0 мс: каждый запрос попадает в журнал медленных запросов
+    profiling.instrument_engine(test_engine, slow_query_ms=0)
+    yield client
+
+
+def slow_records(caplog):
+    return [json.loads(r.getMessage()) for r in caplog.records if r.name == "app.slow_query"]
+
+
+class TestRequestProfiling:
+
+    @pytest.mark.asyncio
+    async def test_no_header_no_server_timing(self, profiled_client: AsyncClient):
+        response = await profiled_client.get("/api/sessions/1")
+        assert "server-timing" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_header_enables_server_timing(self, profiled_client: AsyncClient):
+        session_id = (await profiled_client.post("/api/sessions")).json()["id"]
+        response = await profiled_client.get(f"/api/sessions/{session_id}", headers={"X-SQL-Profile": "1"})
+
+        timing = response.headers["server-timing"]
+        assert timing.startswith('db;dur=')
+        assert '"1 statements"' in timing
+        assert 'sql-1;dur=' in timing and 'desc="SELECT rows=1"' in timing
+
+    @pytest.mark.asyncio
+    async def test_header_value_off(self, profiled_client: AsyncClient):
+        response = await profiled_client.get("/api/sessions/1", headers={"X-SQL-Profile": "0"})
+        assert "server-timing" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_profile_logged_with_statements(self, profiled_client: AsyncClient, caplog):
+        session_id = (await profiled_client.post("/api/sessions")).json()["id"]
+        with caplog.at_level(logging.INFO, logger="app.sql_profile"):
+            await profiled_client.get(f"/api/sessions/{session_id}", headers={"X-SQL-Profile": "1"})
+
+        records = [json.loads(r.getMessage()) for r in caplog.records if r.name == "app.sql_profile"]
+        assert len(records) == 1
+        assert records[0]["route"] == "/api/sessions/{session_id}"
+        assert records[0]["statements"][0]["operation"] == "SELECT"
+        assert records[0]["statements"][0]["rows"] == 1
+
+    def test_sampling(self):
+        always = profiling.SqlProfilerMiddleware(None, header=None, sample_rate=1.0)
+        never = profiling.SqlProfilerMiddleware(None, header=None, sample_rate=0.0)
+        scope = {"headers": []}
+        assert always._wanted(scope)
+        assert not never._wanted(scope)
+
+
+class TestSlowQueryLog:
+
+    @pytest.mark.asyncio
+    async def test_slow_query_logged_with_plan(self, profiled_client: AsyncClient, caplog):
+        session_id = (await profiled_client.post("/api/sessions")).json()["id"]
+        with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+            await profiled_client.get(f"/api/sessions/{session_id}?include_results=true")
+
+        records = slow_records(caplog)
+        selects = [r for r in records if "FROM exercise_results" in r["statement"]]
+        assert selects, records
+        record = selects[0]
+        assert record["event"] == "slow_query"
+        assert record["route"] == "/api/sessions/{session_id}"
+        assert "ix_exercise_results_session_id_started_at" in record["plan"]
+
+    @pytest.mark.asyncio
+    async def test_explain_does_not_break_transaction(self, profiled_client: AsyncClient):
+        session_id = (await profiled_client.post("/api/sessions")).json()["id"]
+        response = await profiled_client.post("/api/results", json={
+            "session_id": session_id, "exercise_type": "stroop", "score": 40,
+            "time_seconds": 90.0, "correct_answers": 40, "total_questions": 50
+        })
+        assert response.status_code == 200
+        session = (await profiled_client.get(f"/api/sessions/{session_id}")).json()
+        assert session["total_score"] == 40
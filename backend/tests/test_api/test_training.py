@@ -0,0 +1,39 @@
+import pytest
+from httpx import AsyncClient
+from app.schemas.exercise import TrainingBundle
+
+
+class TestTrainingBundle:
+    """Тесты для GET /api/training/bundle"""
+
+    @pytest.mark.asyncio
+    async def test_returns_all_exercises(self, client: AsyncClient):
+        response = await client.get("/api/training/bundle")
+        assert response.status_code == 200
+        bundle = TrainingBundle(**response.json())
+        assert len(bundle.arithmetic.problems) == 50
+        assert len(bundle.stroop.items) == 50
+        assert bundle.stroop.test_id is not None
+        assert len(bundle.memory_words.words) == 12
+        assert bundle.reading.content
+
+    @pytest.mark.asyncio
+    async def test_creates_session(self, client: AsyncClient):
+        first = (await client.get("/api/training/bundle")).json()["session_id"]
+        second = (await client.get("/api/training/bundle")).json()["session_id"]
+        assert first != second
+        session = await client.get(f"/api/sessions/{first}")
+        assert session.status_code == 200
+        assert session.json()["total_score"] == 0
+
+    @pytest.mark.asyncio
+    async def test_bundle_content_can_be_graded(self, client: AsyncClient):
+        bundle = (await client.get("/api/training/bundle")).json()
+        stroop = bundle["stroop"]
+        response = await client.post("/api/exercises/stroop/grade", json={
+            "session_id": bundle["session_id"], "time_seconds": 60, "test_id": stroop["test_id"],
+            "answers": [{"id": item["id"], "answer": item["correct_answer"]} for item in stroop["items"]],
+        })
+        assert response.json()["correct_answers"] == 50
+        session = (await client.get(f"/api/sessions/{bundle['session_id']}")).json()
+        assert session["total_score"] == 50
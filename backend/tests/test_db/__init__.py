@@ -0,0 +1 @@
+# Database-level tests package
@@ -0,0 +1,84 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+import seed_data
+from app.config import Settings
+from app.database import build_engine
+from app.models.exercise import MathProblem
+from app.models.result import TrainingSession
+from app.services.content_catalog import ContentCatalog
+
+
+@pytest_asyncio.fixture
+async def content_engine(tmp_path):
+    """Основная БД с подключённым неизменяемым файлом контента"""
+    content_path = str(tmp_path / "content.db")
+    await seed_data.build_content_db(content_path)
+    config = Settings(CONTENT_DATABASE_PATH=content_path)
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'main.db'}", config)
+    await seed_data.seed(engine, config=config)
+    yield engine
+    await engine.dispose()
+
+
+class TestContentDatabase:
+
+    @pytest.mark.asyncio
+    async def test_content_read_through_attach(self, content_engine):
+        async with AsyncSession(content_engine) as db:
+            count = (await db.execute(select(func.count()).select_from(MathProblem))).scalar_one()
+        assert count == len(seed_data.content_rows()[MathProblem])
+
+    @pytest.mark.asyncio
+    async def test_main_holds_only_user_tables(self, content_engine):
+        async with content_engine.connect() as conn:
+            tables = {row[0] for row in await conn.exec_driver_sql(
+                "SELECT name FROM main.sqlite_master WHERE type = 'table'"
+            )}
+            databases = {row[1] for row in await conn.exec_driver_sql("PRAGMA database_list")}
+        assert tables == {"training_sessions", "exercise_results"}
+        assert "content" in databases
+
+    @pytest.mark.asyncio
+    async def test_content_is_read_only(self, content_engine):
+        async with content_engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.execute(text("DELETE FROM math_problems"))
+
+    @pytest.mark.asyncio
+    async def test_user_data_writable(self, content_engine):
+        async with AsyncSession(content_engine) as db:
+            db.add(TrainingSession(total_score=5))
+            await db.commit()
+            assert (await db.execute(select(func.count()).select_from(TrainingSession))).scalar_one() == 1
+
+    @pytest.mark.asyncio
+    async def test_catalog_loads_from_content_file(self, content_engine):
+        catalog = ContentCatalog()
+        async with AsyncSession(content_engine) as db:
+            await catalog.load(db)
+        assert len(catalog.color_names) == len(seed_data.STROOP_COLORS)
+        assert len(catalog.text_ids) == len(seed_data.READING_TEXTS)
+
+    @pytest.mark.asyncio
+    async def test_stale_content_tables_dropped_from_main(self, tmp_path):
+        # БД, заполненная до перехода на файл контента
+        legacy = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'main.db'}", Settings())
+        await seed_data.seed(legacy)
+        await legacy.dispose()
+
+        content_path = str(tmp_path / "content.db")
+        await seed_data.build_content_db(content_path)
+        config = Settings(CONTENT_DATABASE_PATH=content_path)
+        engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'main.db'}", config)
+        try:
+            await seed_data.seed(engine, config=config)
+            async with engine.connect() as conn:
+                main_tables = {row[0] for row in await conn.exec_driver_sql(
+                    "SELECT name FROM main.sqlite_master WHERE type = 'table'"
+                )}
+            assert "math_problems" not in main_tables
+        finally:
+            await engine.dispose()
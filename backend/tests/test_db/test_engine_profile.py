@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import text, event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.config import Settings
+from app.database import build_engine
+
+
+async def pragma(engine, name):
+    async with engine.connect() as conn:
+        return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+class TestEngineProfile:
+
+    @pytest.mark.asyncio
+    async def test_sqlite_pragmas_applied(self, tmp_path):
+        engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}", Settings())
+        try:
+            assert await pragma(engine, "journal_mode") == "wal"
+            assert await pragma(engine, "synchronous") == 1  # NORMAL
+            assert await pragma(engine, "busy_timeout") == 5000
+            assert await pragma(engine, "cache_size") == -64000
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_pragmas_are_configurable(self, tmp_path):
+        config = Settings(SQLITE_JOURNAL_MODE="DELETE", SQLITE_SYNCHRONOUS="FULL", SQLITE_BUSY_TIMEOUT_MS=250)
+        engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}", config)
+        try:
+            assert await pragma(engine, "journal_mode") == "delete"
+            assert await pragma(engine, "synchronous") == 2  # FULL
+            assert await pragma(engine, "busy_timeout") == 250
+        finally:
+            await engine.dispose()
+
+    def test_sqlite_file_uses_sized_pool(self, tmp_path):
+        engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}", Settings(DB_POOL_SIZE=3))
+        assert isinstance(engine.sync_engine.pool, AsyncAdaptedQueuePool)
+        assert engine.sync_engine.pool.size() == 3
+
+    @pytest.mark.asyncio
+    async def test_in_memory_sqlite_accepted(self):
+        engine = build_engine("sqlite+aiosqlite:///:memory:", Settings())
+        try:
+            assert await pragma(engine, "busy_timeout") == 5000
+        finally:
+            await engine.dispose()
+
+    def test_in_memory_sqlite_single_checkout(self):
+        """Сессии по очереди получают единственное соединение in-memory БД"""
+        engine = build_engine("sqlite+aiosqlite:///:memory:", Settings())
+        assert isinstance(engine.sync_engine.pool, AsyncAdaptedQueuePool)
+        assert engine.sync_engine.pool.size() == 1
+        assert engine.sync_engine.pool._max_overflow == 0
+
+    def test_echo_off_by_default(self):
+        engine = build_engine("sqlite+aiosqlite:///:memory:", Settings())
+        assert engine.echo is False
+
+    @pytest.mark.asyncio
+    async def test_asyncpg_profile(self):
+        engine = build_engine("postgresql+asyncpg://u:p@localhost/db", Settings(DB_PREPARED_STATEMENT_CACHE_SIZE=500))
+        assert engine.sync_engine.pool.size() == 5
+
+        captured = {}
+
+        class Captured(Exception):
+            pass
+
+        @event.listens_for(engine.sync_engine, "do_connect")
+        def capture(dialect, conn_rec, cargs, cparams):
+            captured.update(cparams)
+            raise Captured()
+
+        # Stop before a real connection is attempted
+        with pytest.raises(Captured):
+            async with engine.connect():
+                pass
+        assert captured["prepared_statement_cache_size"] == 500
@@ -0,0 +1,97 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+import seed_data
+from app.models.exercise import MathProblem, ReadingText, StroopColor, ContentMeta
+from app.models.result import TrainingSession
+
+
+@pytest_asyncio.fixture
+async def seed_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'seed.db'}")
+    yield engine
+    await engine.dispose()
+
+
+async def count(engine, model) -> int:
+    async with AsyncSession(engine) as db:
+        return (await db.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+class TestSeeding:
+
+    @pytest.mark.asyncio
+    async def test_creates_all_tables(self, seed_engine):
+        assert await seed_data.seed(seed_engine) is True
+        assert await count(seed_engine, MathProblem) == len(seed_data.content_rows()[MathProblem])
+        # Таблицы пользовательских данных тоже создаются
+        assert await count(seed_engine, TrainingSession) == 0
+
+    @pytest.mark.asyncio
+    async def test_unchanged_content_skipped(self, seed_engine):
+        await seed_data.seed(seed_engine)
+        assert await seed_data.seed(seed_engine) is False
+        assert await count(seed_engine, StroopColor) == len(seed_data.STROOP_COLORS)
+
+    @pytest.mark.asyncio
+    async def test_user_data_survives_reseed(self, seed_engine):
+        await seed_data.seed(seed_engine)
+        async with AsyncSession(seed_engine) as db:
+            db.add(TrainingSession(total_score=42))
+            await db.commit()
+
+        assert await seed_data.seed(seed_engine, force=True) is True
+        assert await count(seed_engine, TrainingSession) == 1
+
+    @pytest.mark.asyncio
+    async def test_changed_content_reseeded(self, seed_engine, monkeypatch):
+        await seed_data.seed(seed_engine)
+        monkeypatch.setattr(seed_data, "STROOP_COLORS", seed_data.STROOP_COLORS + [("белый", "#FFFFFF")])
+
+        assert await seed_data.seed(seed_engine) is True
+        assert await count(seed_engine, StroopColor) == len(seed_data.STROOP_COLORS)
+        async with AsyncSession(seed_engine) as db:
+            stored = (await db.execute(select(ContentMeta.checksum))).scalar_one()
+        assert stored == seed_data.content_checksum(seed_data.content_rows())
+
+    @pytest.mark.asyncio
+    async def test_upgrades_old_reading_texts_schema(self, seed_engine, monkeypatch):
+        # Схема reading_texts до метрик текстов: create_all не добавляет колонки в существующую таблицу
+        async with seed_engine.begin() as conn:
+            await conn.exec_driver_sql(
+                "CREATE TABLE reading_texts (id INTEGER PRIMARY KEY, title VARCHAR(200), content TEXT NOT NULL, "
+                "word_count INTEGER, source VARCHAR(200), difficulty INTEGER)"
+            )
+            await conn.exec_driver_sql("INSERT INTO reading_texts (id, title, content) VALUES (1, 'old', 'old text')")
+
+        assert await seed_data.seed(seed_engine) is True
+        assert await count(seed_engine, ReadingText) == len(seed_data.READING_TEXTS)
+
+        # Запуск приложения загружает каталог из обновлённой БД
+        from app import main
+        from app.services import content_catalog
+        monkeypatch.setattr(main, "ReadSessionLocal", sessionmaker(seed_engine, class_=AsyncSession))
+        monkeypatch.setattr(main.settings, "PAYLOAD_POOL_ENABLED", False)
+        try:
+            async with main.app.router.lifespan_context(main.app):
+                catalog = content_catalog._catalog
+                assert len(catalog.text_difficulties) == len(seed_data.READING_TEXTS)
+        finally:
+            content_catalog.invalidate_catalog()
+
+    def test_ids_are_stable(self):
+        rows = seed_data.content_rows()[MathProblem]
+        assert [row["id"] for row in rows] == list(range(1, len(rows) + 1))
+        assert seed_data.content_checksum(seed_data.content_rows()) == seed_data.content_checksum(seed_data.content_rows())
+
+    @pytest.mark.asyncio
+    async def test_reading_metrics_precomputed(self, seed_engine):
+        await seed_data.seed(seed_engine)
+        async with AsyncSession(seed_engine) as db:
+            texts = (await db.execute(select(ReadingText))).scalars().all()
+        assert len(texts) == len(seed_data.READING_TEXTS)
+        for text in texts:
+            assert text.word_count > 0 and text.syllable_count > text.word_count and text.sentence_count > 0
+            assert 1 <= text.difficulty <= 5 and text.readability is not None
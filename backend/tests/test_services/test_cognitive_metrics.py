@@ -0,0 +1,95 @@
+from datetime import datetime
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from app.models.exercise import ReadingText
+from app.models.result import TrainingSession, ExerciseResult
+from app.services import cognitive_metrics
+
+
+def result(session_id, exercise_type, time_seconds, correct=0, total=0, details=None):
+    return ExerciseResult(session_id=session_id, exercise_type=exercise_type, score=correct,
+                          time_seconds=time_seconds, correct_answers=correct, total_questions=total, details=details)
+
+
+@pytest_asyncio.fixture
+async def sessions(seeded_db):
+    """Три сессии: полная, без чтения и пустая"""
+    text_id = (await seeded_db.scalars(select(ReadingText.id))).first()  # word_count = 10
+    for i in (1, 2, 3):
+        seeded_db.add(TrainingSession(id=i, started_at=datetime(2026, 1, i)))
+    seeded_db.add_all([
+        result(1, "arithmetic", 120.0, correct=40, total=50),
+        result(1, "reading", 5.0, details={"text_id": text_id}),
+        result(1, "stroop", 100.0, correct=45, total=50),
+        result(1, "memory", 60.0, correct=9, total=12),
+        result(1, "counting", 30.0),
+        result(2, "arithmetic", 60.0, correct=10, total=50),
+        result(2, "arithmetic", 60.0, correct=20, total=50),
+        result(2, "reading", 5.0),  # текст неизвестен
+        result(2, "stroop", 90.0, correct=40, total=45),
+    ])
+    await seeded_db.commit()
+    return seeded_db
+
+
+class TestCompute:
+
+    def test_totals_per_session_and_missing_inputs(self):
+        metrics = cognitive_metrics.compute(
+            session_ids=np.array([10, 20]),
+            result_session=np.array([10, 10, 20]),
+            types=np.array([0, 0, 2], dtype=np.int8),
+            time_seconds=np.array([60.0, 60.0, 30.0]),
+            correct=np.array([30.0, 10.0, 6.0]),
+            total=np.array([50.0, 50.0, 12.0]),
+            words=np.full(3, np.nan),
+        )
+        assert metrics.values["arithmetic_per_minute"][0] == pytest.approx(20.0)
+        assert np.isnan(metrics.values["arithmetic_per_minute"][1])
+        assert metrics.values["memory_recall_rate"][1] == pytest.approx(0.5)
+        assert list(metrics.rows())[0]["reading_wpm"] is None
+
+
+class TestSessionMetrics:
+
+    @pytest.mark.asyncio
+    async def test_full_session(self, sessions):
+        metrics = await cognitive_metrics.session_metrics(sessions, 1)
+        assert metrics["arithmetic_per_minute"] == pytest.approx(20.0)
+        assert metrics["reading_wpm"] == pytest.approx(120.0)
+        assert metrics["memory_recall_rate"] == pytest.approx(0.75)
+        # 2000 мс на элемент Струпа минус 500 мс на прочитанное слово
+        assert metrics["stroop_interference_ms"] == pytest.approx(1500.0)
+
+    @pytest.mark.asyncio
+    async def test_without_reading_text(self, sessions):
+        metrics = await cognitive_metrics.session_metrics(sessions, 2)
+        assert metrics["arithmetic_per_minute"] == pytest.approx(15.0)
+        assert metrics["reading_wpm"] is None
+        assert metrics["stroop_interference_ms"] is None
+        assert metrics["memory_recall_rate"] is None
+
+
+class TestHistory:
+
+    @pytest.mark.asyncio
+    async def test_batches_cover_all_sessions(self, sessions):
+        seen = []
+        summary = await cognitive_metrics.history_summary(
+            sessions, batch_sessions=2, on_batch=lambda batch: seen.extend(batch.session_ids.tolist())
+        )
+        assert seen == [1, 2, 3]
+        assert summary["arithmetic_per_minute"]["sessions"] == 2
+        assert summary["arithmetic_per_minute"]["mean"] == pytest.approx(17.5)
+        assert summary["reading_wpm"]["sessions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_date_range(self, sessions):
+        summary = await cognitive_metrics.history_summary(
+            sessions, since=datetime(2026, 1, 2), until=datetime(2026, 1, 3), batch_sessions=1
+        )
+        assert summary["arithmetic_per_minute"]["sessions"] == 1
+        assert summary["arithmetic_per_minute"]["median"] == pytest.approx(15.0)
+        assert summary["memory_recall_rate"] == {"sessions": 0, "mean": None, "median": None, "p10": None, "p90": None}
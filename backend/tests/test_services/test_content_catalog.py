@@ -0,0 +1,83 @@
+import pytest
+import pytest_asyncio
+from app.models.exercise import MathProblem, ReadingText
+from app.services.content_catalog import get_catalog, reload_catalog, invalidate_catalog
+
+
+class TestContentCatalog:
+
+    @pytest.mark.asyncio
+    async def test_loads_all_content(self, seeded_db):
+        catalog = await get_catalog(seeded_db)
+        assert len(catalog.math_ids) == 100
+        assert len(catalog.color_names) == 4
+        assert len(catalog.word_lists) == 1
+        assert len(catalog.text_ids) == 1
+
+    @pytest.mark.asyncio
+    async def test_columns_are_aligned(self, seeded_db):
+        catalog = await get_catalog(seeded_db)
+        for expression, answer in zip(catalog.math_expressions, catalog.math_answers):
+            a, b = map(int, expression.split("+"))
+            assert a + b == answer
+
+    @pytest.mark.asyncio
+    async def test_cached_between_calls(self, seeded_db):
+        catalog1 = await get_catalog(seeded_db)
+        catalog2 = await get_catalog(seeded_db)
+        assert catalog1 is catalog2
+
+    @pytest.mark.asyncio
+    async def test_sample_is_distinct(self, seeded_db):
+        catalog = await get_catalog(seeded_db)
+        indices = catalog.sample_math_indices(50)
+        assert len(indices) == len(set(indices)) == 50
+
+    @pytest.mark.asyncio
+    async def test_reload_picks_up_new_content(self, seeded_db):
+        await get_catalog(seeded_db)
+        seeded_db.add(MathProblem(expression="99 + 1", answer=100))
+        await seeded_db.commit()
+
+        catalog = await get_catalog(seeded_db)
+        assert len(catalog.math_ids) == 100
+
+        catalog = await reload_catalog(seeded_db)
+        assert len(catalog.math_ids) == 101
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_reload(self, seeded_db):
+        catalog1 = await get_catalog(seeded_db)
+        invalidate_catalog()
+        catalog2 = await get_catalog(seeded_db)
+        assert catalog1 is not catalog2
+
+
+class TestTextSelection:
+
+    @pytest_asyncio.fixture
+    async def catalog(self, seeded_db):
+        # В seeded_db уже есть текст на 10 слов со сложностью 1
+        for words, difficulty in [(120, 2), (180, 2), (250, 3), (400, 4)]:
+            seeded_db.add(ReadingText(title=f"{words}", content="текст", word_count=words, difficulty=difficulty))
+        await seeded_db.commit()
+        return await reload_catalog(seeded_db)
+
+    def picks(self, catalog, **ranges):
+        return {catalog.text_word_counts[catalog.select_text_index(**ranges)] for _ in range(200)}
+
+    @pytest.mark.asyncio
+    async def test_selects_within_ranges(self, catalog):
+        assert self.picks(catalog, min_words=100, max_words=300) == {120, 180, 250}
+        assert self.picks(catalog, min_difficulty=2, max_difficulty=2) == {120, 180}
+        assert self.picks(catalog, max_words=200, min_difficulty=2) == {120, 180}
+        assert self.picks(catalog, min_words=250, max_words=250) == {250}
+
+    @pytest.mark.asyncio
+    async def test_unfiltered_picks_any_text(self, catalog):
+        assert self.picks(catalog) == {10, 120, 180, 250, 400}
+
+    @pytest.mark.asyncio
+    async def test_no_match_raises(self, catalog):
+        with pytest.raises(LookupError):
+            catalog.select_text_index(min_words=500)
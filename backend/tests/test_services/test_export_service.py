@@ -0,0 +1,57 @@
+import csv
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+import export_results
+from app.models.result import ExerciseResult
+from app.services.export_service import flatten_details, plan_export
+
+
+class TestFlattenDetails:
+
+    def test_nested_keys(self):
+        assert flatten_details({"errors": {"sum": 1, "div": {"by_zero": 0}}, "answers": [1, 2]}) == {
+            "details.errors.sum": 1,
+            "details.errors.div.by_zero": 0,
+            "details.answers": [1, 2],
+        }
+
+    def test_empty_and_missing(self):
+        assert flatten_details(None) == {}
+        assert flatten_details({}) == {}
+        assert flatten_details({"extra": {}}) == {"details.extra": {}}
+
+
+class TestPlanExport:
+
+    @pytest.mark.asyncio
+    async def test_column_kinds(self, test_db):
+        for details in ({"a": 1, "b": True, "c": "x"}, {"a": 2.5, "b": 3, "d": None}):
+            test_db.add(ExerciseResult(exercise_type="stroop", details=details))
+        await test_db.commit()
+
+        plan = await plan_export(test_db)
+        assert plan.watermark == 2
+        assert plan.details_kinds == {
+            "details.a": "float", "details.b": "string", "details.c": "string", "details.d": "string",
+        }
+
+
+class TestExportCli:
+
+    @pytest.mark.asyncio
+    async def test_writes_file_and_watermark(self, test_engine, test_db, tmp_path):
+        for score in range(3):
+            test_db.add(ExerciseResult(exercise_type="arithmetic", score=score, details={"errors": score}))
+        await test_db.commit()
+        factory = sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+        output, state = tmp_path / "results.csv", tmp_path / "export.watermark"
+
+        plan = await export_results.export(str(output), "csv", export_results.read_watermark(str(state)), 2, factory)
+        export_results.write_watermark(str(state), plan.watermark)
+        with open(output, encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert plan.rows == 3
+        assert [r["details.errors"] for r in rows] == ["0", "1", "2"]
+        assert export_results.read_watermark(str(state)) == 3
+        assert not (tmp_path / "results.csv.part").exists()
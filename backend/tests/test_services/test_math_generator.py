@@ -0,0 +1,84 @@
+import json
+import numpy as np
+import pytest
+from app.schemas.exercise import ArithmeticResponse
+from app.services.math_generator import (
+    DIFFICULTIES, GENERATED_ID_BASE, MathProfile, decode_problem, generate_ids, render_arithmetic_json,
+    render_problems,
+)
+from app.config import settings
+from app.services.math_service import generate_payload, generate_problem_ids, served_problem_ids
+
+
+def evaluate(expression: str) -> int:
+    a, op, b = expression.split(" ")
+    a, b = int(a), int(b)
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "×":
+        return a * b
+    assert a % b == 0, f"{expression} не делится нацело"
+    return a // b
+
+
+class TestMathGenerator:
+
+    @pytest.mark.parametrize("level", sorted(DIFFICULTIES))
+    def test_distinct_problems_with_correct_answers(self, level):
+        ids = generate_ids(DIFFICULTIES[level], 50, np.random.default_rng(level))
+        assert len(set(ids)) == 50
+        for p in render_problems(ids):
+            assert p.answer == evaluate(p.expression)
+            assert p.answer >= 0
+
+    def test_same_seed_gives_same_test(self):
+        assert generate_problem_ids(50, seed=7) == generate_problem_ids(50, seed=7)
+        assert generate_problem_ids(50, seed=7) != generate_problem_ids(50, seed=8)
+
+    def test_operands_stay_in_ranges(self):
+        profile = MathProfile({"-": 1}, {"-": ((5, 9), (3, 7))})
+        for p in render_problems(generate_ids(profile, profile.size, np.random.default_rng(0))):
+            a, _, b = p.expression.split(" ")
+            assert 5 <= int(a) <= 9 and 3 <= int(b) <= min(7, int(a))
+
+    def test_whole_profile_can_be_drawn(self):
+        # b от 3 до min(7, a) для каждого a от 5 до 9
+        profile = MathProfile({"-": 1}, {"-": ((5, 9), (3, 7))})
+        assert profile.size == 3 + 4 + 5 + 5 + 5
+        assert len(generate_ids(profile, profile.size, np.random.default_rng(0))) == profile.size
+        with pytest.raises(ValueError):
+            generate_ids(profile, profile.size + 1, np.random.default_rng(0))
+
+    def test_operator_mix_follows_weights(self):
+        profile = MathProfile({"+": 3, "×": 1}, {"+": ((0, 999), (0, 999)), "×": ((0, 999), (0, 999))})
+        ids = generate_ids(profile, 4000, np.random.default_rng(1))
+        multiplications = sum("×" in decode_problem(i)[0] for i in ids)
+        assert 800 < multiplications < 1200
+
+    def test_invalid_profiles_rejected(self):
+        with pytest.raises(ValueError):
+            MathProfile({}, {})
+        with pytest.raises(ValueError):
+            MathProfile({"÷": 1}, {"÷": ((1, 10), (0, 10))})
+        with pytest.raises(ValueError):
+            MathProfile({"-": 1}, {"-": ((1, 3), (5, 9))})
+        with pytest.raises(ValueError):
+            MathProfile({"^": 1}, {})
+
+    def test_decode_ignores_other_ids(self):
+        assert decode_problem(1) is None
+        assert decode_problem(GENERATED_ID_BASE * 2) is None
+        assert decode_problem(GENERATED_ID_BASE | 2 << 17 | 3) == ("2 + 3", 5)
+
+    def test_json_payload_matches_models(self):
+        ids = generate_problem_ids(50, seed=3)
+        payload = json.loads(render_arithmetic_json(ids))
+        assert ArithmeticResponse(**payload) == ArithmeticResponse(problems=render_problems(ids))
+
+    def test_payload_test_id_regenerates_served_ids(self):
+        payload = json.loads(generate_payload())
+        ids = [p["id"] for p in payload["problems"]]
+        # Проверка восстанавливает выданный тест по test_id
+        assert list(served_problem_ids(settings.MATH_DIFFICULTY, payload["test_id"])) == ids
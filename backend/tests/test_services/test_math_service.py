@@ -1,5 +1,9 @@
 import pytest
-from app.services.math_service import get_random_problems
+from sqlalchemy import delete
+from app.config import settings
+from app.models.exercise import MathProblem
+from app.services.math_generator import GENERATED_ID_BASE
+from app.services.math_service import get_random_problems, sample_problems_by_id_range
 
 
 class TestMathService:
@@ -30,3 +34,43 @@ class TestMathService:
 
         # Вероятность совпадения очень низкая
         assert ids1 != ids2
+
+    @pytest.mark.asyncio
+    async def test_bank_mode_uses_math_problems(self, seeded_db, monkeypatch):
+        monkeypatch.setattr(settings, "MATH_SOURCE", "bank")
+        problems = await get_random_problems(seeded_db, count=50)
+        assert len({p.id for p in problems}) == 50
+        assert all(p.id < GENERATED_ID_BASE for p in problems)
+
+
+class TestIdRangeSampling:
+
+    @pytest.mark.asyncio
+    async def test_returns_exact_distinct_count(self, seeded_db):
+        problems = await sample_problems_by_id_range(seeded_db, count=50)
+        ids = [p.id for p in problems]
+        assert len(ids) == 50
+        assert len(set(ids)) == 50
+
+    @pytest.mark.asyncio
+    async def test_fills_count_despite_id_gaps(self, seeded_db):
+        # Удаляем каждую вторую строку, чтобы в диапазоне id появились дыры
+        await seeded_db.execute(delete(MathProblem).where(MathProblem.id % 2 == 0))
+        await seeded_db.commit()
+
+        problems = await sample_problems_by_id_range(seeded_db, count=40)
+        ids = {p.id for p in problems}
+        assert len(ids) == 40
+        assert all(i % 2 == 1 for i in ids)
+
+    @pytest.mark.asyncio
+    async def test_returns_all_rows_when_table_is_small(self, seeded_db):
+        problems = await sample_problems_by_id_range(seeded_db, count=500)
+        assert len({p.id for p in problems}) == 100
+
+    @pytest.mark.asyncio
+    async def test_used_when_table_exceeds_catalog_limit(self, seeded_db, monkeypatch):
+        monkeypatch.setattr(settings, "MATH_SOURCE", "bank")
+        monkeypatch.setattr(settings, "MATH_CATALOG_MAX_ROWS", 10)
+        problems = await get_random_problems(seeded_db, count=50)
+        assert len({p.id for p in problems}) == 50
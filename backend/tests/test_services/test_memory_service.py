@@ -1,5 +1,10 @@
+import random
+from collections import Counter
 import pytest
-from app.services.memory_service import get_memory_words
+import pytest_asyncio
+from app.models.exercise import WordList
+from app.services.content_catalog import reload_catalog
+from app.services.memory_service import SeenWords, get_memory_words, sample_word_indices
 
 
 class TestMemoryService:
@@ -29,3 +34,79 @@ class TestMemoryService:
         # Порядок должен отличаться (с высокой вероятностью)
         # или сами слова должны быть разными
         assert words1 != words2, "Слова не рандомизированы"
+
+
+CATEGORIES = {
+    "животные": ["кошка", "собака", "лошадь", "корова", "птица", "рыба", "медведь", "волк", "лиса", "заяц"],
+    "еда": ["хлеб", "молоко", "суп", "каша", "мясо", "сыр", "масло", "яйцо", "морковь", "огурец"],
+    "дом": ["стул", "кровать", "шкаф", "дверь", "лампа", "диван", "зеркало", "ковёр", "полка", "часы"],
+}
+
+
+@pytest_asyncio.fixture
+async def catalog(seeded_db):
+    # В seeded_db уже есть категория "test" из 12 слов
+    for category, words in CATEGORIES.items():
+        seeded_db.add(WordList(category=category, words=words))
+    # Повтор слова из другой категории в индекс не попадает
+    seeded_db.add(WordList(category="дом", words=["окно", "кошка"]))
+    await seeded_db.commit()
+    return await reload_catalog(seeded_db)
+
+
+class TestWordSampler:
+
+    @pytest.mark.asyncio
+    async def test_flat_index_has_distinct_tagged_words(self, catalog):
+        assert len(catalog.words) == len(set(catalog.words)) == 42
+        assert catalog.categories == ("test", "животные", "еда", "дом")
+        for c, members in enumerate(catalog.category_words):
+            assert all(catalog.word_categories[i] == c for i in members)
+
+    @pytest.mark.asyncio
+    async def test_stratified_across_categories(self, catalog):
+        rng = random.Random(1)
+        for _ in range(50):
+            indices, _ = sample_word_indices(catalog, 12, 0, rng)
+            per_category = Counter(catalog.word_categories[i] for i in indices)
+            assert sorted(per_category.values()) == [3, 3, 3, 3]
+
+    @pytest.mark.asyncio
+    async def test_no_repeats_until_all_words_shown(self, catalog):
+        rng = random.Random(2)
+        seen = 0
+        shown = []
+        # 42 слова: три полных теста, затем 6 оставшихся слов и 6 повторов
+        for _ in range(3):
+            indices, seen = sample_word_indices(catalog, 12, seen, rng)
+            shown.extend(indices)
+        assert len(set(shown)) == 36
+
+        last = indices
+        indices, seen = sample_word_indices(catalog, 12, seen, rng, last=sum(1 << i for i in last))
+        assert len(set(indices)) == 12
+        assert set(shown) | set(indices) == set(range(42))
+        # Повторы не берутся из предыдущего теста
+        assert not set(indices) & set(last)
+        # Новый круг начинается с повторно показанных слов
+        assert seen.bit_count() == 6
+
+    @pytest.mark.asyncio
+    async def test_session_history_excludes_seen_words(self, catalog, seeded_db):
+        words1 = await get_memory_words(seeded_db, word_count=12, session_id=501)
+        words2 = await get_memory_words(seeded_db, word_count=12, session_id=501)
+        assert not set(words1) & set(words2)
+
+    @pytest.mark.asyncio
+    async def test_seen_set_is_bounded(self, catalog):
+        seen = SeenWords(capacity=2)
+        for session_id in (1, 2, 3):
+            seen.set(session_id, catalog, 1 << session_id, 1)
+        assert seen.get(1, catalog) == (0, 0)
+        assert seen.get(3, catalog) == (1 << 3, 1)
+
+    @pytest.mark.asyncio
+    async def test_seen_set_dropped_after_reload(self, catalog, seeded_db):
+        seen = SeenWords(capacity=2)
+        seen.set(1, catalog, 0b111, 0b1)
+        assert seen.get(1, await reload_catalog(seeded_db)) == (0, 0)
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import pytest
+from httpx import AsyncClient
+from app.routers.exercises import build_arithmetic_payload
+from app.services import payload_pool
+from app.services.payload_pool import PayloadPool
+
+
+def counting_builder():
+    built = []
+
+    async def build() -> bytes:
+        built.append(len(built))
+        return json.dumps({"n": len(built)}).encode()
+
+    return build, built
+
+
+class TestPayloadPool:
+
+    @pytest.mark.asyncio
+    async def test_fill_up_to_depth(self):
+        build, built = counting_builder()
+        pool = PayloadPool("test", build, depth=5, low_watermark=2)
+        await pool.fill()
+        assert len(pool) == 5
+        assert len(built) == 5
+
+    @pytest.mark.asyncio
+    async def test_take_counts_hits_and_misses(self):
+        build, _ = counting_builder()
+        pool = PayloadPool("test", build, depth=2, low_watermark=1)
+
+        await pool.take()
+        await pool.fill()
+        await pool.take()
+
+        stats = pool.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert stats["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_background_refill_below_low_watermark(self):
+        build, _ = counting_builder()
+        pool = PayloadPool("test", build, depth=4, low_watermark=2)
+        task = asyncio.create_task(pool.run())
+        try:
+            await asyncio.sleep(0.01)
+            assert len(pool) == 4
+
+            for _ in range(3):
+                await pool.take()
+            await asyncio.sleep(0.01)
+            assert len(pool) == 4
+            assert pool.refills == 2
+        finally:
+            task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_refill_survives_builder_error(self):
+        build, built = counting_builder()
+        failures = [RuntimeError("build failed")]
+
+        async def flaky() -> bytes:
+            if failures:
+                raise failures.pop()
+            return await build()
+
+        pool = PayloadPool("test", flaky, depth=3, low_watermark=1, retry_delay=0.001)
+        task = asyncio.create_task(pool.run())
+        try:
+            await asyncio.sleep(0.05)
+            # Фоновая задача не падает и после ошибки заполняет пул
+            assert not task.done()
+            assert len(pool) == 3
+            assert pool.stats()["errors"] == 1
+        finally:
+            task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_payloads_are_not_reused(self):
+        build, _ = counting_builder()
+        pool = PayloadPool("test", build, depth=3, low_watermark=0)
+        await pool.fill()
+        payloads = [await pool.take() for _ in range(3)]
+        assert len(set(payloads)) == 3
+
+
+class TestPooledEndpoints:
+
+    @pytest.mark.asyncio
+    async def test_endpoint_serves_pooled_payload(self, client: AsyncClient, seeded_db):
+        async def build() -> bytes:
+            return b'{"problems": [], "time_limit_seconds": 120}'
+
+        pool = PayloadPool("arithmetic", build, depth=1, low_watermark=0)
+        await pool.fill()
+        payload_pool._pools["arithmetic"] = pool
+        try:
+            response = await client.get("/api/exercises/arithmetic")
+            stats = (await client.get("/api/exercises/pools")).json()
+        finally:
+            payload_pool._pools.clear()
+
+        assert response.status_code == 200
+        assert response.json() == {"problems": [], "time_limit_seconds": 120}
+        assert stats["arithmetic"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_built_payload_matches_response_schema(self, seeded_db, monkeypatch):
+        from app.routers import exercises
+
+        class SessionStub:
+            async def __aenter__(self):
+                return seeded_db
+
+            async def __aexit__(self, *exc):
+                return False
+
+        monkeypatch.setattr(exercises, "ReadSessionLocal", SessionStub)
+        data = json.loads(await build_arithmetic_payload())
+        assert len(data["problems"]) == 50
+        assert data["time_limit_seconds"] == 120
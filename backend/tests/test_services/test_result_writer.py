@@ -0,0 +1,174 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.models.result import ExerciseResult, TrainingSession
+from app.schemas.exercise import ExerciseResultCreate
+from app.services import result_service, result_writer
+from app.services.result_writer import ResultWriter
+
+
+def make_result(session_id=None, score=10):
+    return ExerciseResultCreate(
+        session_id=session_id, exercise_type="stroop", score=score,
+        time_seconds=60.0, correct_answers=score, total_questions=50
+    )
+
+
+@pytest.fixture
+def session_factory(test_engine):
+    return sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def wait_written(writer, n, timeout=2.0):
+    # Polls instead of a fixed sleep: a GC pause mid-suite can stretch one flush
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while writer.written + writer.failed < n and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+async def count_results(test_db):
+    return (await test_db.execute(select(func.count()).select_from(ExerciseResult))).scalar_one()
+
+
+class TestResultWriter:
+
+    @pytest.mark.asyncio
+    async def test_group_commits_queued_results(self, test_db, session_factory):
+        writer = ResultWriter(session_factory, max_batch=10, flush_interval=0.05, max_size=100)
+        writer.start()
+        for i in range(25):
+            writer.submit(make_result(score=i))
+        await wait_written(writer, 25)
+
+        assert await count_results(test_db) == 25
+        assert writer.stats()["flushes"] == 3
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_time_window(self, test_db, session_factory):
+        writer = ResultWriter(session_factory, max_batch=100, flush_interval=0.02, max_size=100)
+        writer.start()
+        writer.submit(make_result())
+        await wait_written(writer, 1)
+
+        assert await count_results(test_db) == 1
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_results(self, test_db, session_factory):
+        writer = ResultWriter(session_factory, max_batch=100, flush_interval=60, max_size=100)
+        writer.start()
+        for _ in range(5):
+            writer.submit(make_result())
+        await writer.stop()
+
+        assert await count_results(test_db) == 5
+        assert writer.stats()["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_creates_session_for_orphan_results(self, test_db, session_factory):
+        writer = ResultWriter(session_factory, max_batch=10, flush_interval=0.01, max_size=100)
+        writer.start()
+        writer.submit(make_result())
+        writer.submit(make_result())
+        await writer.stop()
+
+        sessions = (await test_db.execute(select(func.count()).select_from(TrainingSession))).scalar_one()
+        assert sessions == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_row_does_not_drop_batch(self, test_db, session_factory):
+        writer = ResultWriter(session_factory, max_batch=10, flush_interval=60, max_size=100)
+        writer.start()
+        for i in range(7):
+            writer.submit(make_result(score=i))
+        # exercise_type NOT NULL - вставка этой строки всегда падает
+        writer.submit(ExerciseResultCreate.model_construct(**{**make_result().model_dump(), "exercise_type": None}))
+        for i in range(2):
+            writer.submit(make_result(score=i))
+        await writer.stop()
+
+        assert await count_results(test_db) == 9
+        assert writer.stats()["written"] == 9
+        assert writer.stats()["failed"] == 1
+        assert writer.stats()["flushes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_error(self, test_db, session_factory, monkeypatch):
+        insert_results = result_service.insert_results
+        errors = [OperationalError("INSERT", {}, Exception("database is locked"))] * 2
+
+        async def locked_twice(db, rows):
+            if errors:
+                raise errors.pop()
+            return await insert_results(db, rows)
+
+        monkeypatch.setattr(result_service, "insert_results", locked_twice)
+        writer = ResultWriter(session_factory, max_batch=10, flush_interval=60, max_size=100, retry_backoff=0.001)
+        writer.start()
+        for i in range(5):
+            writer.submit(make_result(score=i))
+        await writer.stop()
+
+        assert await count_results(test_db) == 5
+        assert writer.stats()["retries"] == 2
+        assert writer.stats()["failed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, test_db, session_factory, monkeypatch):
+        async def always_locked(db, rows):
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+        monkeypatch.setattr(result_service, "insert_results", always_locked)
+        writer = ResultWriter(session_factory, max_batch=10, flush_interval=60, max_size=100,
+                              max_retries=2, retry_backoff=0.001)
+        writer.start()
+        for i in range(4):
+            writer.submit(make_result(score=i))
+        await writer.stop()
+
+        # Пачка не делится: блокировка не зависит от строк
+        assert writer.stats()["retries"] == 2
+        assert writer.stats()["failed"] == 4
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_full(self, session_factory):
+        writer = ResultWriter(session_factory, max_batch=10, flush_interval=1, max_size=2)
+        writer.submit(make_result())
+        writer.submit(make_result())
+        with pytest.raises(asyncio.QueueFull):
+            writer.submit(make_result())
+
+
+class TestQueuedIngestionEndpoint:
+
+    @pytest.mark.asyncio
+    async def test_post_result_is_accepted(self, client: AsyncClient, seeded_db, session_factory):
+        writer = result_writer.start(session_factory, max_batch=10, flush_interval=0.01, max_size=100)
+        try:
+            response = await client.post("/api/results", json={
+                "exercise_type": "arithmetic", "score": 40, "time_seconds": 100.0,
+                "correct_answers": 40, "total_questions": 50
+            })
+            assert response.status_code == 202
+            assert response.json()["status"] == "accepted"
+            assert response.json()["ticket"]
+
+            stats = (await client.get("/api/results/queue")).json()
+            assert stats["mode"] == "queued"
+            assert stats["accepted"] == 1
+        finally:
+            await result_writer.stop()
+
+        assert writer.stats()["written"] == 1
+        assert await count_results(seeded_db) == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_mode_reported(self, client: AsyncClient):
+        response = await client.get("/api/results/queue")
+        assert response.json() == {"mode": "sync"}
@@ -1,5 +1,12 @@
+import json
+import random
+from collections import Counter
 import pytest
-from app.services.stroop_service import generate_stroop_test
+from app.schemas.exercise import StroopResponse
+from app.services.content_catalog import get_catalog
+from app.services.stroop_service import (
+    STROOP_TEST_ITEMS, generate_stroop_test, generate_stroop_payload, generate_stroop_indices, stroop_answer_key
+)
 
 
 class TestStroopService:
@@ -28,3 +35,51 @@ class TestStroopService:
         for item in items:
             assert item.display_color.startswith("#")
             assert len(item.display_color) == 7
+
+
+class TestStroopIndexGenerator:
+
+    def test_same_seed_gives_same_test(self):
+        first = generate_stroop_indices(5, 50, random.Random(42))
+        second = generate_stroop_indices(5, 50, random.Random(42))
+        assert first == second
+
+    def test_different_seeds_give_different_tests(self):
+        first = generate_stroop_indices(5, 50, random.Random(1))
+        second = generate_stroop_indices(5, 50, random.Random(2))
+        assert first != second
+
+    @pytest.mark.parametrize("n_colors", [2, 3, 4, 5])
+    def test_no_immediate_repeats(self, n_colors):
+        for seed in range(50):
+            words, inks = generate_stroop_indices(n_colors, 50, random.Random(seed))
+            for i in range(1, 50):
+                assert inks[i] != inks[i - 1]
+                if n_colors > 2:
+                    assert words[i] != words[i - 1]
+
+    @pytest.mark.parametrize("n_colors,count", [(4, 50), (5, 50), (5, 7), (3, 121)])
+    def test_balanced_ink_distribution(self, n_colors, count):
+        for seed in range(20):
+            _, inks = generate_stroop_indices(n_colors, count, random.Random(seed))
+            counts = Counter(inks)
+            assert max(counts.values()) - min(counts.get(c, 0) for c in range(n_colors)) <= 1
+
+    def test_words_are_incongruent(self):
+        words, inks = generate_stroop_indices(5, 1000, random.Random(7), balanced=False)
+        assert all(w != ink for w, ink in zip(words, inks))
+
+    @pytest.mark.asyncio
+    async def test_json_payload_matches_items(self, seeded_db):
+        items = await generate_stroop_test(seeded_db, count=50, seed=3)
+        payload = json.loads(await generate_stroop_payload(seeded_db, count=50, seed=3))
+        assert StroopResponse(**payload).items == items
+
+    @pytest.mark.asyncio
+    async def test_answer_key_matches_served_test(self, seeded_db):
+        """Ключ ответов восстанавливается по test_id без хранения теста"""
+        payload = json.loads(await generate_stroop_payload(seeded_db, count=STROOP_TEST_ITEMS, seed=11))
+        names = (await get_catalog(seeded_db)).color_names
+        key = stroop_answer_key(len(names), payload["test_id"])
+        assert payload["test_id"] == 11
+        assert [item["correct_answer"] for item in payload["items"]] == [names[ink] for ink in key]
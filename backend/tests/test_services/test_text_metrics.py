@@ -0,0 +1,31 @@
+import pytest
+from app.services.text_metrics import difficulty_band, readability, text_metrics
+
+
+class TestTextMetrics:
+
+    def test_counts(self):
+        metrics = text_metrics("Мама мыла раму. Небо розово-оранжевое - красиво!")
+        # Дефис внутри слова не делит его, тире словом не считается
+        assert metrics["word_count"] == 6
+        assert metrics["sentence_count"] == 2
+        # ма-ма мы-ла ра-му не-бо ро-зо-во-о-ран-же-во-е кра-си-во
+        assert metrics["syllable_count"] == 2 + 2 + 2 + 2 + 8 + 3
+
+    def test_last_sentence_without_period(self):
+        assert text_metrics("Первое предложение. Второе без точки")["sentence_count"] == 2
+        assert text_metrics("Что? Да... Ну!")["sentence_count"] == 3
+
+    def test_oborneva_formula(self):
+        # 206.835 - 1.3 * 10 / 2 - 60.1 * 20 / 10
+        assert readability(10, 2, 20) == pytest.approx(80.135)
+        assert readability(0, 0, 0) == 0.0
+
+    def test_score_and_band_stored(self):
+        metrics = text_metrics("Мама мыла раму. Папа читал газету")
+        assert metrics["readability"] == round(readability(6, 2, 13), 2)
+        assert metrics["difficulty"] == difficulty_band(metrics["readability"])
+
+    @pytest.mark.parametrize("score, band", [(95, 1), (80, 1), (70, 2), (55, 3), (40, 4), (10, 5), (-20, 5)])
+    def test_difficulty_bands(self, score, band):
+        assert difficulty_band(score) == band
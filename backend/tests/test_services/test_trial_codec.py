@@ -0,0 +1,41 @@
+import json
+import pytest
+from app.services.trial_codec import encode_trials, decode_trials, TRIALS_FORMAT_VERSION
+
+
+class TestTrialCodec:
+
+    def test_round_trip(self):
+        latency = [412.3, 0.0, 1999.875, 87.1]
+        correct = [True, False, False, True]
+        blob = encode_trials(latency, correct, [1, 2, 3, 2**32 - 1])
+
+        assert blob[0] == TRIALS_FORMAT_VERSION
+        assert decode_trials(blob) == {"latency_ms": latency, "correct": correct, "item_ids": [1, 2, 3, 2**32 - 1]}
+
+    @pytest.mark.parametrize("count", [0, 1, 7, 8, 9, 120])
+    def test_bit_packing_lengths(self, count):
+        correct = [i % 3 == 0 for i in range(count)]
+        blob = encode_trials([100.0] * count, correct)
+        assert len(blob) == 6 + 4 * count + (count + 7) // 8
+        assert decode_trials(blob)["correct"] == correct
+
+    def test_smaller_than_json(self):
+        latency = [500.0 + i * 7.3 for i in range(50)]
+        correct = [i % 5 != 0 for i in range(50)]
+        ids = list(range(50))
+        as_json = json.dumps({"latency_ms": latency, "correct": correct, "item_ids": ids})
+        assert len(encode_trials(latency, correct, ids)) < len(as_json) / 2
+
+    def test_rejects_misaligned_arrays(self):
+        with pytest.raises(ValueError):
+            encode_trials([1.0, 2.0], [True])
+
+    def test_rejects_unknown_version_and_truncation(self):
+        blob = encode_trials([1.0, 2.0], [True, False], [1, 2])
+        with pytest.raises(ValueError, match="version"):
+            decode_trials(b"\x09" + blob[1:])
+        with pytest.raises(ValueError, match="truncated"):
+            decode_trials(blob[:-1])
+        with pytest.raises(ValueError, match="truncated"):
+            decode_trials(b"\x01")